@@ -0,0 +1,273 @@
+"""Validate many partition files in one process tree with bounded concurrency.
+
+Partitions come from a glob or a manifest (one path per line) and run as a
+two-stage pipeline on an asyncio event loop:
+
+- reader threads (``readers``) load each file's bytes, so slow storage
+  reads overlap with validation
+- a pool of ``workers`` processes parses and validates the bytes with the
+  compiled suite, each worker compiling it only once
+
+Partitions are admitted in order while the bytes held by admitted files
+stay under ``max_memory`` (a file larger than the limit runs on its own).
+Parsing needs more memory than the raw bytes, so pass ``chunksize`` to bound
+it for large partitions.
+
+Each partition's results are written to ``partition_dir`` as it finishes,
+and all partition states are merged in input order into one combined
+results file, with a ``partitions`` list recording each file's outcome. A
+partition that cannot be read is recorded with its error instead of
+stopping the batch:
+
+    python batch_validate.py --glob "data/customers_*_part*.csv" --workers 8 --max-memory 2G
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from results_history import ResultsHistory
+from results_io import DEFAULT_SAMPLE_SIZE, write_results
+
+DEFAULT_READERS = 4
+DEFAULT_MAX_MEMORY = 1024 ** 3
+DEFAULT_PARTITION_DIR = "partition_results"
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+# Plans compiled in this worker process, by suite and sample size
+_plans = {}
+
+
+def parse_size(value):
+    """Turn ``"512M"``, ``"2G"`` or a plain byte count into bytes"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def read_manifest(path):
+    """Partition paths listed one per line, relative to the manifest; # starts a comment"""
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path) as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return [os.path.join(base, line) for line in lines if line]
+
+
+def find_partitions(pattern=None, manifest=None):
+    paths = []
+    if pattern:
+        paths.extend(sorted(glob.glob(pattern, recursive=True)))
+    if manifest:
+        paths.extend(read_manifest(manifest))
+    return paths
+
+
+def partition_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def validate_bytes(data, file_format, suite, sample_size=DEFAULT_SAMPLE_SIZE, chunksize=None, stream=None):
+    """Worker: validate one partition's bytes and return the plan state
+
+    ``stream`` is the partition's position in the input, which picks its
+    row-sampling stream.
+    """
+    from readers import run_plan
+    from rule_suite import compile_suite
+
+    key = (json.dumps(suite, sort_keys=True, default=str), sample_size)
+    if key not in _plans:
+        _plans[key] = compile_suite(suite, sample_size=sample_size)
+    return run_plan(_plans[key], data, chunksize, file_format, stream)
+
+
+class MemoryBudget:
+    """Bytes of partition data that may be held at once"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size):
+        async with self._condition:
+            # A partition larger than the whole budget waits to run on its own
+            await self._condition.wait_for(lambda: self.used == 0 or self.used + size <= self.limit)
+            self.used += size
+
+    async def release(self, size):
+        async with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+class BatchValidator:
+    """Runs one suite over many partitions; see the module docstring"""
+
+    def __init__(self, suite=None, workers=None, readers=DEFAULT_READERS, max_memory=DEFAULT_MAX_MEMORY,
+                 sample_size=DEFAULT_SAMPLE_SIZE, chunksize=None, partition_dir=DEFAULT_PARTITION_DIR, history=None):
+        from rule_suite import compile_suite, load_suite
+        from validate_with_pandas import CUSTOMER_CHECKS
+
+        suite = suite or CUSTOMER_CHECKS
+        self.suite = load_suite(suite) if isinstance(suite, str) else suite
+        self.plan = compile_suite(self.suite, sample_size=sample_size)
+        self.workers = workers or os.cpu_count() or 1
+        self.readers = readers
+        self.max_memory = max_memory
+        self.sample_size = sample_size
+        self.chunksize = chunksize
+        self.partition_dir = partition_dir
+        # ResultsHistory that each partition's results are appended to
+        self.history = history
+
+    def run(self, paths):
+        """Validate ``paths`` and return the combined results"""
+        names = [partition_name(path) for path in paths]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Partition file names must be unique; repeated: {', '.join(duplicates)}")
+        if self.partition_dir:
+            os.makedirs(self.partition_dir, exist_ok=True)
+        return asyncio.run(self._run(paths))
+
+    async def _run(self, paths):
+        from readers import input_format
+
+        loop = asyncio.get_running_loop()
+        budget = MemoryBudget(self.max_memory)
+        # Bound the partitions in flight, so reading does not run far ahead of validation
+        in_flight = asyncio.Semaphore(self.workers + self.readers)
+        start = time.perf_counter()
+
+        async def validate(stream, path, size):
+            try:
+                data = await loop.run_in_executor(reader_pool, read_bytes, path)
+                state = await loop.run_in_executor(worker_pool, validate_bytes, data, input_format(path),
+                                                   self.suite, self.sample_size, self.chunksize, stream)
+                del data
+                return self._finish_partition(path, state)
+            except Exception as e:
+                return {"path": path, "error": f"{type(e).__name__}: {e}"}, None
+            finally:
+                await budget.release(size)
+                in_flight.release()
+
+        with ThreadPoolExecutor(self.readers) as reader_pool, ProcessPoolExecutor(self.workers) as worker_pool:
+            tasks = []
+            for stream, path in enumerate(paths):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    # Reading it fails too, and that error is recorded
+                    size = 0
+                await in_flight.acquire()
+                await budget.acquire(size)
+                tasks.append(asyncio.create_task(validate(stream, path, size)))
+            outcomes = await asyncio.gather(*tasks)
+
+        # Merge in input order, so the combined samples do not depend on timing
+        state = self.plan.new_state()
+        partitions = []
+        for partition, partition_state in outcomes:
+            partitions.append(partition)
+            if partition_state is not None:
+                state.merge(partition_state)
+        results = self.plan.build_results(state)
+        validation = results["validation_results"]
+        failed = [partition for partition in partitions if "error" in partition]
+        validation["success"] = validation["success"] and not failed
+        validation["statistics"].update({
+            "partitions": len(partitions),
+            "failed_partitions": sum(1 for partition in partitions if not partition.get("success")),
+            "unreadable_partitions": len(failed),
+            "elapsed_seconds": time.perf_counter() - start,
+        })
+        validation["partitions"] = partitions
+        return results
+
+    def _finish_partition(self, path, state):
+        results = self.plan.build_results(state)
+        validation = results["validation_results"]
+        partition = {"path": path, "success": validation["success"],
+                     "total_records": validation["statistics"]["total_records"]}
+        if self.partition_dir:
+            partition["results_file"] = os.path.join(self.partition_dir, partition_name(path) + ".json")
+            write_results(results, partition["results_file"])
+        if self.history is not None:
+            self.history.record(results, suite_name=self.plan.suite_name, source=path, commit=False)
+        return partition, state
+
+
+def validate_batch(paths, suite=None, output_path="validation_results.json", history_path=None, **options):
+    """Validate partition files, write the combined results and return them
+
+    ``options`` are passed to BatchValidator. With ``history_path`` each
+    partition is also recorded in the SQLite results history.
+    """
+    history = ResultsHistory(history_path) if history_path else None
+    try:
+        results = BatchValidator(suite, history=history, **options).run(paths)
+        if history is not None:
+            history.commit()
+    finally:
+        if history is not None:
+            history.close()
+    write_results(results, output_path)
+    return results
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Validate many partition files concurrently")
+    parser.add_argument("--glob", help="Glob of partition files, e.g. 'data/customers_*_part*.csv'")
+    parser.add_argument("--manifest", help="File listing partition paths, one per line")
+    parser.add_argument("--suite", help="Expectation suite JSON to run instead of the built-in checks")
+    parser.add_argument("--workers", type=int, help="Validation processes (default: one per CPU)")
+    parser.add_argument("--readers", type=int, default=DEFAULT_READERS, help="Threads reading partition files")
+    parser.add_argument("--max-memory", type=parse_size, default=DEFAULT_MAX_MEMORY,
+                        help="Partition bytes held at once, e.g. 512M or 2G")
+    parser.add_argument("--chunksize", type=int, help="Validate each partition in chunks of this many rows")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help="Maximum number of unexpected values kept per expectation")
+    parser.add_argument("--output", default="validation_results.json", help="Combined results file")
+    parser.add_argument("--partition-dir", default=DEFAULT_PARTITION_DIR,
+                        help="Directory for per-partition results files")
+    parser.add_argument("--history", help="Also append each partition's results to this SQLite history file")
+    args = parser.parse_args(argv)
+    if not args.glob and not args.manifest:
+        parser.error("give --glob or --manifest")
+
+    paths = find_partitions(args.glob, args.manifest)
+    if not paths:
+        parser.error("no partition files found")
+    results = validate_batch(paths, args.suite, args.output, args.history, workers=args.workers,
+                             readers=args.readers, max_memory=args.max_memory, sample_size=args.sample_size,
+                             chunksize=args.chunksize, partition_dir=args.partition_dir)
+
+    validation = results["validation_results"]
+    statistics = validation["statistics"]
+    print(f"Validated {statistics['partitions']} partition(s), {statistics['total_records']} records "
+          f"in {statistics['elapsed_seconds']:.1f} s")
+    print(f"Failed partitions: {statistics['failed_partitions']}")
+    for partition in validation["partitions"]:
+        if "error" in partition:
+            print(f"  [ERROR] {partition['path']}: {partition['error']}")
+        elif not partition["success"]:
+            print(f"  [FAIL] {partition['path']}")
+    print(f"\nCombined results saved to: {args.output}")
+    if args.partition_dir:
+        print(f"Partition results saved to: {args.partition_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare validating a Feather file on its mapped buffers against converting it to pandas.
+
+Writes ``--rows`` synthetic customers to an uncompressed Feather file (or
+uses ``--input``) and runs the age range and country checks, each in a
+fresh process:
+
+- pandas: every batch converted with ``to_pandas`` and checked by the plan
+- arrow: ``readers.run_arrow``, checking the memory-mapped buffers in place
+
+Besides time it reports each process's peak anonymous memory (sampled),
+which excludes the file pages the mapping shares with the page cache, and
+its peak RSS, which includes them. Compressed Feather files are decompressed
+into memory, so zero-copy reading needs ``compression="uncompressed"``.
+
+Usage: python benchmarks/bench_arrow_mmap.py [--rows 20000000]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_synthetic import write_customers  # noqa: E402
+from validate_with_pandas import CUSTOMER_CHECKS  # noqa: E402
+
+SUITE = {"expectation_suite_name": "arrow_mmap_bench",
+         "expectations": [exp for exp in CUSTOMER_CHECKS["expectations"] if exp["kwargs"]["column"] != "email"]}
+
+
+def _status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _measure(reader, path, queue):
+    from readers import iter_arrow_frames, run_arrow
+    from rule_suite import compile_suite
+
+    peak_anon = [_status_mb("RssAnon")]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.01):
+            peak_anon[0] = max(peak_anon[0], _status_mb("RssAnon"))
+
+    plan = compile_suite(SUITE)
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    base_anon = peak_anon[0]
+    start = time.perf_counter()
+    if reader == "arrow":
+        state = run_arrow(plan, path)
+    else:
+        state = plan.run(iter_arrow_frames(path, plan.columns))
+    seconds = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    peak_anon[0] = max(peak_anon[0], _status_mb("RssAnon"))
+    counts = [accumulator.unexpected_count for accumulator in state.accumulators]
+    queue.put((seconds, state.total_records, counts, peak_anon[0] - base_anon, _status_mb("VmHWM")))
+
+
+def run(reader, path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(reader, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark zero-copy Arrow validation")
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--input", help="Benchmark this uncompressed Arrow/Feather file instead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.input
+        if not path:
+            path = os.path.join(tmp, "customers.feather")
+            write_customers(path, args.rows, seed=args.seed)
+        print(f"{path}: {os.path.getsize(path) / 1024 ** 2:,.0f} MB\n")
+        print(f"{'reader':<10}{'seconds':>10}{'rows/s':>16}{'peak anon MB':>16}{'peak RSS MB':>14}")
+        outcomes = {}
+        for reader in ("pandas", "arrow"):
+            seconds, rows, counts, anon, rss = run(reader, path)
+            outcomes[reader] = counts
+            print(f"{reader:<10}{seconds:>10.2f}{rows / seconds:>16,.0f}{anon:>16,.0f}{rss:>14,.0f}")
+        print(f"\nCounts match: {outcomes['pandas'] == outcomes['arrow']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare validating many partition files one at a time against batch_validate.
+
+Writes ``--partitions`` CSV files of ``--rows`` customers each, then times:
+
+- loop: one ``validate_with_pandas.py`` process per file, as a shell loop would
+- serial: ``validate_data`` called per file in this process
+- batch: BatchValidator with reader threads feeding ``--workers`` processes
+
+Usage: python benchmarks/bench_batch_validate.py [--partitions 200] [--rows 20000] [--workers 8]
+"""
+import argparse
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from batch_validate import BatchValidator  # noqa: E402
+from generate_synthetic import write_customers  # noqa: E402
+from validate_with_pandas import validate_data  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch validation of partition files")
+    parser.add_argument("--partitions", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows per partition")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--loop-sample", type=int, default=20,
+                        help="Partitions run as separate processes; the loop time is scaled up from these")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.partitions):
+            paths.append(os.path.join(tmp, f"customers_20260101_part{i:04d}.csv"))
+            write_customers(paths[-1], args.rows, seed=i)
+        total = args.partitions * args.rows
+        print(f"{args.partitions} partitions of {args.rows} rows\n")
+
+        sample = paths[: args.loop_sample]
+        start = time.perf_counter()
+        for path in sample:
+            subprocess.run([sys.executable, os.path.join(REPO, "validate_with_pandas.py"), "--input", path,
+                            "--output", os.path.join(tmp, "loop.json")], check=True, stdout=subprocess.DEVNULL)
+        loop = (time.perf_counter() - start) * len(paths) / len(sample)
+
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for path in paths:
+                validate_data(path, output_path=os.path.join(tmp, "serial.json"))
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = BatchValidator(workers=args.workers, partition_dir=os.path.join(tmp, "parts")).run(paths)
+        batch = time.perf_counter() - start
+        assert results["validation_results"]["statistics"]["total_records"] == total
+
+        for name, seconds in (("loop (estimated)", loop), ("serial", serial), (f"batch ({args.workers} workers)", batch)):
+            print(f"{name:<24}{seconds:>8.2f} s{total / seconds:>14,.0f} rows/s{loop / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare set-membership checks on plain object strings and dictionary-encoded columns.
+
+Writes a CSV (and a Parquet copy when pyarrow is available) with a
+low-cardinality ``country`` column and runs an ``in_set`` suite with:
+
+- plain: the column read as ordinary strings and checked row by row with ``isin``
+- categorical: the column read dictionary-encoded, checked once per distinct
+  value and broadcast through the integer codes (the default plan)
+
+Reports the end-to-end time and the in-memory size of one chunk's column.
+
+Usage: python benchmarks/bench_categorical_in_set.py [--rows 5000000] [--distinct 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from readers import run_plan  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+
+def make_suite(values):
+    return {"expectation_suite_name": "bench_in_set", "expectations": [{
+        "expectation_type": "expect_column_values_to_be_in_set",
+        "kwargs": {"column": "country", "value_set": values},
+        "meta": {"opendq": {"sample": "unique"}}
+    }]}
+
+
+def run(suite, path, chunksize, categorical):
+    plan = compile_suite(suite)
+    if not categorical:
+        plan.categorical_columns = []
+    start = time.perf_counter()
+    state = run_plan(plan, path, chunksize)
+    elapsed = time.perf_counter() - start
+    return elapsed, plan.build_results(state)["validation_results"]["expectations"][0]["result"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the categorical in_set fast path")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--distinct", type=int, default=500, help="Distinct values in the column")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    values = [f"country_{i:04d}" for i in range(args.distinct)]
+    column = np.array(values, dtype=object)[rng.integers(0, args.distinct, args.rows)]
+    df = pd.DataFrame({"id": np.arange(args.rows), "country": column})
+    # A tenth of the distinct values are not allowed
+    suite = make_suite(values[: args.distinct - args.distinct // 10])
+
+    chunk = df["country"].iloc[: args.chunksize]
+    print(f"One chunk of {len(chunk)} rows: plain {chunk.memory_usage(deep=True) / 1e6:.1f} MB, "
+          f"categorical {chunk.astype('category').memory_usage(deep=True) / 1e6:.1f} MB\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = [os.path.join(tmp, "data.csv")]
+        df.to_csv(inputs[0], index=False)
+        try:
+            df.to_parquet(os.path.join(tmp, "data.parquet"), row_group_size=args.chunksize)
+            inputs.append(os.path.join(tmp, "data.parquet"))
+        except ImportError:
+            pass
+        for path in inputs:
+            plain_time, plain_result = run(suite, path, args.chunksize, categorical=False)
+            categorical_time, categorical_result = run(suite, path, args.chunksize, categorical=True)
+            assert plain_result == categorical_result, "fast path changed the result"
+            name = os.path.splitext(path)[1]
+            print(f"{name:<10} plain {plain_time:6.2f} s   categorical {categorical_time:6.2f} s   "
+                  f"speedup {plain_time / categorical_time:4.1f}x   "
+                  f"({plain_result['unexpected_count']} unexpected)")
+
+
+if __name__ == "__main__":
+    main()
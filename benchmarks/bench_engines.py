@@ -0,0 +1,247 @@
+"""Time the validation engines on the same synthetic data and flag regressions.
+
+Generates customer data with generate_synthetic.py (or uses ``--input``)
+and runs, each in a fresh process so peak memory is measured per engine:
+
+- pandas: validate_with_pandas.validate_data (``--chunksize``/``--workers`` apply)
+- simple: simple_validate.validate_data
+- ge: a Great Expectations checkpoint run in-process through
+  checkpoint_runner, when ``--ge-checkpoint`` is given. The checkpoint reads
+  whatever data it is configured with, so point it at the generated file
+  (kept with ``--keep``) for the numbers to be comparable.
+
+For each engine it reports the best of ``--repeat`` runs in rows/s, the peak
+RSS, and whether the unexpected counts match the injected errors. The pandas
+engine also gets a per-rule breakdown: each check is run alone and timed.
+
+``--save-baseline`` stores the numbers; later runs compare against the
+stored baseline and exit with status 1 when an engine's throughput drops,
+or its peak RSS grows, by more than ``--tolerance``:
+
+    python benchmarks/bench_engines.py --rows 2000000 --save-baseline
+    python benchmarks/bench_engines.py --rows 2000000
+
+Baselines are only comparable on the same machine and row count.
+"""
+import argparse
+import contextlib
+import copy
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_synthetic import write_customers  # noqa: E402
+from validate_with_pandas import CUSTOMER_CHECKS  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine_baseline.json")
+DEFAULT_TOLERANCE = 0.2
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+    try:
+        # On Linux ru_maxrss of a spawned process still includes the parent's
+        # peak from before exec; VmHWM covers only this process
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return max(int(line.split()[1]) / 1024, children)
+    except OSError:
+        pass
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, children)
+
+
+def _summarize(results):
+    """Rows checked and unexpected counts per column, from either results layout"""
+    counts, rows = {}, 0
+    if "validation_results" in results:
+        for exp in results["validation_results"]["expectations"]:
+            counts[exp["meta"]["column"]] = exp["result"]["unexpected_count"]
+            rows = max(rows, exp["result"]["element_count"])
+    else:
+        for exp in results.get("results", []):
+            column = exp["expectation_config"]["kwargs"].get("column")
+            # A column may have several expectations; keep the largest count
+            counts[column] = max(counts.get(column, 0), exp["result"].get("unexpected_count", 0))
+            rows = max(rows, exp["result"].get("element_count", 0))
+    return rows, counts
+
+
+def run_pandas(path, options, suite=None):
+    from validate_with_pandas import validate_data
+    return validate_data(path, chunksize=options.get("chunksize"), suite=suite, workers=options.get("workers", 1),
+                         output_path=os.path.join(options["workdir"], "pandas_results.json"))
+
+
+def run_simple(path, options):
+    import simple_validate
+    # simple_validate writes validation_results.json to the working directory
+    simple_validate.validate_data(path, chunksize=options.get("chunksize"))
+    with open(os.path.join(options["workdir"], "validation_results.json")) as f:
+        return json.load(f)
+
+
+def run_ge(path, options):
+    from checkpoint_runner import load_context, run_checkpoint
+    from run_store import RunStore
+    context = load_context(options.get("ge_context"))
+    _, stored = run_checkpoint(options["ge_checkpoint"], context=context,
+                               store=RunStore(os.path.join(options["workdir"], "runs")))
+    return stored[-1][2] if stored else {}
+
+
+def run_rule(path, options):
+    """Run one expectation of the built-in checks on its own"""
+    suite = copy.deepcopy(CUSTOMER_CHECKS)
+    suite["expectations"] = [suite["expectations"][options["rule"]]]
+    return run_pandas(path, options, suite)
+
+
+ENGINES = {"pandas": run_pandas, "simple": run_simple, "ge": run_ge}
+
+
+def _measure(engine, path, options, queue):
+    """Child process: run one engine once and report time, memory and counts"""
+    os.chdir(options["workdir"])
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        results = engine(path, options)
+        elapsed = time.perf_counter() - start
+    rows, unexpected = _summarize(results)
+    queue.put({"seconds": elapsed, "peak_rss_mb": _peak_rss_mb(), "rows": rows, "unexpected": unexpected})
+
+
+def measure(engine, path, options, repeat):
+    """Best time and largest peak RSS over ``repeat`` fresh processes"""
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(engine, path, options, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise RuntimeError(f"{engine.__name__} failed with exit code {process.exitcode}")
+        runs.append(queue.get())
+    return {"seconds": min(run["seconds"] for run in runs),
+            "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+            "rows": runs[0]["rows"], "unexpected": runs[0]["unexpected"]}
+
+
+def compare(current, baseline, tolerance):
+    """Return a message for every engine that regressed against the baseline"""
+    regressions = []
+    for name, stats in current.items():
+        previous = baseline.get("engines", {}).get(name)
+        if previous is None:
+            continue
+        if stats["rows_per_second"] < previous["rows_per_second"] * (1 - tolerance):
+            regressions.append(f"{name}: {stats['rows_per_second']:,.0f} rows/s, "
+                               f"baseline {previous['rows_per_second']:,.0f} rows/s")
+        if stats["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {stats['peak_rss_mb']:.0f} MB, "
+                               f"baseline {previous['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the validation engines on synthetic data")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv")
+    parser.add_argument("--input", help="Benchmark this file instead of generating one")
+    parser.add_argument("--keep", help="Keep the generated file at this path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Rate of each kind of injected error")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=["pandas", "simple"])
+    parser.add_argument("--chunksize", type=int, help="Chunk size for the pandas and simple engines")
+    parser.add_argument("--workers", type=int, default=1, help="Workers for the pandas engine")
+    parser.add_argument("--ge-checkpoint", help="Checkpoint run by the ge engine")
+    parser.add_argument("--ge-context", help="Great Expectations project directory")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine; the fastest is kept")
+    parser.add_argument("--no-breakdown", action="store_true", help="Skip the per-rule breakdown")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown or memory growth, as a fraction")
+    args = parser.parse_args()
+
+    engines = list(args.engines)
+    if "ge" in engines and not args.ge_checkpoint:
+        print("Skipping ge: --ge-checkpoint was not given")
+        engines.remove("ge")
+    is_csv = args.input.lower().endswith(".csv") if args.input else args.format == "csv"
+    if "simple" in engines and not is_csv:
+        print("Skipping simple: it only reads CSV")
+        engines.remove("simple")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        expected = None
+        path = args.input
+        if path is None:
+            extension = "arrow" if args.format == "feather" else args.format
+            path = args.keep or os.path.join(workdir, f"customers.{extension}")
+            counts = write_customers(path, args.rows, args.seed, bad_email_rate=args.error_rate,
+                                     bad_age_rate=args.error_rate, unknown_country_rate=args.error_rate)
+            expected = {column: kinds["invalid"] + kinds["null"] for column, kinds in counts.items()}
+            rows = args.rows
+            print(f"Generated {rows} rows ({args.format}) with {args.error_rate:.1%} of each error\n")
+        else:
+            # Taken from the first engine's results
+            rows = None
+        path = os.path.abspath(path)
+        options = {"workdir": workdir, "chunksize": args.chunksize, "workers": args.workers,
+                   "ge_checkpoint": args.ge_checkpoint, "ge_context": args.ge_context}
+
+        current = {}
+        print(f"{'engine':<10}{'seconds':>9}{'rows/s':>14}{'peak RSS':>11}  counts")
+        for name in engines:
+            stats = measure(ENGINES[name], path, options, args.repeat)
+            rows = rows or stats["rows"]
+            if expected is None or name == "ge":
+                check = "-"
+            else:
+                check = "ok" if all(stats["unexpected"].get(column) == count
+                                    for column, count in expected.items()) else f"MISMATCH {stats['unexpected']}"
+            current[name] = {"seconds": stats["seconds"], "rows_per_second": rows / stats["seconds"],
+                             "peak_rss_mb": stats["peak_rss_mb"]}
+            print(f"{name:<10}{stats['seconds']:>9.2f}{rows / stats['seconds']:>14,.0f}"
+                  f"{stats['peak_rss_mb']:>8.0f} MB  {check}")
+
+        if "pandas" in engines and not args.no_breakdown:
+            print("\nPer-rule breakdown (pandas, each rule run alone):")
+            for index, expectation in enumerate(CUSTOMER_CHECKS["expectations"]):
+                stats = measure(run_rule, path, dict(options, rule=index), args.repeat)
+                print(f"  {expectation['meta']['opendq']['result_type']:<22}{stats['seconds']:>9.2f} s"
+                      f"{rows / stats['seconds']:>14,.0f} rows/s")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"rows": rows, "engines": current}, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("rows") != rows:
+        print(f"\nBaseline was recorded with {baseline.get('rows')} rows; comparing rows/s anyway")
+    regressions = compare(current, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"\nNo regressions against the baseline (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Time trend queries against a results history holding many runs.
+
+Records ``--runs`` synthetic runs of the three built-in checks, spread
+evenly over the past year, into a fresh SQLite history, then times:
+
+- per-run trend of one rule and column over the last 90 days
+- daily buckets of one column over the whole year
+- the 20 most recent runs of a suite
+
+Every query should answer in well under a second at 100k runs.
+
+Usage: python benchmarks/bench_history_queries.py [--runs 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from results_history import ResultsHistory, format_run_time, parse_since  # noqa: E402
+
+CHECKS = [("valid_email_format", "email"), ("valid_age_range", "age"), ("valid_country", "country")]
+
+
+def make_results(rng):
+    expectations = []
+    for expectation_type, column in CHECKS:
+        unexpected = int(rng.integers(0, 50))
+        expectations.append({
+            "expectation_type": expectation_type,
+            "success": unexpected == 0,
+            "result": {"element_count": 1000, "unexpected_count": unexpected,
+                       "unexpected_percent": unexpected / 10, "partial_unexpected_list": []},
+            "meta": {"column": column}
+        })
+    return {"validation_results": {
+        "expectations": expectations,
+        "statistics": {"total_records": 1000, "evaluated_expectations": 3,
+                       "successful_expectations": sum(exp["success"] for exp in expectations)},
+        "success": all(exp["success"] for exp in expectations)
+    }}
+
+
+def timed(label, query, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = query()
+        times.append(time.perf_counter() - start)
+    print(f"{label:<48}{len(rows):>8} rows{min(times) * 1000:>10.1f} ms")
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time results history queries")
+    parser.add_argument("--runs", type=int, default=100_000, help="Number of runs to record")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        with ResultsHistory(os.path.join(tmp, "history.sqlite")) as history:
+            now = datetime.now(timezone.utc)
+            step = timedelta(days=365) / args.runs
+            start = time.perf_counter()
+            for i in range(args.runs):
+                history.record(make_results(rng), suite_name="customers_pandas_checks",
+                               run_time=format_run_time(now - (args.runs - i) * step), commit=False)
+            history.commit()
+            print(f"Recorded {args.runs} runs in {time.perf_counter() - start:.1f} s\n")
+
+            slowest = max(
+                timed("trend: email rule, last 90 days",
+                      lambda: history.trend("valid_email_format", "email", since=parse_since("90d"))),
+                timed("trend: age column, daily buckets, one year",
+                      lambda: history.trend(column="age", since=parse_since("365d"), bucket="day")),
+                timed("runs: 20 most recent",
+                      lambda: history.runs("customers_pandas_checks", limit=20)),
+            )
+    print(f"\nSlowest query: {slowest * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Track the start-up cost of each opendq subcommand.
+
+For every subcommand, a fresh interpreter runs ``python -X importtime``
+on ``opendq.load_command(<name>)``, which imports exactly what the
+subcommand needs before it parses its arguments. The cumulative import time
+of the top-level modules is reported, along with the slowest imports and
+the wall time of ``opendq <command> --help``.
+
+The report subcommand only needs json and html, and validate and checkpoint
+defer pandas and Great Expectations until they run, so their imports should
+stay under the 100 ms target; the script exits non-zero if they do not.
+
+Usage: python benchmarks/bench_import_time.py [--repeat 5] [--target-ms 100]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from opendq import COMMANDS  # noqa: E402
+
+# Subcommands held to the start-up target
+FAST_COMMANDS = ["validate", "report", "checkpoint"]
+
+
+def import_times(command):
+    """Return ``(top-level, all)`` cumulative import microseconds by module for a subcommand"""
+    code = f"import opendq; opendq.load_command({command!r})"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    top, modules = {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two more spaces per level
+        depth = len(name) - len(name.lstrip())
+        modules[name.strip()] = int(cumulative)
+        if depth == 1:
+            top[name.strip()] = int(cumulative)
+    return top, modules
+
+
+def help_wall_time(command):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(REPO_ROOT, "opendq.py"), command, "--help"],
+                   cwd=REPO_ROOT, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of each opendq subcommand")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per subcommand; the median is reported")
+    parser.add_argument("--target-ms", type=float, default=100, help="Import-time target for fast subcommands")
+    args = parser.parse_args()
+
+    failed = []
+    print(f"{'command':<12}{'imports (ms)':>14}{'--help wall (ms)':>18}  slowest imports")
+    for command in COMMANDS:
+        runs = [import_times(command) for _ in range(args.repeat)]
+        if any(run is None for run in runs):
+            print(f"{command:<12}{'unavailable':>14}  (missing dependency)")
+            continue
+        totals = [sum(run[0].values()) / 1000 for run in runs]
+        total = statistics.median(totals)
+        wall = statistics.median(help_wall_time(command) for _ in range(args.repeat)) * 1000
+        # Skip opendq itself, which every subcommand imports
+        slowest = sorted(((name, us) for name, us in runs[0][1].items() if name != "opendq"),
+                         key=lambda item: -item[1])[:3]
+        names = ", ".join(f"{name} {us / 1000:.0f}" for name, us in slowest)
+        print(f"{command:<12}{total:>14.1f}{wall:>18.1f}  {names}")
+        if command in FAST_COMMANDS and total > args.target_ms:
+            failed.append(f"{command}: {total:.1f} ms > {args.target_ms:.0f} ms")
+    if failed:
+        print("\nOver the import-time target: " + "; ".join(failed))
+        sys.exit(1)
+    print(f"\nFast subcommands ({', '.join(FAST_COMMANDS)}) are within {args.target_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
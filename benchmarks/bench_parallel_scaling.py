@@ -0,0 +1,57 @@
+"""Measure how validate_parallel scales from 1 to 32 worker processes.
+
+Usage: python benchmarks/bench_parallel_scaling.py [--rows 2000000] [--workers 1 2 4 8 16 32]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parallel_validate import validate_parallel  # noqa: E402
+from validate_with_pandas import CUSTOMER_CHECKS  # noqa: E402
+
+
+def write_customers(path, rows, seed=11):
+    rng = np.random.default_rng(seed)
+    emails = np.where(rng.random(rows) < 0.98, "customer@example.com", "invalid-email")
+    pd.DataFrame({
+        "email": [f"{i}{email}" for i, email in enumerate(emails)],
+        "age": rng.integers(10, 70, rows),
+        "country": np.array(["India", "USA", "UK", "France"])[rng.integers(0, 4, rows)],
+        "name": [f"name{i}" for i in range(rows)],
+    }).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "customers.csv")
+        write_customers(path, args.rows)
+
+        reference = None
+        baseline = None
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            plan, state = validate_parallel(path, CUSTOMER_CHECKS, workers)
+            elapsed = time.perf_counter() - start
+            results = json.dumps(plan.build_results(state), sort_keys=True, default=str)
+            if reference is None:
+                reference, baseline = results, elapsed
+            elif results != reference:
+                raise SystemExit(f"Results with {workers} workers differ from {args.workers[0]} workers")
+            print(f"{workers:>8} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
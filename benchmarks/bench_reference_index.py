@@ -0,0 +1,77 @@
+"""Compare a foreign-key check through ReferenceIndex against pandas.
+
+Writes a reference Parquet file of ``--reference-rows`` distinct account ids
+and checks ``--rows`` lookups (``--missing-rate`` of them absent) with:
+
+- isin: ``Series.isin`` against the whole reference column in memory
+- merge: a left merge on the key, as a join-based check would do
+- index build: hashing the reference once into the on-disk index
+- index lookup: ReferenceIndex.contains on the memory-mapped index, in chunks
+
+Usage: python benchmarks/bench_reference_index.py [--reference-rows 10000000] [--rows 10000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reference_index import ReferenceIndex  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark referential-integrity lookups")
+    parser.add_argument("--reference-rows", type=int, default=10_000_000)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    reference = pd.DataFrame({"account_id": rng.permutation(args.reference_rows).astype(np.int64)})
+    keys = rng.integers(0, args.reference_rows, args.rows)
+    absent = rng.random(args.rows) < args.missing_rate
+    keys[absent] += args.reference_rows
+    lookups = pd.DataFrame({"account_id": keys})
+    expected = int(absent.sum())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "accounts.parquet")
+        reference.to_parquet(path, index=False)
+        timings = {}
+
+        start = time.perf_counter()
+        found = lookups["account_id"].isin(pd.read_parquet(path)["account_id"])
+        timings["isin"] = time.perf_counter() - start
+        assert int((~found).sum()) == expected
+
+        start = time.perf_counter()
+        merged = lookups.merge(pd.read_parquet(path), on="account_id", how="left", indicator=True)
+        timings["merge"] = time.perf_counter() - start
+        assert int((merged["_merge"] == "left_only").sum()) == expected
+        del merged
+
+        start = time.perf_counter()
+        ReferenceIndex.open(path, ["account_id"])
+        timings["index build"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = ReferenceIndex.open(path, ["account_id"])
+        missing = 0
+        for offset in range(0, args.rows, args.chunksize):
+            missing += int((~index.contains(lookups.iloc[offset:offset + args.chunksize])).sum())
+        timings["index lookup"] = time.perf_counter() - start
+        assert missing == expected
+
+    print(f"{args.rows:,} lookups against {args.reference_rows:,} reference keys, {expected:,} missing\n")
+    for name, seconds in timings.items():
+        print(f"{name:<16}{seconds:>8.2f} s{args.rows / seconds:>16,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
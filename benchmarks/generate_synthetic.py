@@ -0,0 +1,126 @@
+"""Generate customer-shaped data with a known number of errors.
+
+The output has the ``email``, ``age``, ``country`` and ``name`` columns of
+data/customers.csv. Each check gets its own error rate: malformed emails,
+ages outside 18-60 and countries outside India/USA/UK. ``--null-rate``
+also blanks a share of the valid values of each checked column. The same
+seed always gives the same file, and the exact counts of injected errors
+are printed (and returned by ``write_customers``) so benchmarks can check
+results as well as time them.
+
+Usage: python benchmarks/generate_synthetic.py --rows 10000000 --output customers_10m.csv
+       [--bad-email-rate 0.01] [--bad-age-rate 0.01] [--unknown-country-rate 0.01]
+       [--null-rate 0] [--seed 0]
+
+The output format follows the extension: ``.csv``, ``.parquet`` or
+``.arrow``/``.feather`` (the last two need pyarrow).
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+VALID_COUNTRIES = ["India", "USA", "UK"]
+UNKNOWN_COUNTRIES = ["France", "Peru", "Mars", "Atlantis"]
+DOMAINS = ["@example.com", "@domain.com", "@example.co.uk", "@mail.org"]
+# Suffixes that make "user<n>" fail the email pattern
+BAD_EMAIL_SUFFIXES = [".example.com", "@", "@domain", " @example.com", "@example.c"]
+CHECKED_COLUMNS = ("email", "age", "country")
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _pick(rng, choices, rows):
+    return np.array(choices, dtype=object)[rng.integers(0, len(choices), rows)]
+
+
+def generate_chunk(rng, start, rows, bad_email_rate=0.01, bad_age_rate=0.01, unknown_country_rate=0.01,
+                   null_rate=0.0):
+    """Return one chunk of ``rows`` customers numbered from ``start``, and its error counts"""
+    ids = pd.Series(np.arange(start, start + rows)).astype(str)
+    invalid = {column: rng.random(rows) < rate for column, rate in
+               zip(CHECKED_COLUMNS, (bad_email_rate, bad_age_rate, unknown_country_rate))}
+    email = "user" + ids + np.where(invalid["email"], _pick(rng, BAD_EMAIL_SUFFIXES, rows), _pick(rng, DOMAINS, rows))
+    # Bad ages are split between too young and too old
+    age = np.where(invalid["age"],
+                   np.where(rng.random(rows) < 0.5, rng.integers(0, 18, rows), rng.integers(61, 100, rows)),
+                   rng.integers(18, 61, rows))
+    country = np.where(invalid["country"], _pick(rng, UNKNOWN_COUNTRIES, rows), _pick(rng, VALID_COUNTRIES, rows))
+    df = pd.DataFrame({"email": email.to_numpy(), "age": age, "country": country, "name": ("name" + ids).to_numpy()})
+
+    counts = {}
+    for column in CHECKED_COLUMNS:
+        # Only valid values are blanked, so invalid and null counts stay separate
+        nulls = (rng.random(rows) < null_rate) & ~invalid[column] if null_rate else np.zeros(rows, dtype=bool)
+        if nulls.any():
+            df[column] = df[column].where(~nulls)
+        counts[column] = {"invalid": int(invalid[column].sum()), "null": int(nulls.sum())}
+    return df, counts
+
+
+def generate_customers(rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, **rates):
+    """Yield ``(DataFrame, counts)`` chunks totalling ``rows`` customers"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        yield generate_chunk(rng, start, min(chunk_rows, rows - start), **rates)
+
+
+def _add_counts(total, counts):
+    for column, kinds in counts.items():
+        for kind, count in kinds.items():
+            total.setdefault(column, {}).setdefault(kind, 0)
+            total[column][kind] += count
+
+
+def write_customers(path, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, **rates):
+    """Write ``rows`` customers to ``path`` and return the injected error counts per column"""
+    extension = os.path.splitext(path)[1].lower()
+    total = {}
+    writer = None
+    try:
+        for i, (df, counts) in enumerate(generate_customers(rows, seed, chunk_rows, **rates)):
+            _add_counts(total, counts)
+            if extension == ".csv":
+                df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+                continue
+            import pyarrow as pa
+            # Every chunk must have the same schema, even if a chunk has no nulls
+            table = pa.Table.from_pandas(df.astype({"age": "float64" if rates.get("null_rate") else "int64"}),
+                                         preserve_index=False)
+            if writer is None:
+                if extension == ".parquet":
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, table.schema)
+                elif extension in (".arrow", ".feather"):
+                    writer = pa.ipc.new_file(path, table.schema)
+                else:
+                    raise ValueError(f"Unsupported output format: {extension}")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic customer data with known errors")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", required=True, help="Output .csv, .parquet, .arrow or .feather file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bad-email-rate", type=float, default=0.01)
+    parser.add_argument("--bad-age-rate", type=float, default=0.01)
+    parser.add_argument("--unknown-country-rate", type=float, default=0.01)
+    parser.add_argument("--null-rate", type=float, default=0.0, help="Share of valid values left empty")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows generated at a time")
+    args = parser.parse_args()
+
+    counts = write_customers(args.output, args.rows, args.seed, args.chunk_rows,
+                             bad_email_rate=args.bad_email_rate, bad_age_rate=args.bad_age_rate,
+                             unknown_country_rate=args.unknown_country_rate, null_rate=args.null_rate)
+    print(f"Wrote {args.rows} rows to {args.output}")
+    print(json.dumps(counts, indent=2))
+
+
+if __name__ == "__main__":
+    main()
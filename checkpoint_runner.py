@@ -0,0 +1,42 @@
+"""Run Great Expectations checkpoints in-process.
+
+``great_expectations checkpoint run`` starts a new interpreter, and its
+result then has to be found again on disk. Here the checkpoint runs through
+the data context in this process, the result object is returned directly,
+and each validation result is also saved to a RunStore so the latest run
+of a suite can be looked up without listing the validations directory.
+"""
+from datetime import datetime
+
+from run_store import DEFAULT_RUN_STORE, RunStore
+
+DEFAULT_CHECKPOINT = "customers_checkpoint"
+
+
+def load_context(context_root_dir=None):
+    # Great Expectations is slow to import, so only load it when a checkpoint runs
+    import great_expectations as ge
+    return ge.get_context(context_root_dir=context_root_dir) if context_root_dir else ge.get_context()
+
+
+def _run_time(validation):
+    run_time = validation.get("meta", {}).get("run_id", {}).get("run_time")
+    return datetime.fromisoformat(run_time.replace("Z", "+00:00")) if run_time else None
+
+
+def run_checkpoint(checkpoint_name=DEFAULT_CHECKPOINT, context=None, store=None):
+    """Run a checkpoint and store its validation results
+
+    Returns the CheckpointResult and a list of ``(suite name, run id,
+    validation result dict)`` for the validations it ran.
+    """
+    context = context or load_context()
+    store = store or RunStore(DEFAULT_RUN_STORE)
+    result = context.run_checkpoint(checkpoint_name=checkpoint_name)
+    stored = []
+    for validation_result in result.list_validation_results():
+        validation = validation_result.to_json_dict()
+        suite_name = validation["meta"]["expectation_suite_name"]
+        run_id = store.save(suite_name, validation, run_time=_run_time(validation))
+        stored.append((suite_name, run_id, validation))
+    return result, stored
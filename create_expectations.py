@@ -1,9 +1,11 @@
 import os
-import pandas as pd
-import great_expectations as ge
-from great_expectations.data_context import FileDataContext
+
+from string_rules import EMAIL_PATTERN
 
 def create_expectation_suite():
+    # Great Expectations takes seconds to import, so load it only when used
+    from great_expectations.data_context import FileDataContext
+    
     # Set up the data context
     context = FileDataContext(project_root_dir=os.getcwd())
     
@@ -32,7 +34,7 @@ def create_expectation_suite():
     validator.expect_column_values_to_not_be_null(column="email")
     validator.expect_column_values_to_match_regex(
         column="email",
-        regex=r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+        regex=EMAIL_PATTERN
     )
     validator.expect_column_values_to_be_between(
         column="age",
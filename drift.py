@@ -0,0 +1,260 @@
+"""Distribution drift against column sketches stored by earlier runs.
+
+A drift rule compares the current data with a baseline without reloading
+the data the baseline came from: the baseline is the sketch of one column
+kept in a ``profile_data.py`` profile, or in the results of an earlier
+validation run with a drift rule on that column. Every drift result
+stores the current run's sketch under ``details["sketch"]``, so today's
+results file is tomorrow's baseline.
+
+- ``NumericDriftAccumulator`` compares numbers by PSI (population stability
+  index) over bins cut at the baseline's quantiles, or by the KS statistic
+  (the largest gap between the two cumulative distributions). The baseline
+  is a QuantileSketch.
+- ``CategoryDriftAccumulator`` compares the share of each baseline value
+  (and of all other values together) by the largest absolute shift or by
+  PSI. The baseline is a TopKSketch, so a column with more distinct values
+  than its capacity is compared on its most frequent ones.
+
+The bins and categories are fixed by the baseline before the pass, so each
+chunk only adds to a vector of exact counts; PSI and category shifts are the
+same however the input is chunked or split across workers. KS compares the
+baseline sketch with a sketch of the current values, and is accurate to
+about the sketches' rank error (``1.7 / k``).
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from results_io import iter_expectations, results_format
+from sketches import DEFAULT_TOP_K, QuantileSketch, TopKSketch, TOP_K_CAPACITY_FACTOR
+from uniqueness import normalize_keys
+
+NUMERIC_METRICS = {"psi": 0.2, "ks": 0.1}
+CATEGORY_METRICS = {"max_shift": 0.05, "psi": 0.2}
+DEFAULT_BINS = 10
+# Share given to a bin that is empty on one side, so PSI stays finite
+PSI_FLOOR = 1e-4
+# Largest category shifts listed in the result details
+REPORTED_SHIFTS = 10
+
+
+def load_baseline(path, column, kind):
+    """The stored ``kind`` sketch (``"quantiles"`` or ``"top_values"``) of ``column``
+
+    ``path`` is a profile JSON or a validation results file (JSON or
+    NDJSON). Returns a dict with the sketch under ``kind`` and, for
+    ``top_values``, the number of non-missing values it summarizes as
+    ``count``.
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"Drift baseline {path} does not exist")
+    if results_format(path) == "json":
+        with open(path, "r") as f:
+            data = json.load(f)
+        if "profile" in data:
+            profile = data["profile"]["columns"].get(column)
+            if profile is not None:
+                return {kind: profile["sketches"][kind], "count": profile["count"] - profile["null_count"]}
+            raise ValueError(f"Drift baseline {path} has no profile of column {column!r}")
+        expectations = data.get("validation_results", {}).get("expectations", [])
+    else:
+        expectations = iter_expectations(path)
+    for exp in expectations:
+        sketch = exp.get("result", {}).get("details", {}).get("sketch")
+        if exp.get("meta", {}).get("column") == column and sketch and kind in sketch:
+            return sketch
+    raise ValueError(f"Drift baseline {path} has no {kind} sketch of column {column!r}")
+
+
+def baseline_identity(path):
+    """What a cached result must match for the baseline file to be unchanged"""
+    stat = os.stat(path)
+    return {"baseline": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def psi(expected, actual):
+    """Population stability index of two arrays of bin counts"""
+    p = np.maximum(expected / max(expected.sum(), 1), PSI_FLOOR)
+    q = np.maximum(actual / max(actual.sum(), 1), PSI_FLOOR)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+class DriftAccumulator:
+    """Counts of one column, compared with a baseline when the result is built"""
+
+    track_missing = True
+    # Drift is judged on the whole distribution, so no single value is unexpected
+    unexpected_count = 0
+
+    def __init__(self, column, metric, threshold, baseline_path):
+        self.column = column
+        self.metric = metric
+        self.threshold = threshold
+        self.baseline_path = baseline_path
+        self.element_count = 0
+        self.missing_count = 0
+
+    def update_frame(self, df):
+        values = df[self.column]
+        missing = values.isna().to_numpy()
+        self.element_count += len(values)
+        self.missing_count += int(missing.sum())
+        if not missing.all():
+            self._update(values[~missing])
+
+    def merge(self, other):
+        self.element_count += other.element_count
+        self.missing_count += other.missing_count
+        self.counts += other.counts
+        self.sketch.merge(other.sketch)
+        return self
+
+    def unexpected_percent(self):
+        return 0.0
+
+    def statistic(self):
+        """The drift metric, or None when either side has no values"""
+        raise NotImplementedError
+
+    def within_threshold(self):
+        statistic = self.statistic()
+        return statistic is not None and statistic <= self.threshold
+
+    def to_result(self):
+        statistic = self.statistic()
+        return {
+            "element_count": self.element_count,
+            "unexpected_count": self.unexpected_count,
+            "unexpected_percent": 0.0,
+            "partial_unexpected_list": [],
+            "missing_count": self.missing_count,
+            "missing_percent": (self.missing_count / self.element_count) * 100 if self.element_count > 0 else 0,
+            "observed_value": statistic,
+            "details": {
+                "drift": {"metric": self.metric, "statistic": statistic, "threshold": self.threshold,
+                          "baseline": self.baseline_path, **self.drift_details()},
+                "sketch": self.stored_sketch()
+            }
+        }
+
+    def to_dict(self):
+        return {"element_count": self.element_count, "missing_count": self.missing_count,
+                "counts": self.counts.tolist(), "sketch": self.sketch.to_dict()}
+
+    def load_dict(self, data):
+        self.element_count = data["element_count"]
+        self.missing_count = data["missing_count"]
+        self.counts = np.array(data["counts"], dtype=np.int64)
+        self.sketch = type(self.sketch).from_dict(data["sketch"])
+        return self
+
+
+class NumericDriftAccumulator(DriftAccumulator):
+    """PSI or KS of a numeric column against a baseline QuantileSketch
+
+    Values that are not numbers are left out of both the counts and the
+    sketch.
+    """
+
+    def __init__(self, column, metric, threshold, baseline_path, baseline, bins=DEFAULT_BINS):
+        super().__init__(column, metric, threshold, baseline_path)
+        self.baseline = QuantileSketch.from_dict(baseline["quantiles"])
+        # Inner bin edges; tied quantiles (common for integers) merge their bins
+        cuts = self.baseline.quantiles(np.arange(1, bins) / bins)
+        self.edges = np.unique([cut for cut in cuts if cut is not None])
+        edge_shares = self.baseline.cdf(self.edges)
+        self.baseline_shares = np.diff(np.concatenate([[0.0], edge_shares, [1.0]]))
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.sketch = QuantileSketch(self.baseline.k)
+
+    def _update(self, values):
+        numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        numbers = numbers[np.isfinite(numbers)]
+        # Bin i holds (edges[i - 1], edges[i]], matching the baseline's cdf
+        self.counts += np.bincount(np.searchsorted(self.edges, numbers, side="left"), minlength=len(self.counts))
+        self.sketch.update(numbers)
+
+    def statistic(self):
+        if not self.baseline.count or not self.sketch.count:
+            return None
+        if self.metric == "psi":
+            return psi(self.baseline_shares, self.counts.astype(float))
+        points = np.union1d(self.baseline.items(), self.sketch.items())
+        return float(np.max(np.abs(self.baseline.cdf(points) - self.sketch.cdf(points))))
+
+    def drift_details(self):
+        if self.metric == "ks":
+            return {"baseline_count": self.baseline.count, "observed_count": self.sketch.count}
+        observed = self.counts / max(self.counts.sum(), 1)
+        lowers = [None] + self.edges.tolist()
+        uppers = self.edges.tolist() + [None]
+        return {"baseline_count": self.baseline.count, "observed_count": int(self.counts.sum()),
+                "bins": [{"lower": lower, "upper": upper, "baseline_share": float(expected),
+                          "observed_share": float(share)}
+                         for lower, upper, expected, share in zip(lowers, uppers, self.baseline_shares, observed)]}
+
+    def stored_sketch(self):
+        return {"quantiles": self.sketch.to_dict()}
+
+
+class CategoryDriftAccumulator(DriftAccumulator):
+    """Shift in the share of each value against a baseline TopKSketch
+
+    Counts of the baseline's values are exact; every other value falls in
+    one "other" bin. New values are also kept in a TopKSketch of ``top_k``
+    so they can be listed and become part of the next baseline.
+    """
+
+    def __init__(self, column, metric, threshold, baseline_path, baseline, top_k=DEFAULT_TOP_K):
+        super().__init__(column, metric, threshold, baseline_path)
+        self.baseline = TopKSketch.from_dict(baseline["top_values"])
+        self.baseline_count = baseline["count"]
+        self.categories = pd.Index(list(self.baseline.counters))
+        tracked = np.array(list(self.baseline.counters.values()), dtype=float)
+        self.baseline_counts = np.append(tracked, max(self.baseline_count - tracked.sum(), 0))
+        # One count per baseline value, then the other values
+        self.counts = np.zeros(len(self.categories) + 1, dtype=np.int64)
+        self.sketch = TopKSketch(top_k, top_k * TOP_K_CAPACITY_FACTOR)
+
+    def _update(self, values):
+        counts = normalize_keys(values.to_frame())[self.column].value_counts(sort=False)
+        positions = self.categories.get_indexer(counts.index)
+        # Values outside the baseline (position -1) go to the last, "other" bin
+        positions[positions < 0] = len(self.categories)
+        self.counts += np.bincount(positions, weights=counts.to_numpy(), minlength=len(self.counts)).astype(np.int64)
+        self.sketch.update_counts(counts)
+
+    def _shares(self):
+        observed = self.counts / max(self.counts.sum(), 1)
+        expected = self.baseline_counts / max(self.baseline_counts.sum(), 1)
+        return expected, observed
+
+    def statistic(self):
+        if not self.baseline_counts.sum() or not self.counts.sum():
+            return None
+        if self.metric == "psi":
+            return psi(self.baseline_counts, self.counts.astype(float))
+        expected, observed = self._shares()
+        return float(np.max(np.abs(observed - expected)))
+
+    def drift_details(self):
+        expected, observed = self._shares()
+        labels = self.categories.tolist() + [None]
+        order = np.argsort(-np.abs(observed - expected), kind="stable")[:REPORTED_SHIFTS]
+        order = [i for i in order.tolist() if expected[i] or observed[i]]
+        known = set(self.baseline.counters)
+        return {
+            "baseline_count": int(self.baseline_counts.sum()),
+            "observed_count": int(self.counts.sum()),
+            "baseline_exact": self.baseline.exact,
+            # value None stands for every value outside the baseline
+            "shifts": [{"value": labels[i], "baseline_share": float(expected[i]),
+                        "observed_share": float(observed[i])} for i in order],
+            "new_values": [value for value, _ in self.sketch.top() if value not in known]
+        }
+
+    def stored_sketch(self):
+        return {"top_values": self.sketch.to_dict(), "count": int(self.counts.sum())}
@@ -0,0 +1,263 @@
+"""Execution modes for quick pass/fail gating.
+
+Each expectation runs in one of three modes, chosen by
+``meta["opendq"]["execution_mode"]`` on the expectation or by the suite's
+``meta["opendq"]["execution"]["mode"]`` default:
+
+- ``full``: every row is checked (the default).
+- ``fail_fast``: the rule stops being evaluated once it has failed. With
+  ``mostly`` of 1 that is the first chunk holding a violation. With a lower
+  ``mostly`` it is once the rows checked so far (at least ``min_rows``)
+  exceed the allowed unexpected percent, so the verdict rests on a prefix
+  of the file. When every rule has stopped, reading stops too.
+- ``sample``: only a random sample of rows is checked, either a Bernoulli
+  sample of ``sample_fraction`` of the rows or, with ``stratify_by``, the
+  same fraction of every value of that column (at least one row each). The
+  reported ``unexpected_percent`` is an estimate, with a confidence
+  interval in the result details.
+
+Suite-level options live under ``meta["opendq"]["execution"]``:
+``mode``, ``sample_fraction``, ``stratify_by``, ``seed``, ``min_rows`` and
+``confidence``.
+"""
+import copy
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+EXECUTION_MODES = ("full", "fail_fast", "sample")
+DEFAULT_SAMPLE_FRACTION = 0.01
+DEFAULT_CONFIDENCE = 0.95
+# Rows a fail-fast rule with mostly < 1 checks before it may stop
+DEFAULT_MIN_ROWS = 10_000
+# Without an explicit chunk size, fail-fast runs still read in chunks so they can stop early
+DEFAULT_GATE_CHUNKSIZE = 100_000
+
+
+def with_execution(suite, **options):
+    """Return a copy of ``suite`` with the given execution options set"""
+    suite = copy.deepcopy(suite)
+    execution = suite.setdefault("meta", {}).setdefault("opendq", {}).setdefault("execution", {})
+    execution.update({key: value for key, value in options.items() if value is not None})
+    return suite
+
+
+def suite_execution(suite):
+    return suite.get("meta", {}).get("opendq", {}).get("execution", {})
+
+
+def _z_score(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(unexpected, checked, confidence=DEFAULT_CONFIDENCE):
+    """Wilson score interval for a proportion, as fractions"""
+    if checked == 0:
+        return 0.0, 1.0
+    z = _z_score(confidence)
+    p = unexpected / checked
+    denominator = 1 + z * z / checked
+    centre = (p + z * z / (2 * checked)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / checked + z * z / (4 * checked * checked)) / denominator
+    return max(centre - margin, 0.0), min(centre + margin, 1.0)
+
+
+class ChunkSample:
+    """Which rows of a chunk were sampled, and their strata"""
+
+    def __init__(self, mask, strata=None, population=None):
+        self.mask = mask
+        # Stratum label of each sampled row, or None for a Bernoulli sample
+        self.strata = strata
+        # Rows per stratum in the whole chunk
+        self.population = population if population is not None else {None: len(mask)}
+
+
+def _stratum_key(value):
+    # Every kind of missing value is one stratum
+    return None if pd.isna(value) else (value.item() if hasattr(value, "item") else value)
+
+
+class RowSampler:
+    """Draws the per-chunk row sample shared by all sampled rules of a plan
+
+    The sampler only holds settings; each run draws from its own generator
+    (see ``new_rng``), so a seed gives the same sample in every run, even
+    when a cached plan serves several runs at once. A run split into parts
+    (row ranges, row groups, partitions) gives each part its own stream of
+    the seed, so the parts do not all sample the same row offsets.
+    """
+
+    def __init__(self, fraction=DEFAULT_SAMPLE_FRACTION, stratify_by=None, seed=0):
+        if not 0 < fraction <= 1:
+            raise ValueError(f"sample_fraction must be in (0, 1], got {fraction}")
+        self.fraction = fraction
+        self.stratify_by = stratify_by
+        self.seed = seed
+
+    def new_rng(self, stream=None):
+        """A generator for a whole run, or for part number ``stream`` of one"""
+        if stream is None:
+            return np.random.default_rng(self.seed)
+        # The child SeedSequence(seed).spawn(n)[stream] would give, without making the n-1 others
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(stream,)))
+
+    def sample(self, df, rng):
+        mask = rng.random(len(df)) < self.fraction
+        if self.stratify_by is None:
+            return ChunkSample(mask)
+        codes, labels = pd.factorize(df[self.stratify_by], use_na_sentinel=False)
+        counts = np.bincount(codes, minlength=len(labels))
+        # Make sure every stratum present in the chunk is represented
+        hit = np.bincount(codes[mask], minlength=len(labels)) > 0
+        first_rows = np.unique(codes, return_index=True)[1]
+        mask[first_rows[~hit[codes[first_rows]]]] = True
+        keys = [_stratum_key(label) for label in labels]
+        population = {}
+        for key, count in zip(keys, counts.tolist()):
+            population[key] = population.get(key, 0) + count
+        return ChunkSample(mask, np.array(keys, dtype=object)[codes[mask]], population)
+
+
+class SampledAccumulator:
+    """Estimates a rule's unexpected percent from sampled rows, per stratum"""
+
+    def __init__(self, inner, sampler_options, confidence=DEFAULT_CONFIDENCE):
+        self.inner = inner
+        self.options = sampler_options
+        self.confidence = confidence
+        self.population_count = 0
+        # stratum -> [population rows, checked rows, unexpected rows]
+        self.strata = {}
+
+    def update(self, values, valid, missing, sample):
+        """Add the sampled rows of one chunk; ``sample`` is its ChunkSample"""
+        self.inner.update(values, valid, missing)
+        self.population_count += len(sample.mask)
+        invalid = ~np.asarray(valid, dtype=bool)
+        checked = ~missing if self.inner.track_missing else np.ones(len(invalid), dtype=bool)
+        invalid &= checked
+        for key, rows in sample.population.items():
+            self.strata.setdefault(key, [0, 0, 0])[0] += rows
+        if sample.strata is None:
+            totals = self.strata[None]
+            totals[1] += int(checked.sum())
+            totals[2] += int(invalid.sum())
+            return
+        frame = pd.DataFrame({"stratum": sample.strata, "checked": checked, "invalid": invalid})
+        grouped = frame.groupby("stratum", dropna=False, sort=False)[["checked", "invalid"]].sum()
+        for key, row in zip(grouped.index, grouped.itertuples(index=False)):
+            totals = self.strata[_stratum_key(key)]
+            totals[1] += int(row.checked)
+            totals[2] += int(row.invalid)
+
+    def add_passing(self, count, missing_count=0):
+        raise ValueError("Sampled rules cannot be settled from file statistics")
+
+    def merge(self, other):
+        self.inner.merge(other.inner)
+        self.population_count += other.population_count
+        for key, (population, checked, unexpected) in other.strata.items():
+            totals = self.strata.setdefault(key, [0, 0, 0])
+            totals[0] += population
+            totals[1] += checked
+            totals[2] += unexpected
+        return self
+
+    def estimate(self):
+        """Estimated unexpected fraction and its confidence interval"""
+        observed = [(population, checked, unexpected)
+                    for population, checked, unexpected in self.strata.values() if checked]
+        if not observed:
+            return 0.0, (0.0, 1.0)
+        if len(self.strata) == 1:
+            _, checked, unexpected = observed[0]
+            return unexpected / checked, wilson_interval(unexpected, checked, self.confidence)
+        # Stratified: weight each stratum's rate by its share of the rows
+        total = sum(population for population, _, _ in observed)
+        rate = variance = 0.0
+        for population, checked, unexpected in observed:
+            weight = population / total
+            stratum_rate = unexpected / checked
+            rate += weight * stratum_rate
+            variance += weight * weight * stratum_rate * (1 - stratum_rate) / checked
+        margin = _z_score(self.confidence) * math.sqrt(variance)
+        return rate, (max(rate - margin, 0.0), min(rate + margin, 1.0))
+
+    def unexpected_percent(self):
+        return self.estimate()[0] * 100
+
+    def to_result(self):
+        rate, (low, high) = self.estimate()
+        result = self.inner.to_result()
+        result["unexpected_percent"] = rate * 100
+        result["details"] = {
+            "sampling": "stratified" if self.options.get("stratify_by") else "bernoulli",
+            "stratify_by": self.options.get("stratify_by"),
+            "sample_fraction": self.options.get("sample_fraction", DEFAULT_SAMPLE_FRACTION),
+            "sampled_rows": self.inner.element_count,
+            "population_rows": self.population_count,
+            "confidence_level": self.confidence,
+            "unexpected_percent_interval": [low * 100, high * 100],
+        }
+        return result
+
+    def to_dict(self):
+        return {
+            "inner": self.inner.to_dict(),
+            "population_count": self.population_count,
+            "strata": [[key, *totals] for key, totals in self.strata.items()],
+        }
+
+    def load_dict(self, data):
+        self.inner.load_dict(data["inner"])
+        self.population_count = data["population_count"]
+        self.strata = {key: [population, checked, unexpected]
+                       for key, population, checked, unexpected in data["strata"]}
+        return self
+
+
+class FailFastAccumulator:
+    """Stops a rule once its failure is established"""
+
+    def __init__(self, inner, mostly=1, min_rows=DEFAULT_MIN_ROWS):
+        self.inner = inner
+        self.mostly = mostly
+        self.min_rows = min_rows
+        self.stopped = False
+
+    def update(self, values, valid, missing=None):
+        self.inner.update(values, valid, missing)
+        if self.inner.unexpected_count == 0:
+            return
+        checked = self.inner.element_count - self.inner.missing_count
+        if self.mostly >= 1 or (checked >= self.min_rows
+                                and self.inner.unexpected_percent() > (1 - self.mostly) * 100):
+            self.stopped = True
+
+    def add_passing(self, count, missing_count=0):
+        self.inner.add_passing(count, missing_count)
+
+    def merge(self, other):
+        self.inner.merge(other.inner)
+        self.stopped = self.stopped or other.stopped
+        return self
+
+    def unexpected_percent(self):
+        return self.inner.unexpected_percent()
+
+    def to_result(self):
+        result = self.inner.to_result()
+        # Counts cover only the rows checked before the rule stopped
+        result["details"] = {"stopped_early": self.stopped}
+        return result
+
+    def to_dict(self):
+        return {"inner": self.inner.to_dict(), "stopped": self.stopped}
+
+    def load_dict(self, data):
+        self.inner.load_dict(data["inner"])
+        self.stopped = data["stopped"]
+        return self
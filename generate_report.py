@@ -1,23 +1,13 @@
-import json
+import argparse
+import html
 from datetime import datetime
 
-def generate_html_report():
-    # Load validation results
-    with open('validation_results.json', 'r') as f:
-        results = json.load(f)
-    
-    # Extract data
-    validation = results["validation_results"]
-    total_expectations = validation["statistics"]["evaluated_expectations"]
-    successful_expectations = validation["statistics"]["successful_expectations"]
-    failed_expectations = total_expectations - successful_expectations
-    success_rate = (successful_expectations / total_expectations) * 100 if total_expectations > 0 else 0
-    
-    # Current date and time
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Generate HTML
-    html = f"""<!DOCTYPE html>
+from results_io import iter_expectations, read_summary
+
+# Unexpected values listed per expectation; the rest are summarised as a count
+MAX_UNEXPECTED_VALUES = 20
+
+REPORT_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -139,77 +129,138 @@ def generate_html_report():
         
         <h2>Detailed Results</h2>
         """
-    
-    # Add each expectation to the HTML
-    for exp in validation["expectations"]:
-        status = "passed" if exp["success"] else "failed"
-        status_badge = "Passed" if exp["success"] else "Failed"
-        badge_class = "passed-badge" if exp["success"] else "failed-badge"
-        
-        html += f"""
+
+EXPECTATION_TEMPLATE = """
         <div class="expectation {status}">
             <div class="expectation-header">
-                <h3>{exp['meta']['description']}</h3>
+                <h3>{description}</h3>
                 <span class="status-badge {badge_class}">{status_badge}</span>
             </div>
             <div class="expectation-details">
                 <table>
                     <tr>
                         <th>Expectation Type</th>
-                        <td>{exp['expectation_type']}</td>
+                        <td>{expectation_type}</td>
                     </tr>
                     <tr>
                         <th>Column</th>
-                        <td>{exp['meta']['column']}</td>
+                        <td>{column}</td>
                     </tr>
                     <tr>
                         <th>Elements Checked</th>
-                        <td>{exp['result']['element_count']}</td>
+                        <td>{element_count}</td>
                     </tr>
                     <tr>
                         <th>Unexpected Count</th>
-                        <td>{exp['result']['unexpected_count']}</td>
+                        <td>{unexpected_count}</td>
                     </tr>
                     <tr>
                         <th>Unexpected %</th>
-                        <td>{exp['result']['unexpected_percent']:.2f}%</td>
+                        <td>{unexpected_percent:.2f}%</td>
                     </tr>"""
-        
-        if not exp["success"] and exp["result"]["partial_unexpected_list"]:
-            html += """
-                    <tr>
-                        <th>Unexpected Values</th>
-                        <td>"""
-            
-            # Add unexpected values as a list
-            html += "<ul>"
-            for val in exp["result"]["partial_unexpected_list"]:
-                html += f"<li>{val}</li>"
-            html += "</ul>"
-            
-            html += """
-                        </td>
-                    </tr>"""
-        
-        html += """
-                </table>
-            </div>
-        </div>"""
-    
-    # Add footer
-    html += f"""
+
+REPORT_FOOT = """
         <div class="footer">
             <p>Validation completed on {current_time}</p>
         </div>
     </div>
 </body>
 </html>"""
+
+
+def _escape(value):
+    return html.escape(str(value), quote=False)
+
+
+def summarize(results_path):
+    """Return the total and successful expectation counts of a results file"""
+    statistics = read_summary(results_path).get("statistics") or {}
+    if "evaluated_expectations" in statistics and "successful_expectations" in statistics:
+        return statistics["evaluated_expectations"], statistics["successful_expectations"]
+    # Without statistics, count them in one streaming pass
+    total = successful = 0
+    for exp in iter_expectations(results_path):
+        total += 1
+        successful += 1 if exp["success"] else 0
+    return total, successful
+
+
+def write_unexpected_values(out, result, max_values):
+    """Write at most ``max_values`` unexpected values and how many there were in total"""
+    values = result["partial_unexpected_list"]
+    out.write("""
+                    <tr>
+                        <th>Unexpected Values</th>
+                        <td><ul>""")
+    shown = values[:max_values]
+    for val in shown:
+        out.write(f"<li>{_escape(val)}</li>")
+    out.write("</ul>")
+    if result["unexpected_count"] > len(shown):
+        out.write(f"<p>Showing {len(shown)} of {result['unexpected_count']} unexpected values</p>")
+    out.write("""
+                        </td>
+                    </tr>""")
+
+
+def write_expectation(out, exp, max_unexpected_values):
+    out.write(EXPECTATION_TEMPLATE.format(
+        status="passed" if exp["success"] else "failed",
+        status_badge="Passed" if exp["success"] else "Failed",
+        badge_class="passed-badge" if exp["success"] else "failed-badge",
+        description=_escape(exp['meta']['description']),
+        expectation_type=_escape(exp['expectation_type']),
+        column=_escape(exp['meta']['column']),
+        element_count=exp['result']['element_count'],
+        unexpected_count=exp['result']['unexpected_count'],
+        unexpected_percent=exp['result']['unexpected_percent'],
+    ))
+    if not exp["success"] and exp["result"]["partial_unexpected_list"]:
+        write_unexpected_values(out, exp["result"], max_unexpected_values)
+    out.write("""
+                </table>
+            </div>
+        </div>""")
+
+
+def generate_html_report(results_path='validation_results.json', output_path='validation_report.html',
+                         max_unexpected_values=MAX_UNEXPECTED_VALUES):
+    """Render the results as HTML, streaming one expectation at a time
+
+    Expectations are read one at a time from JSON or NDJSON results, so
+    memory use does not grow with the number of expectations.
+    """
+    # Extract summary data
+    total_expectations, successful_expectations = summarize(results_path)
+    failed_expectations = total_expectations - successful_expectations
+    success_rate = (successful_expectations / total_expectations) * 100 if total_expectations > 0 else 0
     
-    # Save the HTML report
-    with open('validation_report.html', 'w') as f:
-        f.write(html)
+    # Current date and time
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    with open(output_path, 'w') as out:
+        out.write(REPORT_HEAD.format(
+            current_time=current_time,
+            total_expectations=total_expectations,
+            successful_expectations=successful_expectations,
+            failed_expectations=failed_expectations,
+            success_rate=success_rate,
+        ))
+        for exp in iter_expectations(results_path):
+            write_expectation(out, exp, max_unexpected_values)
+        out.write(REPORT_FOOT.format(current_time=current_time))
     
-    print(f"HTML report generated: validation_report.html")
+    print(f"HTML report generated: {output_path}")
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Render validation results as an HTML report")
+    parser.add_argument("--results", default="validation_results.json", help="Validation results file (JSON or NDJSON)")
+    parser.add_argument("--output", default="validation_report.html", help="HTML file to write")
+    parser.add_argument("--max-unexpected-values", type=int, default=MAX_UNEXPECTED_VALUES,
+                        help="Unexpected values listed per expectation")
+    args = parser.parse_args(argv)
+    generate_html_report(args.results, args.output, args.max_unexpected_values)
+
 
 if __name__ == "__main__":
-    generate_html_report()
+    main()
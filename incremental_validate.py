@@ -0,0 +1,186 @@
+"""Incremental validation that only re-checks CSV chunks that changed.
+
+The data rows are cut into chunks of a fixed number of lines and each chunk
+is fingerprinted with a BLAKE2 hash of its bytes. A JSON state file keeps,
+per chunk, its hash and the plan state (counts and first-N samples) it
+produced. On the next run only chunks whose hash is new (edited or
+appended rows) are parsed and validated; the rest reuse their cached
+states, and all states are merged in file order into the same results a
+full run would give.
+
+Finding chunks needs one sequential read of the file, but no parsing,
+which is the expensive part. Changing the suite, sample size, chunk size or
+header invalidates the whole cache.
+
+Chunks are cut at every newline, so records must not contain quoted line
+breaks. Only CSV input is supported, and every rule's counts must be
+cacheable (exact uniqueness is not; use the approximate mode).
+"""
+import copy
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from parallel_validate import validate_range
+from execution import suite_execution
+from readers import input_format
+from rule_suite import compile_suite
+from validation_stream import DEFAULT_SAMPLE_SIZE
+
+DEFAULT_CHUNK_ROWS = 100_000
+STATE_VERSION = 2
+# Bytes read at a time while scanning for chunk boundaries
+SCAN_BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def default_state_path(path):
+    return path + ".validation_state.json"
+
+
+def scan_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, block_size=SCAN_BLOCK_SIZE):
+    """Split the data rows into chunks of ``chunk_rows`` lines
+
+    Returns the header bytes and a list of ``(start, end, digest)`` byte
+    ranges. The last chunk may be shorter.
+    """
+    chunks = []
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = offset = f.tell()
+        digest = hashlib.blake2b(digest_size=16)
+        lines = 0
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+            position = 0
+            # Newlines that complete a chunk: the one finishing the current
+            # chunk, then every chunk_rows-th after it
+            for cut in newlines[chunk_rows - lines - 1::chunk_rows].tolist():
+                digest.update(block[position:cut + 1])
+                chunks.append((start, offset + cut + 1, digest.hexdigest()))
+                start = offset + cut + 1
+                position = cut + 1
+                digest = hashlib.blake2b(digest_size=16)
+            lines = (lines + len(newlines)) % chunk_rows
+            digest.update(block[position:])
+            offset += len(block)
+        if offset > start:
+            chunks.append((start, offset, digest.hexdigest()))
+    return header, chunks
+
+
+def _without_profile(suite):
+    """The suite without the profile flag, which does not change any counts"""
+    if "profile" not in suite_execution(suite):
+        return suite
+    suite = copy.deepcopy(suite)
+    meta = suite["meta"]
+    del meta["opendq"]["execution"]["profile"]
+    # Drop the containers the flag alone created, so toggling it keeps the cache
+    for parent, key in ((meta["opendq"], "execution"), (meta, "opendq"), (suite, "meta")):
+        if not parent[key]:
+            del parent[key]
+    return suite
+
+
+def suite_fingerprint(suite, sample_size, chunk_rows, header, external_inputs=None):
+    """Identify everything a cached chunk state depends on besides its bytes
+
+    ``external_inputs`` (from ValidationPlan.external_inputs) covers reference
+    files and other state outside the suite.
+    """
+    key = json.dumps({"suite": _without_profile(suite), "sample_size": sample_size, "chunk_rows": chunk_rows,
+                      "header": header.decode('utf-8', 'replace'), "version": STATE_VERSION,
+                      "external_inputs": external_inputs},
+                     sort_keys=True, default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def load_state_file(state_path, fingerprint):
+    """Return the cached chunk states by digest, or nothing if the cache is stale"""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, 'r') as f:
+        saved = json.load(f)
+    if saved.get("fingerprint") != fingerprint:
+        return {}
+    return {chunk["digest"]: chunk["state"] for chunk in saved["chunks"]}
+
+
+def save_state_file(state_path, fingerprint, chunks, states):
+    data = {
+        "fingerprint": fingerprint,
+        "chunks": [
+            {"start": start, "end": end, "digest": digest, "state": state}
+            for (start, end, digest), state in zip(chunks, states)
+        ]
+    }
+    # Write to a temporary file first so a crash never leaves a torn cache
+    temp_path = state_path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, state_path)
+
+
+def chunk_stream(digest):
+    """Sampling stream of a chunk, taken from its hash so a cached state is what re-validating gives"""
+    return int(digest, 16)
+
+
+def check_incremental(path, plan):
+    """Reject input and rules an incremental run cannot handle, before any scanning"""
+    file_format = input_format(path)
+    if file_format != "csv":
+        raise ValueError(f"Incremental validation supports CSV input, not {file_format} ({path})")
+    for rule, accumulator in zip(plan.rules, plan.new_state().accumulators):
+        try:
+            accumulator.to_dict()
+        except ValueError as e:
+            raise ValueError(f"{rule.expectation_type} on {', '.join(rule.columns)} cannot run "
+                             f"incrementally: {e}") from e
+
+
+def validate_incremental(path, suite, state_path=None, sample_size=DEFAULT_SAMPLE_SIZE,
+                         chunk_rows=DEFAULT_CHUNK_ROWS, workers=1):
+    """Validate ``path`` re-checking only changed or appended chunks
+
+    Returns the compiled plan, the merged state and the number of chunks
+    that had to be validated. ``path`` must be a CSV without quoted line
+    breaks; see the module docstring.
+    """
+    state_path = state_path or default_state_path(path)
+    plan = compile_suite(suite, sample_size=sample_size)
+    check_incremental(path, plan)
+    header, chunks = scan_chunks(path, chunk_rows)
+    fingerprint = suite_fingerprint(suite, sample_size, chunk_rows, header, plan.external_inputs())
+    cached = load_state_file(state_path, fingerprint)
+
+    stale = [chunk for chunk in chunks if chunk[2] not in cached]
+    fresh = {}
+    if workers > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {digest: pool.submit(validate_range, path, start, end, suite, sample_size, chunk_rows,
+                                           chunk_stream(digest))
+                       for start, end, digest in stale}
+            fresh = {digest: future.result() for digest, future in futures.items()}
+    else:
+        for start, end, digest in stale:
+            fresh[digest] = validate_range(path, start, end, suite, sample_size, chunk_rows, chunk_stream(digest))
+
+    state = plan.new_state()
+    chunk_states = []
+    for _, _, digest in chunks:
+        if digest in fresh:
+            # Merge the fresh state itself so its timings are kept
+            chunk_states.append(fresh[digest].to_dict())
+            state.merge(fresh[digest])
+        else:
+            chunk_states.append(cached[digest])
+            state.merge(plan.new_state().load_dict(cached[digest]))
+    save_state_file(state_path, fingerprint, chunks, chunk_states)
+    return plan, state, len(stale)
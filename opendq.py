@@ -0,0 +1,50 @@
+"""Single command-line entry point for the openDQ tools.
+
+Each subcommand lives in its own module, which is imported only when that
+subcommand runs, so ``opendq report`` never pays for pandas and nothing but
+``opendq checkpoint`` touches Great Expectations::
+
+    python opendq.py validate --input data/customers.csv --workers 4
+    python opendq.py sql --database customers.db --table customers
+    python opendq.py report --results validation_results.json
+    python opendq.py batch --glob "data/customers_*_part*.csv" --workers 8
+    python opendq.py profile --input data/customers.csv --suite-output profiled_suite.json
+    python opendq.py serve --port 8765
+    python opendq.py checkpoint
+    python opendq.py history trend --rule valid_email_format --since 90d
+"""
+import argparse
+import importlib
+
+# Subcommand -> (module with a ``main(argv, prog)`` function, description)
+COMMANDS = {
+    "validate": ("validate_with_pandas", "Validate a CSV, Parquet or Arrow file with the pandas engine"),
+    "sql": ("sql_backend", "Validate a SQLite or DuckDB table inside the database"),
+    "report": ("generate_report", "Render validation results as an HTML report"),
+    "batch": ("batch_validate", "Validate many partition files concurrently"),
+    "profile": ("profile_data", "Profile the columns of a data file in one pass"),
+    "serve": ("validation_server", "Run the resident validation server"),
+    "checkpoint": ("validate_data", "Run the customers checkpoint with Great Expectations"),
+    "history": ("results_history", "Query the history of validation results"),
+}
+
+
+def load_command(name):
+    """Import the module implementing a subcommand"""
+    return importlib.import_module(COMMANDS[name][0])
+
+
+def main(argv=None):
+    commands = "\n".join(f"  {name:<12}{description}" for name, (_, description) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="opendq", description="openDQ data validation tools",
+        epilog=f"commands:\n{commands}\n\nRun 'opendq <command> --help' for the options of a command.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=COMMANDS, metavar="command", help="one of: " + ", ".join(COMMANDS))
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    load_command(args.command).main(args.args, prog=f"opendq {args.command}")
+
+
+if __name__ == "__main__":
+    main()
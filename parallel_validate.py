@@ -0,0 +1,139 @@
+"""Validate a file across CPU cores by splitting it into row ranges.
+
+A CSV is cut into row-aligned byte ranges and a Parquet file into runs of
+row groups. Each range is validated in a worker process with the same
+compiled plan, and the per-range states are merged in file order. Counts
+and percentages therefore match a single-process run exactly, and the
+first-N unexpected samples are the first N in the file, whatever order the
+workers finish in.
+
+CSV ranges are aligned on newlines, so records should not contain quoted
+line breaks. When a range fails to parse because such a record was split,
+the file is validated in a single process instead; a split that happens to
+parse cannot be detected, so validate those files without workers.
+"""
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from readers import import_pyarrow, input_format, run_parquet, run_plan
+from rule_suite import compile_suite
+from validation_stream import DEFAULT_SAMPLE_SIZE
+
+# Rows per chunk inside a worker, so each worker's memory stays bounded
+DEFAULT_WORKER_CHUNKSIZE = 100_000
+# Ranges per worker; a few per worker keeps the pool busy when ranges are uneven
+RANGES_PER_WORKER = 4
+
+
+class RangeFile(io.RawIOBase):
+    """A read-only view of bytes ``[start, end)`` of a file"""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def read_header(path):
+    """Return the column names and the byte offset where the data starts"""
+    with open(path, 'rb') as f:
+        line = f.readline()
+        return next(csv.reader([line.decode('utf-8-sig')])), f.tell()
+
+
+def split_ranges(path, parts):
+    """Split the data rows of a CSV into up to ``parts`` newline-aligned byte ranges"""
+    _, data_start = read_header(path)
+    size = os.path.getsize(path)
+    boundaries = [data_start]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(max(data_start + (size - data_start) * i // parts - 1, boundaries[-1]))
+            # Move to the start of the next line so no row is split
+            f.readline()
+            boundaries.append(max(f.tell(), boundaries[-1]))
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def read_range_chunks(path, start, end, usecols=None, chunksize=None, dtype=None):
+    """Yield the rows in one byte range as DataFrames of at most ``chunksize`` rows"""
+    names, _ = read_header(path)
+    with io.BufferedReader(RangeFile(path, start, end)) as f:
+        with pd.read_csv(f, header=None, names=names, usecols=usecols, dtype=dtype,
+                         chunksize=chunksize or DEFAULT_WORKER_CHUNKSIZE) as reader:
+            yield from reader
+
+
+def validate_range(path, start, end, suite, sample_size=DEFAULT_SAMPLE_SIZE, chunksize=None, stream=None):
+    """Validate the rows in one byte range and return the plan state
+
+    ``stream`` numbers the range, so each range samples rows independently.
+    """
+    plan = compile_suite(suite, sample_size=sample_size)
+    return plan.run(read_range_chunks(path, start, end, plan.columns, chunksize, plan.csv_dtypes()), stream)
+
+
+def split_row_groups(path, parts):
+    """Split a Parquet file's row groups into up to ``parts`` contiguous runs"""
+    pa = import_pyarrow()
+    count = pa.parquet.ParquetFile(path).num_row_groups
+    bounds = sorted({count * i // parts for i in range(parts + 1)})
+    return [list(range(start, end)) for start, end in zip(bounds, bounds[1:])]
+
+
+def validate_row_groups(path, row_groups, suite, sample_size=DEFAULT_SAMPLE_SIZE, chunksize=None, stream=None):
+    """Validate a run of Parquet row groups and return the plan state"""
+    plan = compile_suite(suite, sample_size=sample_size)
+    return run_parquet(plan, path, chunksize, row_groups=row_groups, stream=stream)
+
+
+def validate_parallel(path, suite, workers, sample_size=DEFAULT_SAMPLE_SIZE, chunksize=None):
+    """Validate ``path`` in a pool of ``workers`` processes and merge the states in order"""
+    plan = compile_suite(suite, sample_size=sample_size)
+    file_format = input_format(path)
+    if file_format == "parquet":
+        tasks = [(validate_row_groups, (path, row_groups))
+                 for row_groups in split_row_groups(path, workers * RANGES_PER_WORKER)]
+    elif file_format == "csv":
+        tasks = [(validate_range, (path, start, end))
+                 for start, end in split_ranges(path, workers * RANGES_PER_WORKER)]
+    else:
+        raise ValueError(f"Parallel validation supports CSV and Parquet input, not {file_format}")
+    state = plan.new_state()
+    if not tasks:
+        return plan, state
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(task, *args, suite, sample_size, chunksize, stream)
+            for stream, (task, args) in enumerate(tasks)
+        ]
+        try:
+            for future in futures:
+                state.merge(future.result())
+        except pd.errors.ParserError:
+            if file_format != "csv":
+                raise
+            pool.shutdown(cancel_futures=True)
+            # A quoted line break was split between ranges: read the file whole
+            return plan, run_plan(plan, path, chunksize)
+    return plan, state
@@ -0,0 +1,299 @@
+"""Profile a CSV, Parquet or Arrow file in one streaming pass.
+
+Each column gets null counts, min/max, approximate quantiles, a
+log-bucket histogram, its most frequent values and a distinct-count
+estimate, all built from mergeable sketches so chunks can be profiled in a
+process pool and combined. The profile is written as JSON and can seed an
+expectation suite for ``validate_with_pandas.py --suite``.
+"""
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from parallel_validate import RANGES_PER_WORKER, read_range_chunks, split_ranges, split_row_groups
+from readers import import_pyarrow, input_format, iter_arrow_frames
+from sketches import DEFAULT_TOP_K, LogHistogram, QuantileSketch, TopKSketch
+from string_rules import as_strings
+from uniqueness import HyperLogLogAccumulator, normalize_keys
+from validation_stream import read_chunks
+
+PROFILE_QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+# Largest number of distinct values for which a column is seeded with an in_set rule
+MAX_SEEDED_SET_SIZE = 20
+
+
+class ColumnProfile:
+    """Mergeable sketches of one column"""
+
+    def __init__(self, name, top_k=DEFAULT_TOP_K):
+        self.name = name
+        self.count = 0
+        self.null_count = 0
+        self.numeric_count = 0
+        self.minimum = None
+        self.maximum = None
+        self.total = 0.0
+        self.min_length = None
+        self.max_length = None
+        self.quantiles = QuantileSketch()
+        self.histogram = LogHistogram()
+        self.top_values = TopKSketch(top_k)
+        self.distinct = HyperLogLogAccumulator([name])
+
+    def update(self, series):
+        missing = series.isna().to_numpy()
+        present = series[~missing]
+        self.count += len(series)
+        self.null_count += int(missing.sum())
+        self.distinct.update_frame(series.to_frame())
+        if present.empty:
+            return
+        self.top_values.update(normalize_keys(present.to_frame())[self.name])
+
+        numbers = pd.to_numeric(present, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        numbers = numbers[np.isfinite(numbers)]
+        if len(numbers):
+            self.numeric_count += len(numbers)
+            self.total += float(numbers.sum())
+            self.minimum = min(_drop_none([self.minimum, float(numbers.min())]))
+            self.maximum = max(_drop_none([self.maximum, float(numbers.max())]))
+            self.quantiles.update(numbers)
+            self.histogram.update(numbers)
+        if not pd.api.types.is_numeric_dtype(present):
+            lengths = as_strings(present).str.len()
+            self.min_length = min(_drop_none([self.min_length, int(lengths.min())]))
+            self.max_length = max(_drop_none([self.max_length, int(lengths.max())]))
+
+    def merge(self, other):
+        self.count += other.count
+        self.null_count += other.null_count
+        self.numeric_count += other.numeric_count
+        self.total += other.total
+        self.minimum = min(_drop_none([self.minimum, other.minimum]), default=None)
+        self.maximum = max(_drop_none([self.maximum, other.maximum]), default=None)
+        self.min_length = min(_drop_none([self.min_length, other.min_length]), default=None)
+        self.max_length = max(_drop_none([self.max_length, other.max_length]), default=None)
+        self.quantiles.merge(other.quantiles)
+        self.histogram.merge(other.histogram)
+        self.top_values.merge(other.top_values)
+        self.distinct.merge(other.distinct)
+        return self
+
+    @property
+    def is_numeric(self):
+        """True when every non-null value parsed as a number"""
+        return self.numeric_count > 0 and self.numeric_count == self.count - self.null_count
+
+    def to_dict(self):
+        profile = {
+            "type": "numeric" if self.is_numeric else "string",
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_percent": (self.null_count / self.count) * 100 if self.count > 0 else 0,
+            "distinct_count_estimate": self.distinct.distinct_estimate(),
+            "top_values": [{"value": value, "count": count} for value, count in self.top_values.top()],
+            "top_values_exact": self.top_values.exact,
+        }
+        if self.numeric_count:
+            profile.update({
+                "numeric_count": self.numeric_count,
+                "min": self.minimum,
+                "max": self.maximum,
+                "mean": self.total / self.numeric_count,
+                "quantiles": dict(zip(map(str, PROFILE_QUANTILES), self.quantiles.quantiles(PROFILE_QUANTILES))),
+                "histogram": [{"lower": lower, "upper": upper, "count": count}
+                              for lower, upper, count in self.histogram.buckets()],
+            })
+        if self.min_length is not None:
+            profile.update({"min_length": self.min_length, "max_length": self.max_length})
+        # The raw sketches, so later profiles can be compared or merged
+        profile["sketches"] = {
+            "quantiles": self.quantiles.to_dict(),
+            "histogram": self.histogram.to_dict(),
+            "top_values": self.top_values.to_dict(),
+            "distinct": self.distinct.to_dict(),
+        }
+        return profile
+
+
+def _drop_none(values):
+    return [value for value in values if value is not None]
+
+
+class DatasetProfile:
+    """Column profiles of a whole file, built chunk by chunk"""
+
+    def __init__(self, top_k=DEFAULT_TOP_K):
+        self.top_k = top_k
+        self.total_records = 0
+        self.columns = {}
+
+    def update(self, df):
+        self.total_records += len(df)
+        for name in df.columns:
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(name, self.top_k)
+            self.columns[name].update(df[name])
+        return self
+
+    def merge(self, other):
+        self.total_records += other.total_records
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        return self
+
+    def to_dict(self, source=None):
+        return {
+            "profile": {
+                "source": source,
+                "total_records": self.total_records,
+                "columns": {name: column.to_dict() for name, column in self.columns.items()}
+            }
+        }
+
+
+def profile_frames(frames, top_k=DEFAULT_TOP_K):
+    profile = DatasetProfile(top_k)
+    for df in frames:
+        profile.update(df)
+    return profile
+
+
+def profile_range(path, start, end, columns=None, chunksize=None, top_k=DEFAULT_TOP_K):
+    """Profile the rows of one CSV byte range"""
+    return profile_frames(read_range_chunks(path, start, end, columns, chunksize), top_k)
+
+
+def _parquet_frames(path, columns=None, chunksize=None, row_groups=None):
+    pa = import_pyarrow()
+    parquet_file = pa.parquet.ParquetFile(path)
+    if row_groups is None:
+        row_groups = range(parquet_file.num_row_groups)
+    for index in row_groups:
+        batch_size = chunksize or parquet_file.metadata.row_group(index).num_rows
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=[index], columns=columns):
+            yield batch.to_pandas()
+
+
+def profile_row_groups(path, row_groups, columns=None, chunksize=None, top_k=DEFAULT_TOP_K):
+    """Profile a run of Parquet row groups"""
+    return profile_frames(_parquet_frames(path, columns, chunksize, row_groups), top_k)
+
+
+def profile_data(path, columns=None, chunksize=None, workers=1, top_k=DEFAULT_TOP_K):
+    """Profile ``columns`` (all by default) of a CSV, Parquet or Arrow file in one pass"""
+    file_format = input_format(path)
+    if workers > 1 and file_format != "arrow":
+        if file_format == "parquet":
+            tasks = [(profile_row_groups, (path, row_groups))
+                     for row_groups in split_row_groups(path, workers * RANGES_PER_WORKER)]
+        else:
+            tasks = [(profile_range, (path, start, end))
+                     for start, end in split_ranges(path, workers * RANGES_PER_WORKER)]
+        profile = DatasetProfile(top_k)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(task, *args, columns, chunksize, top_k) for task, args in tasks]
+            for future in futures:
+                profile.merge(future.result())
+        return profile
+    if file_format == "parquet":
+        return profile_frames(_parquet_frames(path, columns, chunksize), top_k)
+    if file_format == "arrow":
+        return profile_frames(iter_arrow_frames(path, columns, chunksize), top_k)
+    return profile_frames(read_chunks(path, chunksize, usecols=columns), top_k)
+
+
+def _plain_number(value):
+    return int(value) if float(value).is_integer() else value
+
+
+def suggest_suite(profile, suite_name="profiled_suite", max_set_size=MAX_SEEDED_SET_SIZE):
+    """Seed an expectation suite from a profile dict
+
+    Columns without nulls get ``not_null``, numeric columns a ``between``
+    rule over the observed range, and text columns with a small, exactly
+    counted set of values an ``in_set`` rule. The suite is a starting point
+    to review, not a statement of what the data should be.
+    """
+    profile = profile["profile"]
+    expectations = []
+    for name, column in profile["columns"].items():
+        if column["null_count"] == 0:
+            expectations.append({
+                "expectation_type": "expect_column_values_to_not_be_null",
+                "kwargs": {"column": name},
+                "meta": {}
+            })
+        if column["type"] == "numeric":
+            expectations.append({
+                "expectation_type": "expect_column_values_to_be_between",
+                "kwargs": {"column": name, "min_value": _plain_number(column["min"]),
+                           "max_value": _plain_number(column["max"])},
+                "meta": {}
+            })
+        elif column["top_values_exact"]:
+            # Exact counters hold every distinct value; top_values only the first top_k
+            values = [value for value, _ in column["sketches"]["top_values"]["counters"]]
+            if 0 < len(values) <= max_set_size and len(values) < column["count"] - column["null_count"]:
+                expectations.append({
+                    "expectation_type": "expect_column_values_to_be_in_set",
+                    "kwargs": {"column": name, "value_set": sorted(values)},
+                    "meta": {}
+                })
+    return {
+        "expectation_suite_name": suite_name,
+        "expectations": expectations,
+        "meta": {"profiled_from": profile["source"], "total_records": profile["total_records"]}
+    }
+
+
+def write_profile(profile, output_path="profile.json", suite_path=None, source=None):
+    """Write the profile JSON and, with ``suite_path``, a suite seeded from it"""
+    data = profile.to_dict(source)
+    with open(output_path, "w") as f:
+        json.dump(data, f, indent=2)
+    if suite_path:
+        with open(suite_path, "w") as f:
+            json.dump(suggest_suite(data), f, indent=2)
+    return data
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Profile the columns of a data file in one pass")
+    parser.add_argument("--input", default="data/customers.csv", help="CSV, Parquet or Arrow file to profile")
+    parser.add_argument("--columns", nargs="+", help="Columns to profile (default: all)")
+    parser.add_argument("--chunksize", type=int, help="Stream the file in chunks of this many rows")
+    parser.add_argument("--workers", type=int, default=1, help="Profile row ranges in this many processes")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Number of frequent values to report")
+    parser.add_argument("--output", default="profile.json", help="Where to write the profile")
+    parser.add_argument("--suite-output", help="Also write an expectation suite seeded from the profile")
+    args = parser.parse_args(argv)
+
+    profile = profile_data(args.input, columns=args.columns, chunksize=args.chunksize,
+                           workers=args.workers, top_k=args.top_k)
+    data = write_profile(profile, args.output, args.suite_output, source=args.input)
+
+    print("\nColumn Profile:")
+    print("=" * 50)
+    print(f"Total Records: {data['profile']['total_records']}")
+    for name, column in data["profile"]["columns"].items():
+        print(f"\n{name} ({column['type']})")
+        print(f"   - Nulls: {column['null_count']} ({column['null_percent']:.2f}%)")
+        print(f"   - Distinct (approx.): {column['distinct_count_estimate']}")
+        if "min" in column:
+            print(f"   - Range: {column['min']} to {column['max']}, median {column['quantiles']['0.5']}")
+        top = ", ".join(f"{item['value']} ({item['count']})" for item in column["top_values"][:5])
+        print(f"   - Most frequent: {top}")
+    print(f"\nProfile saved to: {args.output}")
+    if args.suite_output:
+        print(f"Seeded suite saved to: {args.suite_output}")
+
+
+if __name__ == "__main__":
+    main()
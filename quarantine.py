@@ -0,0 +1,293 @@
+"""Row-level failure output: quarantine and clean-row files written in the validation pass.
+
+The results only keep the first ``sample_size`` unexpected values per
+expectation. With a QuarantineWriter every failing row is also written to a
+columnar quarantine file while the input streams, with:
+
+- ``_row``: the row's 0-based position in the input (header excluded)
+- ``_failed_rules``: the IDs of every rule the row failed (see ``rule_ids``)
+- with ``full_rows``, every column of the row as read
+
+and every row that failed no rule goes to the optional clean-rows file, so
+no second filtering pass over the input is needed. Rows are buffered and
+written ``batch_rows`` at a time, one Parquet row group or Arrow record
+batch per flush. Both files are written under temporary names and renamed
+when the run finishes, so a crash never leaves a half-written file under
+the final name.
+
+A row fails a rule when it counts towards the rule's ``unexpected_count``;
+values treated as missing do not. Uniqueness rules are not quarantined, as
+which rows are duplicates is only known after the last row.
+
+The quarantine file is Parquet (``.parquet``) or Arrow IPC (``.arrow``,
+``.feather``); the clean-rows file may also be CSV. Needs pyarrow. Column
+types follow the first chunk and are widened when a later CSV chunk reads a
+column differently (say, as text after a first chunk where it was empty);
+rows already written are converted then.
+"""
+import json
+import os
+
+import numpy as np
+
+from instrumentation import timed_phase
+from readers import import_pyarrow, input_format, read_frames
+
+DEFAULT_BATCH_ROWS = 100_000
+ROW_COLUMN = "_row"
+RULES_COLUMN = "_failed_rules"
+
+
+def _promote_type(pa, old, new):
+    """A type holding values of both types; text when no number or null type does"""
+    if old == new:
+        return old
+    try:
+        fields = [pa.schema([pa.field("value", old)]), pa.schema([pa.field("value", new)])]
+        return pa.unify_schemas(fields, promote_options="permissive").field("value").type
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return pa.large_string()
+
+
+def _promote_schema(pa, old, new):
+    if old.names != new.names:
+        raise ValueError(f"The columns changed between chunks: {old.names} became {new.names}")
+    return pa.schema([pa.field(field.name, _promote_type(pa, field.type, new.field(field.name).type))
+                      for field in old])
+
+
+def _written_tables(pa, path, file_format):
+    """The row groups or record batches of a Parquet or Arrow file, one table each"""
+    if file_format == "parquet":
+        parquet_file = pa.parquet.ParquetFile(path)
+        for index in range(parquet_file.num_row_groups):
+            yield parquet_file.read_row_group(index)
+    else:
+        with pa.memory_map(path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield pa.Table.from_batches([reader.get_batch(index)])
+
+
+def rule_ids(plan):
+    """A readable, unique ID per rule: its result type, plus the column when types repeat"""
+    types = [rule.result_type for rule in plan.rules]
+    ids = [t if types.count(t) == 1 else f"{t}:{rule.meta['column']}" for t, rule in zip(types, plan.rules)]
+    return [rule_id if ids.count(rule_id) == 1 else f"{rule_id}#{index}" for index, rule_id in enumerate(ids)]
+
+
+class _TableSink:
+    """Buffers Arrow tables and writes them in batches to one Parquet, Arrow or CSV file"""
+
+    def __init__(self, pa, path, file_format, batch_rows, metadata=None):
+        self.pa = pa
+        self.path = path
+        self.file_format = file_format
+        self.batch_rows = batch_rows
+        self.metadata = metadata
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self.schema = None
+        self.rows = 0
+        self._writer = None
+        self._file = None
+        self._buffer = []
+        self._buffered_rows = 0
+
+    def open(self, schema):
+        pa = self.pa
+        if self.metadata:
+            schema = schema.with_metadata({**(schema.metadata or {}), **self.metadata})
+        self.schema = schema
+        if self.file_format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(self.temp_path, schema)
+        elif self.file_format == "arrow":
+            self._writer = pa.ipc.new_file(self.temp_path, schema)
+        else:
+            import pyarrow.csv
+            self._writer = pyarrow.csv.CSVWriter(self.temp_path, schema)
+
+    def promote(self, schema):
+        """Widen the file's schema, converting the rows written so far"""
+        pa = self.pa
+        self._writer.close()
+        if self.file_format == "csv":
+            # CSV rows are text already: keep them and append under the new types
+            import pyarrow.csv
+            self.schema = schema
+            self._file = open(self.temp_path, "ab")
+            options = pyarrow.csv.WriteOptions(include_header=False)
+            self._writer = pyarrow.csv.CSVWriter(self._file, schema, write_options=options)
+        else:
+            old_path = f"{self.temp_path}.old"
+            os.replace(self.temp_path, old_path)
+            self.open(schema)
+            for table in _written_tables(pa, old_path, self.file_format):
+                self._writer.write_table(table.cast(self.schema))
+            os.remove(old_path)
+        self._buffer = [table.cast(self.schema) for table in self._buffer]
+
+    def append(self, table):
+        self._buffer.append(table)
+        self._buffered_rows += table.num_rows
+        self.rows += table.num_rows
+        if self._buffered_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self._buffered_rows:
+            self._writer.write_table(self.pa.concat_tables(self._buffer).combine_chunks())
+        self._buffer = []
+        self._buffered_rows = 0
+
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            if self._file is not None:
+                self._file.close()
+            os.remove(self.temp_path)
+
+
+class QuarantineWriter:
+    """Writes the failing rows of a plan's run, and optionally the clean rows; see the module docstring"""
+
+    def __init__(self, plan, path, clean_path=None, full_rows=False, batch_rows=DEFAULT_BATCH_ROWS):
+        self.pa = import_pyarrow()
+        if input_format(path) == "csv":
+            raise ValueError(f"Quarantine file {path} must be Parquet (.parquet) or Arrow (.arrow, .feather)")
+        partial = [mode for mode in plan.execution_modes if mode != "full"]
+        if partial:
+            raise ValueError(f"Quarantining needs every row checked; rules in {partial[0]} mode skip rows")
+        self.plan = plan
+        self.rule_ids = rule_ids(plan)
+        self.full_rows = full_rows
+        self.row_offset = 0
+        rules = [{"id": rule_id, "expectation_type": rule.expectation_type, "column": rule.meta["column"]}
+                 for rule_id, rule in zip(self.rule_ids, plan.rules)]
+        metadata = {"opendq.rules": json.dumps(rules), "opendq.suite": plan.suite_name}
+        self.quarantine = _TableSink(self.pa, path, input_format(path), batch_rows, metadata)
+        self.clean = _TableSink(self.pa, clean_path, input_format(clean_path), batch_rows) if clean_path else None
+        self._data_schema = None
+
+    @property
+    def needs_all_columns(self):
+        """Whether chunks must carry every input column, not just the ones the rules read"""
+        return self.full_rows or self.clean is not None
+
+    def _to_arrow(self, df):
+        pa = self.pa
+        try:
+            return pa.Table.from_pandas(df, schema=self._data_schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # CSV chunks infer their own types (an all-empty column reads as
+            # floats, then strings arrive), so widen the files to hold both
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            schema = _promote_schema(pa, self._data_schema, table.schema)
+            if schema != self._data_schema:
+                self._promote(schema)
+            return table.cast(self._data_schema)
+
+    def _promote(self, schema):
+        pa = self.pa
+        self._data_schema = schema
+        if self.full_rows:
+            self.quarantine.promote(pa.schema(list(self.quarantine.schema)[:2] + list(schema)))
+        if self.clean is not None:
+            self.clean.promote(schema)
+
+    def _open(self, df):
+        pa = self.pa
+        id_fields = [pa.field(ROW_COLUMN, pa.int64()), pa.field(RULES_COLUMN, pa.list_(pa.string()))]
+        if self.needs_all_columns:
+            self._data_schema = pa.Schema.from_pandas(df, preserve_index=False)
+        data_fields = list(self._data_schema) if self.full_rows else []
+        self.quarantine.open(pa.schema(id_fields + data_fields))
+        if self.clean is not None:
+            self.clean.open(self._data_schema)
+
+    def write(self, df, unexpected):
+        """Write one chunk, given ``{rule index: boolean mask of its unexpected rows}``"""
+        pa = self.pa
+        if self.quarantine.schema is None:
+            self._open(df)
+        indexes = sorted(unexpected)
+        failures = np.zeros((len(indexes), len(df)), dtype=bool)
+        for position, index in enumerate(indexes):
+            failures[position] = unexpected[index]
+        failed = failures.any(axis=0)
+        rows = np.flatnonzero(failed)
+
+        # Row-major (row, rule) pairs give each failing row's list of rule IDs
+        row_positions, rule_positions = np.nonzero(failures[:, rows].T)
+        offsets = np.zeros(len(rows) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(row_positions, minlength=len(rows)), out=offsets[1:])
+        names = pa.array([self.rule_ids[index] for index in indexes], pa.string())
+        failed_rules = pa.ListArray.from_arrays(pa.array(offsets), names.take(pa.array(rule_positions)))
+        columns = [pa.array(self.row_offset + rows, pa.int64()), failed_rules]
+        # Converted whole, so the chunk's types do not depend on which rows failed
+        data = self._to_arrow(df) if self.needs_all_columns else None
+        if self.full_rows:
+            columns.extend(data.take(pa.array(rows)).columns)
+        self.quarantine.append(pa.Table.from_arrays(columns, schema=self.quarantine.schema))
+        if self.clean is not None:
+            self.clean.append(data.filter(pa.array(~failed)))
+        self.row_offset += len(df)
+
+    def close(self):
+        if self.quarantine.schema is None:
+            # Nothing was read: still leave an empty quarantine file
+            pa = self.pa
+            self.quarantine.open(pa.schema([pa.field(ROW_COLUMN, pa.int64()),
+                                            pa.field(RULES_COLUMN, pa.list_(pa.string()))]))
+        self.quarantine.close()
+        if self.clean is not None:
+            self.clean.close()
+
+    def abort(self):
+        """Drop the partly written files"""
+        self.quarantine.abort()
+        if self.clean is not None:
+            self.clean.abort()
+
+    def summary(self):
+        summary = {"quarantine_path": self.quarantine.path, "quarantined_rows": self.quarantine.rows}
+        if self.clean is not None:
+            summary.update({"clean_path": self.clean.path, "clean_rows": self.clean.rows})
+        return summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def run_with_quarantine(plan, path, writer, chunksize=None):
+    """Run ``plan`` over ``path``, passing every chunk and its unexpected rows to ``writer``
+
+    Reads every column when the writer needs whole rows. Unlike
+    ``readers.run_plan`` no Parquet column is skipped by its statistics,
+    since each row's verdicts are needed.
+    """
+    state = plan.new_state()
+    state.unexpected = {}
+    frames = read_frames(path, None if writer.needs_all_columns else plan.columns, chunksize)
+    if state.profile is not None:
+        frames = state.profile.timed_chunks(frames)
+    for df in frames:
+        state.unexpected.clear()
+        plan.evaluate(df, state)
+        with timed_phase(state.profile, "serialize", len(df)):
+            writer.write(df, state.unexpected)
+    return state
@@ -0,0 +1,181 @@
+"""Input readers that feed a ValidationPlan from CSV, Parquet or Arrow IPC files.
+
+Every reader loads only the columns the plan references. Parquet files are
+read one row group at a time, and a column whose rules are all settled by
+the row group's min/max and null-count statistics is not decoded at all:
+an age range check passes a row group outright when its statistics already
+fall inside 18-60. Floating-point columns are always decoded, since Parquet
+statistics do not count NaN.
+
+Arrow IPC files are memory-mapped and checked on the Arrow buffers
+themselves (see ValidationPlan.evaluate_arrow): columns whose rules have
+Arrow kernels never become pandas objects, so validating a large Feather
+file adds little to resident memory beyond the page cache.
+
+Parquet and Arrow support needs pyarrow, which is imported on first use.
+Besides a path, every reader accepts the file's contents as ``bytes`` when
+the format is given explicitly.
+"""
+import io
+import os
+
+from validation_stream import read_chunks
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+# Rows per Parquet batch when read_frames is given no chunk size
+READ_BATCH_ROWS = 1_000_000
+
+
+def input_format(path):
+    """Guess the input format from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PARQUET_EXTENSIONS:
+        return "parquet"
+    if extension in ARROW_EXTENSIONS:
+        return "arrow"
+    return "csv"
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Reading Parquet or Arrow files requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def row_group_statistics(row_group):
+    """Map column name to Parquet statistics for one row group's metadata"""
+    statistics = {}
+    for i in range(row_group.num_columns):
+        column = row_group.column(i)
+        if column.is_stats_set:
+            statistics[column.path_in_schema] = column.statistics
+    return statistics
+
+
+def run_parquet(plan, path, chunksize=None, state=None, row_groups=None, stream=None):
+    """Validate a Parquet file row group by row group, skipping settled columns"""
+    pa = import_pyarrow()
+    state = state or plan.new_state(stream)
+    if isinstance(path, bytes):
+        path = pa.BufferReader(path)
+    # Dictionary pages are kept as dictionaries and arrive as Categoricals
+    parquet_file = pa.parquet.ParquetFile(path, read_dictionary=plan.categorical_columns)
+    if row_groups is None:
+        row_groups = range(parquet_file.num_row_groups)
+    for index in row_groups:
+        metadata = parquet_file.metadata.row_group(index)
+        settled = plan.settle_from_statistics(row_group_statistics(metadata), metadata.num_rows, state)
+        state.total_records += metadata.num_rows
+        columns = [column for column in plan.columns if column not in settled]
+        if not columns:
+            continue
+        batches = parquet_file.iter_batches(batch_size=chunksize or metadata.num_rows,
+                                            row_groups=[index], columns=columns)
+        frames = (batch.to_pandas() for batch in batches)
+        if state.profile is not None:
+            frames = state.profile.timed_chunks(frames)
+        for df in frames:
+            plan.evaluate_columns(df, state, columns)
+            if plan.finished(state):
+                return state
+    return state
+
+
+def _open_arrow(pa, path):
+    source = pa.BufferReader(path) if isinstance(path, bytes) else pa.memory_map(path, 'r')
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        # Not the random-access file format; read it as an IPC stream
+        return pa.ipc.open_stream(source)
+
+
+def iter_arrow_batches(path, columns=None, chunksize=None, batches=None):
+    """Yield record batches of the selected columns (all if None) from an Arrow IPC file or stream
+
+    Batches of a memory-mapped file reference the mapping without copying.
+    ``batches`` picks record batch numbers of a file (not a stream).
+    """
+    pa = import_pyarrow()
+    reader = _open_arrow(pa, path)
+    if isinstance(reader, pa.ipc.RecordBatchFileReader):
+        numbers = range(reader.num_record_batches) if batches is None else batches
+        batch_iter = (reader.get_batch(i) for i in numbers)
+    else:
+        batch_iter = iter(reader)
+    for batch in batch_iter:
+        if columns is not None:
+            batch = batch.select(columns)
+        if chunksize:
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize)
+        else:
+            yield batch
+
+
+def run_arrow(plan, path, chunksize=None, batches=None, stream=None):
+    """Validate an Arrow IPC file batch by batch on its (memory-mapped) buffers"""
+    state = plan.new_state(stream)
+    batch_iter = iter_arrow_batches(path, plan.columns, chunksize, batches)
+    if state.profile is not None:
+        batch_iter = state.profile.timed_chunks(batch_iter)
+    for batch in batch_iter:
+        plan.evaluate_arrow(batch, state)
+        if plan.finished(state):
+            break
+    return state
+
+
+def iter_arrow_frames(path, columns, chunksize=None, dictionary_columns=()):
+    """Yield DataFrames of the selected columns (all if None) from an Arrow IPC file or stream
+
+    ``dictionary_columns`` are dictionary-encoded in Arrow first, so they
+    become Categoricals without a Python string per row.
+    """
+    pa = import_pyarrow()
+    for batch in iter_arrow_batches(path, columns):
+        for name in dictionary_columns:
+            index = batch.schema.get_field_index(name)
+            if index >= 0 and not pa.types.is_dictionary(batch.schema.field(index).type):
+                batch = batch.set_column(index, name, batch.column(index).dictionary_encode())
+        if chunksize:
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize).to_pandas()
+        else:
+            yield batch.to_pandas()
+
+
+def read_frames(path, columns=None, chunksize=None):
+    """Yield DataFrames of the selected columns (all if None) from a CSV, Parquet or Arrow file"""
+    file_format = input_format(path)
+    if file_format == "parquet":
+        pa = import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize or READ_BATCH_ROWS, columns=columns):
+            yield batch.to_pandas()
+    elif file_format == "arrow":
+        yield from iter_arrow_frames(path, columns, chunksize)
+    else:
+        yield from read_chunks(path, chunksize, usecols=columns)
+
+
+def run_plan(plan, path, chunksize=None, file_format=None, stream=None):
+    """Run a compiled plan over a CSV, Parquet or Arrow file and return its state
+
+    ``path`` may also be the file's contents as bytes, with ``file_format``
+    ("csv", "parquet" or "arrow") saying how to read them. ``stream`` is
+    the part number when the file is one part of a larger run.
+    """
+    file_format = file_format or input_format(path)
+    if file_format == "parquet":
+        return run_parquet(plan, path, chunksize, stream=stream)
+    if file_format == "arrow":
+        return run_arrow(plan, path, chunksize, stream=stream)
+    if isinstance(path, bytes):
+        path = io.BytesIO(path)
+    return plan.run(read_chunks(path, chunksize, usecols=plan.columns, dtype=plan.csv_dtypes()), stream)
@@ -0,0 +1,153 @@
+"""On-disk hash indexes of reference tables for referential-integrity checks.
+
+An index holds the sorted, distinct 64-bit hashes of the key column(s) of a
+reference file, for example the ``email`` column of accounts.csv. It is
+written once as a ``.npy`` file next to the reference (or at
+``index_path``), with a JSON sidecar recording the source file's size and
+modification time, and is memory-mapped on later runs until the reference
+changes. Only the pages a lookup touches are read, and worker processes
+share them through the page cache.
+
+Lookups hash a whole chunk of keys and binary-search them in the index
+(``np.searchsorted``, with the chunk sorted first so consecutive searches
+hit nearby pages), so a foreign-key check never joins the two tables in
+memory. Each key value is hashed by its own value, whatever the rest of
+its chunk holds, so integers match integers (including integers a reader
+stored as floats next to fractional values) and strings match strings,
+but the number 42 does not match the string "42". Two different keys
+collide with probability about ``n / 2**64`` for an index of ``n`` keys,
+so a missing key can in principle be reported as present, but a present
+key is never reported missing.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from readers import read_frames
+from run_store import locked
+from uniqueness import hash_keys, normalize_keys
+
+# Version 2 hashes each key value on its own (see uniqueness.hash_keys)
+INDEX_VERSION = 2
+DEFAULT_BUILD_CHUNKSIZE = 1_000_000
+
+
+def canonical_keys(keys, ignore_case=False):
+    """Key columns ready for hashing; each value hashes alike in any chunk"""
+    keys = normalize_keys(keys)
+    if ignore_case:
+        for column in keys.columns:
+            if not pd.api.types.is_numeric_dtype(keys[column]):
+                keys[column] = keys[column].str.lower()
+    return keys
+
+
+def _sorted_unique(hashes):
+    """Sorted distinct values; sorting is faster than ``np.unique``'s hash table for uint64"""
+    hashes = np.sort(hashes)
+    if len(hashes) < 2:
+        return hashes
+    keep = np.empty(len(hashes), dtype=bool)
+    keep[0] = True
+    np.not_equal(hashes[1:], hashes[:-1], out=keep[1:])
+    return hashes[keep]
+
+
+def default_index_path(reference_path, columns, ignore_case=False):
+    suffix = "+".join(columns) + (".nocase" if ignore_case else "")
+    return f"{reference_path}.{suffix}.index.npy"
+
+
+def _meta_path(index_path):
+    return os.path.splitext(index_path)[0] + ".json"
+
+
+def _source_meta(reference_path, columns, ignore_case):
+    stat = os.stat(reference_path)
+    return {"version": INDEX_VERSION, "source": os.path.abspath(reference_path), "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns, "columns": list(columns), "ignore_case": ignore_case}
+
+
+class ReferenceIndex:
+    """Sorted distinct key hashes of a reference table, usually memory-mapped"""
+
+    def __init__(self, hashes, columns, ignore_case=False, path=None, meta=None):
+        self.hashes = hashes
+        self.columns = list(columns)
+        self.ignore_case = ignore_case
+        self.path = path
+        # The sidecar: the source file's identity when the index was built
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def source_meta(self):
+        """The source file's identity now; differs from ``meta`` once the file changes"""
+        return _source_meta(self.meta["source"], self.columns, self.ignore_case)
+
+    @classmethod
+    def build(cls, reference_path, columns, index_path=None, ignore_case=False,
+              chunksize=DEFAULT_BUILD_CHUNKSIZE):
+        """Hash the reference keys chunk by chunk and write the index"""
+        columns = list(columns)
+        index_path = index_path or default_index_path(reference_path, columns, ignore_case)
+        meta = _source_meta(reference_path, columns, ignore_case)
+        pieces = []
+        for df in read_frames(reference_path, columns, chunksize):
+            # Rows with a missing key part cannot be referenced
+            keys = df[columns].dropna()
+            pieces.append(_sorted_unique(hash_keys(canonical_keys(keys, ignore_case))))
+        hashes = _sorted_unique(np.concatenate(pieces)) if pieces else np.empty(0, dtype=np.uint64)
+        # Write under temporary names and rename, so readers never see half an index
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, hashes)
+        os.replace(temp_path, index_path)
+        meta["keys"] = len(hashes)
+        with open(f"{temp_path}.json", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f"{temp_path}.json", _meta_path(index_path))
+        return cls.load(index_path)
+
+    @classmethod
+    def load(cls, index_path):
+        with open(_meta_path(index_path)) as f:
+            meta = json.load(f)
+        return cls(np.load(index_path, mmap_mode="r"), meta["columns"], meta["ignore_case"], index_path, meta)
+
+    @classmethod
+    def open(cls, reference_path, columns, index_path=None, ignore_case=False,
+             chunksize=DEFAULT_BUILD_CHUNKSIZE):
+        """Load the index of ``reference_path``, building it first if missing or stale"""
+        columns = list(columns)
+        index_path = index_path or default_index_path(reference_path, columns, ignore_case)
+        # Processes opening the same index at once build it only once
+        with locked(f"{index_path}.lock"):
+            if cls.is_fresh(reference_path, columns, index_path, ignore_case):
+                return cls.load(index_path)
+            return cls.build(reference_path, columns, index_path, ignore_case, chunksize)
+
+    @staticmethod
+    def is_fresh(reference_path, columns, index_path, ignore_case=False):
+        if not os.path.exists(index_path) or not os.path.exists(_meta_path(index_path)):
+            return False
+        with open(_meta_path(index_path)) as f:
+            meta = json.load(f)
+        meta.pop("keys", None)
+        return meta == _source_meta(reference_path, columns, ignore_case)
+
+    def contains(self, keys):
+        """Boolean mask of the rows of ``keys`` (a DataFrame without missing values) found in the index"""
+        hashes = hash_keys(canonical_keys(keys, self.ignore_case))
+        if len(self.hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        order = np.argsort(hashes)
+        sorted_hashes = hashes[order]
+        positions = np.searchsorted(self.hashes, sorted_hashes)
+        np.minimum(positions, len(self.hashes) - 1, out=positions)
+        found = np.empty(len(hashes), dtype=bool)
+        found[order] = self.hashes[positions] == sorted_hashes
+        return found
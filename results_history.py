@@ -0,0 +1,223 @@
+"""Append-only history of validation results in SQLite, with trend queries.
+
+Every recorded run adds one row to ``runs`` and one row per expectation to
+``expectation_results``. The suite and run time are copied into each
+expectation row so that trend queries on a rule, a column or a suite are
+single index range scans:
+
+    python results_history.py trend --rule valid_email_format --column email --since 90d
+    python results_history.py trend --column age --since 2024-01-01 --bucket day
+    python results_history.py runs --suite customers_pandas_checks --limit 20
+
+Both the validation_results.json layout and Great Expectations validation
+results can be recorded.
+"""
+import argparse
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_HISTORY_PATH = "validation_history.sqlite"
+RUN_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+# Length of the run_time prefix that identifies each trend bucket
+BUCKET_PREFIX = {"hour": 13, "day": 10, "month": 7}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    suite TEXT NOT NULL,
+    run_time TEXT NOT NULL,
+    source TEXT,
+    success INTEGER NOT NULL,
+    total_records INTEGER,
+    evaluated_expectations INTEGER,
+    successful_expectations INTEGER
+);
+CREATE TABLE IF NOT EXISTS expectation_results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    suite TEXT NOT NULL,
+    run_time TEXT NOT NULL,
+    expectation_type TEXT NOT NULL,
+    column_name TEXT,
+    success INTEGER NOT NULL,
+    element_count INTEGER,
+    unexpected_count INTEGER,
+    unexpected_percent REAL,
+    missing_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_by_suite ON runs (suite, run_time);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (run_time);
+CREATE INDEX IF NOT EXISTS results_by_rule ON expectation_results (expectation_type, column_name, run_time);
+CREATE INDEX IF NOT EXISTS results_by_column ON expectation_results (column_name, run_time);
+CREATE INDEX IF NOT EXISTS results_by_suite ON expectation_results (suite, run_time);
+"""
+
+
+def format_run_time(run_time=None):
+    run_time = run_time or datetime.now(timezone.utc)
+    if run_time.tzinfo is None:
+        run_time = run_time.replace(tzinfo=timezone.utc)
+    return run_time.astimezone(timezone.utc).strftime(RUN_TIME_FORMAT)
+
+
+def parse_since(value, now=None):
+    """Turn ``"90d"``, ``"12h"`` or an ISO date into a stored run_time string"""
+    if value is None:
+        return None
+    match = re.fullmatch(r"(\d+)([dh])", value)
+    if match:
+        amount = int(match.group(1))
+        delta = timedelta(days=amount) if match.group(2) == "d" else timedelta(hours=amount)
+        return format_run_time((now or datetime.now(timezone.utc)) - delta)
+    return format_run_time(datetime.fromisoformat(value))
+
+
+def _expectation_rows(results):
+    """Yield ``(expectation_type, column, success, result)`` from either results layout"""
+    if "validation_results" in results:
+        for exp in results["validation_results"]["expectations"]:
+            yield exp["expectation_type"], exp.get("meta", {}).get("column"), exp["success"], exp.get("result", {})
+    else:
+        # Great Expectations validation result
+        for exp in results.get("results", []):
+            config = exp["expectation_config"]
+            kwargs = config.get("kwargs", {})
+            column = kwargs.get("column") or ", ".join(kwargs.get("column_list", [])) or None
+            yield config["expectation_type"], column, exp["success"], exp.get("result", {})
+
+
+class ResultsHistory:
+    """An append-only SQLite store of validation runs"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        # WAL lets trend queries run while a validator is appending
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def record(self, results, suite_name=None, run_time=None, source=None, commit=True):
+        """Append one run and return its run id"""
+        validation = results.get("validation_results", results)
+        statistics = validation.get("statistics", {})
+        if suite_name is None:
+            suite_name = results.get("meta", {}).get("expectation_suite_name", "default")
+        run_time = run_time if isinstance(run_time, str) else format_run_time(run_time)
+        cursor = self.connection.execute(
+            "INSERT INTO runs (suite, run_time, source, success, total_records, evaluated_expectations, "
+            "successful_expectations) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (suite_name, run_time, source, bool(validation.get("success")), statistics.get("total_records"),
+             statistics.get("evaluated_expectations"), statistics.get("successful_expectations")))
+        run_id = cursor.lastrowid
+        self.connection.executemany(
+            "INSERT INTO expectation_results (run_id, suite, run_time, expectation_type, column_name, success, "
+            "element_count, unexpected_count, unexpected_percent, missing_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, suite_name, run_time, expectation_type, column, bool(success), result.get("element_count"),
+              result.get("unexpected_count"), result.get("unexpected_percent"), result.get("missing_count"))
+             for expectation_type, column, success, result in _expectation_rows(results)])
+        if commit:
+            self.connection.commit()
+        return run_id
+
+    def commit(self):
+        self.connection.commit()
+
+    def trend(self, rule=None, column=None, suite=None, since=None, until=None, bucket=None):
+        """Unexpected percent over time for the matching expectation results
+
+        Without ``bucket`` there is one row per run:
+        ``(run_time, suite, expectation_type, column, unexpected_percent, success)``.
+        With ``bucket`` ("hour", "day" or "month") runs are averaged per
+        bucket: ``(bucket, expectation_type, column, runs, mean_unexpected_percent,
+        max_unexpected_percent, failed_runs)``.
+        """
+        conditions, params = [], []
+        for name, value in (("expectation_type", rule), ("column_name", column), ("suite", suite)):
+            if value is not None:
+                conditions.append(f"{name} = ?")
+                params.append(value)
+        if since:
+            conditions.append("run_time >= ?")
+            params.append(since)
+        if until:
+            conditions.append("run_time < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if bucket is None:
+            query = (f"SELECT run_time, suite, expectation_type, column_name, unexpected_percent, success "
+                     f"FROM expectation_results {where} ORDER BY run_time")
+        else:
+            prefix = BUCKET_PREFIX[bucket]
+            query = (f"SELECT substr(run_time, 1, {prefix}) AS bucket, expectation_type, column_name, COUNT(*), "
+                     f"AVG(unexpected_percent), MAX(unexpected_percent), SUM(success = 0) "
+                     f"FROM expectation_results {where} "
+                     f"GROUP BY bucket, expectation_type, column_name ORDER BY bucket, expectation_type, column_name")
+        return self.connection.execute(query, params).fetchall()
+
+    def runs(self, suite=None, since=None, limit=None):
+        """Most recent runs first: ``(run_id, suite, run_time, source, success, total_records)``"""
+        conditions, params = [], []
+        if suite is not None:
+            conditions.append("suite = ?")
+            params.append(suite)
+        if since:
+            conditions.append("run_time >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT run_id, suite, run_time, source, success, total_records FROM runs {where} ORDER BY run_time DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self.connection.execute(query, params).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Query the validation results history")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="SQLite history file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    trend = commands.add_parser("trend", help="Unexpected percent over time")
+    trend.add_argument("--rule", help="Expectation type, e.g. valid_email_format")
+    trend.add_argument("--column", help="Column name")
+    trend.add_argument("--suite", help="Suite name")
+    trend.add_argument("--since", help="Start time: an ISO date or a window such as 90d or 12h")
+    trend.add_argument("--until", help="End time (ISO date, exclusive)")
+    trend.add_argument("--bucket", choices=sorted(BUCKET_PREFIX), help="Average runs per time bucket")
+    runs = commands.add_parser("runs", help="Most recent runs")
+    runs.add_argument("--suite", help="Suite name")
+    runs.add_argument("--since", help="Start time: an ISO date or a window such as 90d or 12h")
+    runs.add_argument("--limit", type=int, default=20, help="Number of runs to list")
+    args = parser.parse_args(argv)
+
+    with ResultsHistory(args.history) as history:
+        if args.command == "trend":
+            rows = history.trend(args.rule, args.column, args.suite, parse_since(args.since),
+                                 parse_since(args.until), args.bucket)
+            if args.bucket:
+                print(f"{'bucket':<14}{'rule':<28}{'column':<16}{'runs':>6}{'mean %':>10}{'max %':>10}{'failed':>8}")
+                for bucket, rule, column, count, mean, peak, failed in rows:
+                    print(f"{bucket:<14}{rule:<28}{str(column):<16}{count:>6}{mean or 0:>10.2f}{peak or 0:>10.2f}{failed:>8}")
+            else:
+                print(f"{'run time':<29}{'rule':<28}{'column':<16}{'unexpected %':>14}  status")
+                for run_time, _, rule, column, percent, success in rows:
+                    status = "PASS" if success else "FAIL"
+                    print(f"{run_time:<29}{rule:<28}{str(column):<16}{percent or 0:>14.2f}  {status}")
+        else:
+            print(f"{'run id':>8}  {'run time':<29}{'suite':<28}{'records':>10}  status")
+            for run_id, suite, run_time, _, success, total in history.runs(args.suite, parse_since(args.since),
+                                                                          args.limit):
+                status = "PASS" if success else "FAIL"
+                print(f"{run_id:>8}  {run_time:<29}{suite:<28}{str(total):>10}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Writing and lazy reading of validation results.
+
+Results can be written as the usual pretty-printed ``validation_results.json``
+or as compact NDJSON, where the first line holds the statistics and overall
+success and every following line holds one expectation result::
+
+    {"validation_results": {"statistics": {...}, "success": false}}
+    {"expectation_type": "valid_email_format", "success": false, ...}
+
+The validators already build results from native Python types, so writing
+is a single ``json.dump`` with a fallback hook for the odd numpy scalar
+rather than a copy of the whole tree.
+
+Both formats are read back lazily: ``iter_expectations`` yields one
+expectation at a time and ``read_summary`` returns the statistics without
+keeping any expectation in memory. ``read_summary`` also understands the
+Great Expectations ``validation.json`` layout.
+"""
+import json
+import os
+
+# Unexpected values kept per expectation in partial_unexpected_list
+DEFAULT_SAMPLE_SIZE = 10
+READ_SIZE = 64 * 1024
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+_WHITESPACE = " \t\r\n"
+
+
+def results_format(path):
+    """Guess the results format from the file extension"""
+    return "ndjson" if os.path.splitext(path)[1].lower() in NDJSON_EXTENSIONS else "json"
+
+
+def _to_native(obj):
+    """json.dump fallback for numpy scalars and arrays that slipped into results"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def write_results(results, path="validation_results.json", fmt=None):
+    """Write a validation_results structure as pretty JSON or NDJSON"""
+    fmt = fmt or results_format(path)
+    with open(path, "w") as f:
+        if fmt == "json":
+            json.dump(results, f, indent=2, default=_to_native)
+            return
+        validation = results["validation_results"]
+        header = {key: value for key, value in validation.items() if key != "expectations"}
+        f.write(json.dumps({"validation_results": header}, default=_to_native))
+        f.write("\n")
+        for exp in validation["expectations"]:
+            f.write(json.dumps(exp, default=_to_native))
+            f.write("\n")
+
+
+class _JsonStream:
+    """Buffered text with just enough JSON tokenizing to walk nested objects"""
+
+    def __init__(self, f):
+        self._file = f
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self._file.read(READ_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop what has been consumed so the buffer stays small
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed results file: expected {char!r}, found {found!r}")
+        self._position += 1
+
+    def value(self):
+        """Decode and consume the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next read
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def members(self):
+        """Yield the keys of the object at the cursor; the caller consumes each value"""
+        self.expect("{")
+        while self.peek() != "}":
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.expect(",")
+        self.expect("}")
+
+    def items(self):
+        """Yield the items of the array at the cursor one at a time"""
+        self.expect("[")
+        while self.peek() != "]":
+            yield self.value()
+            if self.peek() == ",":
+                self.expect(",")
+        self.expect("]")
+
+    def skip(self):
+        """Consume the next value; arrays are skipped item by item"""
+        if self.peek() == "[":
+            for _ in self.items():
+                pass
+        else:
+            self.value()
+
+
+def _read_first_line(path):
+    with open(path, "r") as f:
+        return json.loads(f.readline())
+
+
+def iter_expectations(path):
+    """Yield the expectation results of a results file one by one"""
+    with open(path, "r") as f:
+        if results_format(path) == "ndjson":
+            f.readline()
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        stream = _JsonStream(f)
+        for key in stream.members():
+            if key != "validation_results":
+                stream.skip()
+                continue
+            for inner in stream.members():
+                if inner == "expectations":
+                    yield from stream.items()
+                    return
+                stream.skip()
+
+
+def read_summary(path):
+    """Return the ``statistics`` and ``success`` of a results file
+
+    Works on validation_results.json, its NDJSON form and Great
+    Expectations validation.json files, reading expectations only to skip
+    past them.
+    """
+    if results_format(path) == "ndjson":
+        header = _read_first_line(path)["validation_results"]
+        return {key: header.get(key) for key in ("statistics", "success")}
+    summary = {}
+    with open(path, "r") as f:
+        stream = _JsonStream(f)
+        for key in stream.members():
+            if key in ("statistics", "success"):
+                summary[key] = stream.value()
+            elif key == "validation_results":
+                for inner in stream.members():
+                    if inner in ("statistics", "success"):
+                        summary[inner] = stream.value()
+                    else:
+                        stream.skip()
+            else:
+                stream.skip()
+    return summary
+
+
+def load_results(path):
+    """Load a whole results file of either format into one dict"""
+    if results_format(path) == "json":
+        with open(path, "r") as f:
+            return json.load(f)
+    results = _read_first_line(path)
+    results["validation_results"]["expectations"] = list(iter_expectations(path))
+    return results
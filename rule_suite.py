@@ -0,0 +1,924 @@
+"""Declarative expectation suites compiled into a single-pass validation plan.
+
+Suites use the Great Expectations JSON layout written by
+``create_expectations.py``::
+
+    {"expectation_suite_name": "customers_suite",
+     "expectations": [{"expectation_type": "expect_column_values_to_be_between",
+                       "kwargs": {"column": "age", "min_value": 18, "max_value": 60},
+                       "meta": {}}]}
+
+Rules are grouped by column, so each referenced column is read and prepared
+(null mask, string or numeric view) once per chunk however many rules use
+it, and columns that no rule references are never loaded.
+
+Engine options live under ``meta["opendq"]``:
+
+- ``result_type``: expectation type to report instead of ``expectation_type``
+- ``nulls``: ``"missing"`` (default) skips nulls like Great Expectations,
+  ``"unexpected"`` counts them as failures
+- ``sample``: ``"unique"`` keeps distinct unexpected values only
+- ``execution_mode``: ``"full"``, ``"fail_fast"`` or ``"sample"``; see
+  execution.py, which also describes the suite-wide ``execution`` options
+
+With ``execution["profile"]`` set, every result also gets a ``performance``
+block of per-rule timings (see instrumentation.py).
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from drift import (CATEGORY_METRICS, DEFAULT_BINS, NUMERIC_METRICS, CategoryDriftAccumulator,
+                   NumericDriftAccumulator, baseline_identity, load_baseline)
+from execution import (DEFAULT_CONFIDENCE, DEFAULT_MIN_ROWS, DEFAULT_SAMPLE_FRACTION, EXECUTION_MODES,
+                       FailFastAccumulator, RowSampler, SampledAccumulator, suite_execution)
+from instrumentation import RunProfile, timed_phase, timed_rule
+from string_rules import as_strings, regex_rule
+from sketches import DEFAULT_TOP_K
+from uniqueness import (DEFAULT_MAX_MEMORY_ROWS, DEFAULT_RELATIVE_ERROR, ExactUniqueAccumulator,
+                        HyperLogLogAccumulator, registers_for_error)
+from validation_stream import DEFAULT_SAMPLE_SIZE, ExpectationAccumulator
+
+# Parquet physical types whose statistics leave NaN out of min/max and the null count
+FLOATING_PHYSICAL_TYPES = ("FLOAT", "DOUBLE")
+
+
+def _may_hold_nan(stats):
+    """Whether a Parquet column chunk with these statistics can hold NaN"""
+    floating = stats.physical_type in FLOATING_PHYSICAL_TYPES or str(stats.logical_type) == "Float16"
+    return floating and stats.num_values > 0
+
+
+def load_suite(path):
+    """Load an expectation suite from a Great Expectations JSON file"""
+    with open(path, 'r') as f:
+        suite = json.load(f)
+    if not isinstance(suite.get("expectations"), list):
+        raise ValueError(f"{path} is not an expectation suite: missing 'expectations' list")
+    return suite
+
+
+class Rule:
+    """One compiled expectation"""
+
+    def __init__(self, expectation_type, kwargs, meta):
+        self.expectation_type = expectation_type
+        self.kwargs = kwargs
+        self.columns = self.referenced_columns()
+        self.mostly = kwargs.get("mostly", 1)
+        self.options = meta.get("opendq", {})
+        self.result_type = self.options.get("result_type", expectation_type)
+        self.nulls_missing = self.options.get("nulls", "missing") == "missing"
+        self.unique_sample = self.options.get("sample") == "unique"
+        self.meta = {k: v for k, v in meta.items() if k not in ("opendq", "description")}
+        self.meta["column"] = ", ".join(self.columns)
+        self.meta["description"] = meta.get("description") or self.describe()
+
+    def referenced_columns(self):
+        return [self.kwargs["column"]]
+
+    def describe(self):
+        # Called during __init__, so subclasses may only rely on self.kwargs
+        return f"{self.expectation_type} on {', '.join(self.columns)}"
+
+    def success(self, accumulator):
+        return accumulator.unexpected_percent() <= (1 - self.mostly) * 100
+
+    def external_inputs(self):
+        """What the verdicts depend on besides the suite and the data, for result caches
+
+        Read when called, so a cached plan or result whose inputs have
+        changed since sees a different value.
+        """
+        return None
+
+
+class ColumnRule(Rule):
+    """A row-by-row expectation on a single column, fused with the column's other rules"""
+
+    # Whether the rule gives the same verdicts on a column read as a
+    # pandas Categorical of its raw strings
+    categorical_safe = False
+
+    def __init__(self, expectation_type, kwargs, meta):
+        self.column = kwargs["column"]
+        super().__init__(expectation_type, kwargs, meta)
+
+    def new_accumulator(self, sample_size):
+        return ExpectationAccumulator(sample_size, unique_sample=self.unique_sample,
+                                      track_missing=self.nulls_missing)
+
+    def evaluate(self, column):
+        """Return the boolean mask of valid values for a PreparedColumn"""
+        raise NotImplementedError
+
+    def supports_arrow(self, data_type):
+        """Whether ``evaluate_arrow`` gives ``evaluate``'s verdicts for an Arrow array of this type"""
+        return False
+
+    def evaluate_arrow(self, array):
+        """Return an Arrow boolean array of valid values, computed on the array's buffers
+
+        Nulls in the result count as invalid.
+        """
+        raise NotImplementedError
+
+    def passes_statistics(self, stats):
+        """Whether min/max and null-count statistics prove no value is unexpected"""
+        return False
+
+    def _nulls_allowed(self, stats):
+        return self.nulls_missing or stats.null_count == 0
+
+
+class MatchRegexRule(ColumnRule):
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.rule = regex_rule(kwargs["regex"])
+
+    def describe(self):
+        return f"Check if {self.column} matches {self.kwargs['regex']}"
+
+    def evaluate(self, column):
+        return self.rule.match_strings(column.strings())
+
+    def supports_arrow(self, data_type):
+        import pyarrow as pa
+        return self.rule.vector_pattern is not None and (pa.types.is_string(data_type)
+                                                         or pa.types.is_large_string(data_type))
+
+    def evaluate_arrow(self, array):
+        return self.rule.match_arrow(array)
+
+
+class BetweenRule(ColumnRule):
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.min_value = kwargs.get("min_value")
+        self.max_value = kwargs.get("max_value")
+        self.strict_min = kwargs.get("strict_min", False)
+        self.strict_max = kwargs.get("strict_max", False)
+
+    def describe(self):
+        return f"Check if {self.column} is between {self.kwargs.get('min_value')} and {self.kwargs.get('max_value')}"
+
+    def evaluate(self, column):
+        # Values that are present but not numeric are unexpected
+        values = column.numeric()
+        valid = ~np.isnan(values)
+        with np.errstate(invalid="ignore"):
+            if self.min_value is not None:
+                valid &= values > self.min_value if self.strict_min else values >= self.min_value
+            if self.max_value is not None:
+                valid &= values < self.max_value if self.strict_max else values <= self.max_value
+        return valid
+
+    def supports_arrow(self, data_type):
+        import pyarrow as pa
+        return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+    def evaluate_arrow(self, array):
+        import pyarrow.compute as pc
+        # NaN compares false, like the numpy check
+        valid = pc.is_valid(array)
+        if self.min_value is not None:
+            compare = pc.greater if self.strict_min else pc.greater_equal
+            valid = pc.and_(valid, compare(array, self.min_value))
+        if self.max_value is not None:
+            compare = pc.less if self.strict_max else pc.less_equal
+            valid = pc.and_(valid, compare(array, self.max_value))
+        return valid
+
+    def passes_statistics(self, stats):
+        if not stats.has_min_max or not self._nulls_allowed(stats):
+            return False
+        if not isinstance(stats.min, (int, float)) or not isinstance(stats.max, (int, float)):
+            return False
+        if self.min_value is not None:
+            if stats.min < self.min_value or (self.strict_min and stats.min == self.min_value):
+                return False
+        if self.max_value is not None:
+            if stats.max > self.max_value or (self.strict_max and stats.max == self.max_value):
+                return False
+        return True
+
+
+class InSetRule(ColumnRule):
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.value_set = list(kwargs["value_set"])
+        # Dictionary-encoded CSV columns hold strings, so numeric sets need the plain read
+        self.categorical_safe = all(isinstance(value, str) for value in self.value_set)
+
+    def describe(self):
+        return f"Check if {self.column} is in {list(self.kwargs['value_set'])}"
+
+    def evaluate(self, column):
+        if column.categorical:
+            # Check each distinct value once and broadcast through the codes;
+            # the extra False is picked by code -1, a missing value
+            allowed = np.append(column.series.cat.categories.isin(self.value_set), False)
+            return allowed[column.series.cat.codes.to_numpy()]
+        return column.series.isin(self.value_set).to_numpy()
+
+    def supports_arrow(self, data_type):
+        import pyarrow as pa
+        # Numeric sets also match numeric strings in pandas, so only exact type matches run in Arrow
+        if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+            return self.categorical_safe
+        if pa.types.is_integer(data_type):
+            return all(isinstance(value, int) and not isinstance(value, bool) for value in self.value_set)
+        return False
+
+    def evaluate_arrow(self, array):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        return pc.is_in(array, value_set=pa.array(self.value_set, type=array.type))
+
+    def passes_statistics(self, stats):
+        # Only a block holding a single distinct value can be proven valid
+        return (stats.has_min_max and stats.min == stats.max and stats.min in self.value_set
+                and self._nulls_allowed(stats))
+
+
+class NotNullRule(ColumnRule):
+    categorical_safe = True
+
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        # Nulls are what this rule looks for, so they are always unexpected
+        self.nulls_missing = False
+
+    def describe(self):
+        return f"Check if {self.column} is never null"
+
+    def new_accumulator(self, sample_size):
+        # Every unexpected value is null, so there is nothing useful to sample
+        return ExpectationAccumulator(0)
+
+    def evaluate(self, column):
+        return ~column.missing
+
+    def supports_arrow(self, data_type):
+        return True
+
+    def evaluate_arrow(self, array):
+        import pyarrow.compute as pc
+        return pc.invert(pc.is_null(array, nan_is_null=True))
+
+    def passes_statistics(self, stats):
+        return stats.null_count == 0
+
+
+class DatasetRule(Rule):
+    """An expectation that needs state across rows, such as uniqueness
+
+    Its accumulator sees whole chunks through ``update_frame`` and must be
+    mergeable like ExpectationAccumulator. Row-by-row dataset rules return
+    their ``(valid, missing)`` masks from ``update``; rules such as
+    uniqueness, which only know the failing rows at the end, return None.
+    """
+
+    def update(self, df, accumulator):
+        accumulator.update_frame(df)
+
+
+class UniqueRule(DatasetRule):
+    """expect_column_values_to_be_unique and expect_compound_columns_to_be_unique
+
+    ``meta["opendq"]["uniqueness"]`` picks ``"exact"`` (default, spilling to
+    disk beyond ``max_memory_rows`` keys) or ``"approximate"`` (HyperLogLog
+    with the given ``relative_error``). An approximate result reports the
+    estimated duplicates, and succeeds while those beyond the estimate's
+    ``duplicate_tolerance`` are within ``mostly``.
+    """
+
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.approximate = self.options.get("uniqueness", "exact") == "approximate"
+        if self.approximate:
+            # Reject an unsupported relative_error when compiling, not when the run starts
+            registers_for_error(self.options.get("relative_error", DEFAULT_RELATIVE_ERROR))
+
+    def referenced_columns(self):
+        if "column_list" in self.kwargs:
+            return list(self.kwargs["column_list"])
+        return [self.kwargs["column"]]
+
+    def describe(self):
+        return f"Check if {', '.join(self.columns)} {'is' if len(self.columns) == 1 else 'are'} unique"
+
+    def new_accumulator(self, sample_size):
+        if self.approximate:
+            return HyperLogLogAccumulator(self.columns, self.options.get("relative_error", DEFAULT_RELATIVE_ERROR))
+        return ExactUniqueAccumulator(self.columns, sample_size,
+                                      self.options.get("max_memory_rows", DEFAULT_MAX_MEMORY_ROWS))
+
+    def success(self, accumulator):
+        if self.approximate:
+            return accumulator.within_error_bound(self.mostly)
+        return super().success(accumulator)
+
+
+def _open_reference(kwargs, columns):
+    """The ReferenceIndex a reference rule's kwargs point at"""
+    # Imported here so suites without reference rules do not load the index module
+    from reference_index import ReferenceIndex
+    return ReferenceIndex.open(kwargs["reference_path"], columns, kwargs.get("index_path"),
+                               kwargs.get("ignore_case", False))
+
+
+def unexpected_mask(accumulator, valid, missing):
+    """The rows an ExpectationAccumulator counts as unexpected for these masks"""
+    valid = np.asarray(valid, dtype=bool)
+    return ~valid & ~missing if accumulator.track_missing else ~valid
+
+
+def _row_values(df, columns, valid, missing, accumulator):
+    """Row tuples of ``columns``, built only for the rows ``accumulator`` may sample"""
+    values = np.empty(len(df), dtype=object)
+    picked = np.flatnonzero(unexpected_mask(accumulator, valid, missing))
+    if not accumulator.unique_sample:
+        picked = picked[:accumulator.sample_size]
+    if len(picked):
+        frame = df[columns].iloc[picked]
+        for column in frame.columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[column]):
+                # Sample timestamps as text, so results stay JSON
+                frame[column] = frame[column].astype(str)
+        # Missing parts of a sampled row are reported as null
+        frame = frame.astype(object).where(frame.notna(), None)
+        for position, row in zip(picked, frame.itertuples(index=False, name=None)):
+            values[position] = row
+    return pd.Series(values)
+
+
+class InReferenceRule(ColumnRule):
+    """expect_column_values_to_be_in_reference: every value is a key of another table
+
+    ``reference_path`` is a CSV, Parquet or Arrow file and
+    ``reference_column`` its key column (default: the same name). The
+    reference is looked up through an on-disk hash index built on first use
+    (see reference_index.py); ``ignore_case`` compares strings case-blind.
+    """
+
+    categorical_safe = True
+
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.index = _open_reference(kwargs, [kwargs.get("reference_column", self.column)])
+
+    def describe(self):
+        return f"Check if every {self.column} exists in {self.kwargs['reference_path']}"
+
+    def external_inputs(self):
+        return self.index.source_meta()
+
+    def evaluate(self, column):
+        if column.categorical:
+            # Look up each distinct value once; code -1 (missing) picks the extra False
+            categories = column.series.cat.categories.to_frame(index=False)
+            found = np.append(self.index.contains(categories), False)
+            return found[column.series.cat.codes.to_numpy()]
+        valid = np.zeros(len(column.series), dtype=bool)
+        present = ~column.missing
+        if present.any():
+            valid[present] = self.index.contains(column.series[present].to_frame())
+        return valid
+
+
+class CompoundInReferenceRule(DatasetRule):
+    """expect_compound_columns_to_be_in_reference: every key tuple exists in another table
+
+    ``reference_column_list`` names the reference key columns, in the order
+    of ``column_list``. As with SQL foreign keys, a row with any key part
+    missing is not checked.
+    """
+
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.index = _open_reference(kwargs, kwargs.get("reference_column_list", self.columns))
+
+    def referenced_columns(self):
+        return list(self.kwargs["column_list"])
+
+    def describe(self):
+        return f"Check if every ({', '.join(self.columns)}) exists in {self.kwargs['reference_path']}"
+
+    def external_inputs(self):
+        return self.index.source_meta()
+
+    def new_accumulator(self, sample_size):
+        return ExpectationAccumulator(sample_size, unique_sample=self.unique_sample,
+                                      track_missing=self.nulls_missing)
+
+    def update(self, df, accumulator):
+        keys = df[self.columns]
+        missing = keys.isna().any(axis=1).to_numpy()
+        valid = np.zeros(len(df), dtype=bool)
+        if (~missing).any():
+            valid[~missing] = self.index.contains(keys[~missing])
+        accumulator.update(_row_values(df, self.columns, valid, missing, accumulator), valid, missing)
+        return valid, missing
+
+
+class ColumnPairRule(DatasetRule):
+    """A row-by-row expectation comparing two columns
+
+    ``ignore_row_if`` follows Great Expectations: ``"both_values_are_missing"``
+    (default), ``"either_value_is_missing"`` or ``"neither"``. Unexpected
+    values are sampled as ``(A, B)`` pairs.
+    """
+
+    def referenced_columns(self):
+        return [self.kwargs["column_A"], self.kwargs["column_B"]]
+
+    def new_accumulator(self, sample_size):
+        return ExpectationAccumulator(sample_size, unique_sample=self.unique_sample,
+                                      track_missing=self.nulls_missing)
+
+    def compare(self, a, b):
+        """Return the boolean mask of valid rows for the two column chunks"""
+        raise NotImplementedError
+
+    def update(self, df, accumulator):
+        a, b = df[self.columns[0]], df[self.columns[1]]
+        a_missing, b_missing = a.isna().to_numpy(), b.isna().to_numpy()
+        ignore_row_if = self.kwargs.get("ignore_row_if", "both_values_are_missing")
+        if ignore_row_if == "both_values_are_missing":
+            missing = a_missing & b_missing
+        elif ignore_row_if == "either_value_is_missing":
+            missing = a_missing | b_missing
+        else:
+            missing = np.zeros(len(df), dtype=bool)
+        valid = np.asarray(self.compare(a, b), dtype=bool)
+        accumulator.update(_row_values(df, self.columns, valid, missing, accumulator), valid, missing)
+        return valid, missing
+
+
+def _comparable(series):
+    """Numbers as floats, anything else parsed as datetimes; NaN where neither"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+    times = pd.to_datetime(series, errors="coerce")
+    return np.where(times.isna(), np.nan, times.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float))
+
+
+class PairGreaterRule(ColumnPairRule):
+    """expect_column_pair_values_A_to_be_greater_than_B, for numbers or dates"""
+
+    def describe(self):
+        operator = ">=" if self.kwargs.get("or_equal") else ">"
+        return f"Check if {self.kwargs['column_A']} {operator} {self.kwargs['column_B']}"
+
+    def compare(self, a, b):
+        a, b = _comparable(a), _comparable(b)
+        with np.errstate(invalid="ignore"):
+            return a >= b if self.kwargs.get("or_equal") else a > b
+
+
+def _as_of(kwargs):
+    return pd.Timestamp(kwargs["as_of"]) if kwargs.get("as_of") else pd.Timestamp.today().normalize()
+
+
+class AgeMatchesBirthDateRule(ColumnPairRule):
+    """expect_column_values_to_match_birth_date: an age column agrees with a birth date column
+
+    The age is computed at ``as_of`` (default: today, so pin it for
+    incremental runs) and may differ by ``tolerance`` years. Birth dates are
+    parsed with ``birth_date_format`` if given; unparseable dates are
+    unexpected.
+    """
+
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.as_of = _as_of(kwargs)
+        self.tolerance = kwargs.get("tolerance", 0)
+
+    def referenced_columns(self):
+        return [self.kwargs["column"], self.kwargs["birth_date_column"]]
+
+    def describe(self):
+        return f"Check if {self.kwargs['column']} matches {self.kwargs['birth_date_column']}"
+
+    def external_inputs(self):
+        # Today's date for an unpinned as_of, so plans compiled yesterday go stale
+        return _as_of(self.kwargs).isoformat()
+
+    def compare(self, age, birth_date):
+        age = pd.to_numeric(age, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        birth = pd.to_datetime(birth_date, errors="coerce", format=self.kwargs.get("birth_date_format"))
+        month, day = birth.dt.month, birth.dt.day
+        before_birthday = (month > self.as_of.month) | ((month == self.as_of.month) & (day > self.as_of.day))
+        expected = (self.as_of.year - birth.dt.year - before_birthday).to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            return np.abs(age - expected) <= self.tolerance
+
+
+class DriftRule(DatasetRule):
+    """A distribution comparison of one column with a stored baseline sketch
+
+    ``baseline`` is a profile JSON or an earlier results file (see
+    drift.py); ``metric`` picks the statistic and the rule passes while it
+    is at most ``threshold``. Drift rules are not quarantined, as no single
+    row fails them.
+    """
+
+    metrics = {}
+    baseline_kind = None
+
+    def __init__(self, expectation_type, kwargs, meta):
+        super().__init__(expectation_type, kwargs, meta)
+        self.metric = kwargs.get("metric", next(iter(self.metrics)))
+        if self.metric not in self.metrics:
+            raise ValueError(f"Unknown drift metric {self.metric!r}; expected one of {', '.join(self.metrics)}")
+        self.threshold = kwargs.get("threshold", self.metrics[self.metric])
+        self.baseline = load_baseline(kwargs["baseline"], kwargs["column"], self.baseline_kind)
+
+    def describe(self):
+        return f"Check if {self.kwargs['column']} has not drifted from {self.kwargs['baseline']}"
+
+    def external_inputs(self):
+        return baseline_identity(self.kwargs["baseline"])
+
+    def success(self, accumulator):
+        return accumulator.within_threshold()
+
+
+class DistributionDriftRule(DriftRule):
+    """expect_column_distribution_to_match_baseline: PSI (default) or KS of a numeric column
+
+    PSI uses ``bins`` (default 10) bins cut at the baseline's quantiles.
+    """
+
+    metrics = NUMERIC_METRICS
+    baseline_kind = "quantiles"
+
+    def new_accumulator(self, sample_size):
+        return NumericDriftAccumulator(self.kwargs["column"], self.metric, self.threshold, self.kwargs["baseline"],
+                                       self.baseline, self.kwargs.get("bins", DEFAULT_BINS))
+
+
+class CategoryDriftRule(DriftRule):
+    """expect_column_category_frequencies_to_match_baseline: largest share shift (default) or PSI"""
+
+    metrics = CATEGORY_METRICS
+    baseline_kind = "top_values"
+
+    def new_accumulator(self, sample_size):
+        return CategoryDriftAccumulator(self.kwargs["column"], self.metric, self.threshold, self.kwargs["baseline"],
+                                        self.baseline, self.kwargs.get("top_k", DEFAULT_TOP_K))
+
+
+RULE_TYPES = {
+    "expect_column_values_to_match_regex": MatchRegexRule,
+    "expect_column_values_to_be_between": BetweenRule,
+    "expect_column_values_to_be_in_set": InSetRule,
+    "expect_column_values_to_not_be_null": NotNullRule,
+    "expect_column_values_to_be_unique": UniqueRule,
+    "expect_compound_columns_to_be_unique": UniqueRule,
+    "expect_column_values_to_be_in_reference": InReferenceRule,
+    "expect_compound_columns_to_be_in_reference": CompoundInReferenceRule,
+    "expect_column_pair_values_A_to_be_greater_than_B": PairGreaterRule,
+    "expect_column_values_to_match_birth_date": AgeMatchesBirthDateRule,
+    "expect_column_distribution_to_match_baseline": DistributionDriftRule,
+    "expect_column_category_frequencies_to_match_baseline": CategoryDriftRule,
+}
+
+
+class PreparedColumn:
+    """A column chunk with its derived views computed at most once"""
+
+    def __init__(self, series):
+        self.series = series
+        self.categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        self.missing = series.isna().to_numpy()
+        self._strings = None
+        self._numeric = None
+
+    def strings(self):
+        if self._strings is None:
+            self._strings = as_strings(self.series)
+        return self._strings
+
+    def numeric(self):
+        if self._numeric is None:
+            self._numeric = pd.to_numeric(self.series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        return self._numeric
+
+
+def _arrow_values(array, mask, limit=None, unique=False):
+    """The values of ``array`` where ``mask`` is set, as Python objects like pandas would give"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    if unique:
+        values = pc.unique(array.filter(mask))
+    else:
+        values = array.take(pc.indices_nonzero(mask)[:limit])
+    if pa.types.is_dictionary(values.type):
+        values = values.dictionary_decode()
+    elif pa.types.is_integer(values.type) and array.null_count:
+        # pandas reads an integer column with nulls as floats
+        values = values.cast(pa.float64())
+    # Missing values come out of pandas as NaN
+    return [np.nan if value is None else value for value in values.to_pylist()]
+
+
+class PlanState:
+    """Per-rule accumulators for one run of a plan, mergeable across chunks"""
+
+    def __init__(self, accumulators, profile=None, rng=None):
+        self.total_records = 0
+        self.accumulators = accumulators
+        # This run's row-sampling generator, when rules run in sample mode
+        self.rng = rng
+        # RunProfile of this run when profiling; timings are not saved by to_dict
+        self.profile = profile
+        # When quarantining, {rule index: unexpected-row mask} of the latest chunk
+        self.unexpected = None
+
+    def merge(self, other):
+        self.total_records += other.total_records
+        for accumulator, later in zip(self.accumulators, other.accumulators):
+            accumulator.merge(later)
+        if self.profile is not None and other.profile is not None:
+            self.profile.merge(other.profile)
+        return self
+
+    def to_dict(self):
+        return {
+            "total_records": self.total_records,
+            "accumulators": [accumulator.to_dict() for accumulator in self.accumulators]
+        }
+
+    def load_dict(self, data):
+        """Restore counts saved by ``to_dict`` into this state's accumulators"""
+        self.total_records = data["total_records"]
+        for accumulator, saved in zip(self.accumulators, data["accumulators"]):
+            accumulator.load_dict(saved)
+        return self
+
+
+class ValidationPlan:
+    """A suite compiled into per-column groups of fused rules"""
+
+    def __init__(self, suite_name, rules, sample_size=DEFAULT_SAMPLE_SIZE, execution=None):
+        self.suite_name = suite_name
+        self.rules = rules
+        self.sample_size = sample_size
+        self.execution = execution or {}
+        self.execution_modes = [self._execution_mode(rule) for rule in rules]
+        self.fail_fast_rules = [i for i, mode in enumerate(self.execution_modes) if mode == "fail_fast"]
+        self.sampled_rules = {i for i, mode in enumerate(self.execution_modes) if mode == "sample"}
+        self.sampler = None
+        if self.sampled_rules:
+            self.sampler = RowSampler(self.execution.get("sample_fraction", DEFAULT_SAMPLE_FRACTION),
+                                      self.execution.get("stratify_by"), self.execution.get("seed", 0))
+        self.column_rules = {}
+        self.dataset_rules = []
+        self.columns = []
+        for index, rule in enumerate(rules):
+            if isinstance(rule, ColumnRule):
+                self.column_rules.setdefault(rule.column, []).append(index)
+            else:
+                self.dataset_rules.append(index)
+            self.columns.extend(column for column in rule.columns if column not in self.columns)
+        # Columns that must always be decoded, since dataset rules see every row
+        self.dataset_columns = {column for index in self.dataset_rules for column in rules[index].columns}
+        # Set-membership columns are read dictionary-encoded, so each chunk
+        # checks its distinct values rather than every row
+        self.categorical_columns = [
+            column for column, indexes in self.column_rules.items()
+            if column not in self.dataset_columns
+            and any(isinstance(rules[index], InSetRule) for index in indexes)
+            and all(rules[index].categorical_safe for index in indexes)
+        ]
+        # Columns that file statistics must not settle: sampled rules and
+        # the stratification column need the rows themselves
+        self.always_read = set(self.dataset_columns)
+        if self.sampler is not None:
+            if self.sampler.stratify_by is not None:
+                if self.sampler.stratify_by not in self.columns:
+                    self.columns.append(self.sampler.stratify_by)
+                self.always_read.add(self.sampler.stratify_by)
+            self.always_read.update(rules[index].column for index in self.sampled_rules)
+        self.profile = bool(self.execution.get("profile"))
+        self.column_passes = 0
+
+    def _execution_mode(self, rule):
+        mode = rule.options.get("execution_mode", self.execution.get("mode", "full"))
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode {mode!r}; expected one of {', '.join(EXECUTION_MODES)}")
+        # Uniqueness needs every row, so dataset rules always run in full
+        return mode if isinstance(rule, ColumnRule) else "full"
+
+    def _new_accumulator(self, index):
+        rule, mode = self.rules[index], self.execution_modes[index]
+        accumulator = rule.new_accumulator(self.sample_size)
+        if mode == "fail_fast":
+            return FailFastAccumulator(accumulator, rule.mostly, self.execution.get("min_rows", DEFAULT_MIN_ROWS))
+        if mode == "sample":
+            return SampledAccumulator(accumulator, self.execution,
+                                      self.execution.get("confidence", DEFAULT_CONFIDENCE))
+        return accumulator
+
+    def finished(self, state):
+        """True once every rule is a fail-fast rule that has stopped"""
+        return (len(self.fail_fast_rules) == len(self.rules)
+                and all(state.accumulators[index].stopped for index in self.fail_fast_rules))
+
+    def csv_dtypes(self):
+        """``read_csv`` dtypes that dictionary-encode the categorical columns"""
+        return {column: "category" for column in self.categorical_columns}
+
+    def external_inputs(self):
+        """Each rule's external inputs, such as reference files; see Rule.external_inputs"""
+        return [rule.external_inputs() for rule in self.rules]
+
+    def new_state(self, stream=None):
+        """A fresh state; ``stream`` numbers the part of a split run it is for"""
+        profile = RunProfile(len(self.rules)) if self.profile else None
+        rng = self.sampler.new_rng(stream) if self.sampler is not None else None
+        return PlanState([self._new_accumulator(index) for index in range(len(self.rules))], profile, rng)
+
+    def evaluate(self, df, state):
+        """Run every rule on one chunk, visiting each referenced column once"""
+        state.total_records += len(df)
+        self.evaluate_columns(df, state, self.columns)
+        return state
+
+    def evaluate_columns(self, df, state, columns):
+        """Run the column rules of ``columns`` and every dataset rule
+
+        The caller counts the records; ``df`` must hold every dataset column.
+        """
+        with timed_phase(state.profile, "evaluate", len(df)):
+            self._evaluate_columns(df, state, columns)
+
+    def _evaluate_columns(self, df, state, columns):
+        sample = self.sampler.sample(df, state.rng) if self.sampler is not None else None
+        for column_name in columns:
+            if column_name not in self.column_rules:
+                continue
+            full, sampled = [], []
+            for index in self.column_rules[column_name]:
+                if index in self.sampled_rules:
+                    sampled.append(index)
+                elif not getattr(state.accumulators[index], "stopped", False):
+                    full.append(index)
+            if full:
+                column = PreparedColumn(df[column_name])
+                self.column_passes += 1
+                for index in full:
+                    rule, accumulator = self.rules[index], state.accumulators[index]
+                    with timed_rule(state.profile, index, len(column.series)):
+                        valid = rule.evaluate(column)
+                        accumulator.update(column.series, valid, column.missing)
+                    if state.unexpected is not None:
+                        state.unexpected[index] = unexpected_mask(accumulator, valid, column.missing)
+            if sampled:
+                column = PreparedColumn(df[column_name][sample.mask])
+                self.column_passes += 1
+                for index in sampled:
+                    rule = self.rules[index]
+                    with timed_rule(state.profile, index, len(column.series)):
+                        state.accumulators[index].update(column.series, rule.evaluate(column), column.missing,
+                                                         sample)
+        for index in self.dataset_rules:
+            with timed_rule(state.profile, index, len(df)):
+                masks = self.rules[index].update(df, state.accumulators[index])
+            if state.unexpected is not None and masks is not None:
+                state.unexpected[index] = unexpected_mask(state.accumulators[index], *masks)
+
+    def evaluate_arrow(self, batch, state):
+        """Run every rule on an Arrow record batch, on its buffers where the rules allow
+
+        A column whose rules all run in full mode and support its Arrow type
+        (see ColumnRule.evaluate_arrow) is checked in place, so a
+        memory-mapped file is validated without copying it or creating a
+        Python object per row. Only the unexpected values the samples keep
+        are converted. Other columns and the dataset rules go through pandas
+        for just the columns they need.
+        """
+        state.total_records += batch.num_rows
+        pandas_columns = []
+        with timed_phase(state.profile, "evaluate", batch.num_rows):
+            for column_name, indexes in self.column_rules.items():
+                array = batch.column(column_name)
+                if self._arrow_column_supported(array, indexes, state):
+                    self._evaluate_arrow_column(array, indexes, state)
+                else:
+                    pandas_columns.append(column_name)
+        if pandas_columns or self.dataset_rules:
+            needed = [column for column in self.columns if column in pandas_columns or column in self.dataset_columns
+                      or (self.sampler is not None and column == self.sampler.stratify_by)]
+            df = batch.select(needed).to_pandas()
+            self.evaluate_columns(df, state, pandas_columns)
+        return state
+
+    def _arrow_column_supported(self, array, indexes, state):
+        import pyarrow as pa
+        data_type = array.type.value_type if pa.types.is_dictionary(array.type) else array.type
+        return all(self.execution_modes[index] == "full" and self.rules[index].supports_arrow(data_type)
+                   and type(state.accumulators[index]) is ExpectationAccumulator for index in indexes)
+
+    def _evaluate_arrow_column(self, array, indexes, state):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        dictionary = pa.types.is_dictionary(array.type)
+        missing = pc.is_null(array, nan_is_null=True)
+        missing_count = pc.sum(missing).as_py() or 0
+        for index in indexes:
+            rule, accumulator = self.rules[index], state.accumulators[index]
+            with timed_rule(state.profile, index, len(array)):
+                if dictionary:
+                    # Check each distinct value once and spread the verdicts through the indices
+                    valid = rule.evaluate_arrow(array.dictionary).take(array.indices)
+                else:
+                    valid = rule.evaluate_arrow(array)
+                unexpected = pc.invert(pc.fill_null(valid, False))
+                if accumulator.track_missing:
+                    unexpected = pc.and_(unexpected, pc.invert(missing))
+                accumulator.update_counts(len(array), pc.sum(unexpected).as_py() or 0, missing_count,
+                                          lambda limit, unique: _arrow_values(array, unexpected, limit, unique))
+            if state.unexpected is not None:
+                state.unexpected[index] = unexpected.to_numpy(zero_copy_only=False)
+
+    def settle_from_statistics(self, statistics, num_rows, state):
+        """Credit columns whose rules all pass according to file statistics
+
+        ``statistics`` maps column names to Parquet column statistics for a
+        block of ``num_rows`` rows. Returns the settled column names, which
+        the caller does not need to decode for that block. Floating-point
+        columns holding any values are always decoded, as their statistics
+        cannot rule out NaN.
+        """
+        settled = set()
+        for column_name, indexes in self.column_rules.items():
+            stats = statistics.get(column_name)
+            if stats is None or not stats.has_null_count or column_name in self.always_read:
+                continue
+            if _may_hold_nan(stats):
+                continue
+            if all(self.rules[index].passes_statistics(stats) for index in indexes):
+                for index in indexes:
+                    state.accumulators[index].add_passing(num_rows, stats.null_count)
+                settled.add(column_name)
+        return settled
+
+    def run(self, chunks, stream=None):
+        state = self.new_state(stream)
+        if state.profile is not None:
+            chunks = state.profile.timed_chunks(chunks)
+        for df in chunks:
+            self.evaluate(df, state)
+            if self.finished(state):
+                break
+        return state
+
+    def build_results(self, state):
+        """Build the validation_results.json structure from a finished run"""
+        expectations = []
+        for index, (rule, mode, accumulator) in enumerate(zip(self.rules, self.execution_modes, state.accumulators)):
+            result = accumulator.to_result()
+            if state.profile is not None:
+                result["performance"] = state.profile.rules[index].to_dict()
+            expectations.append({
+                "expectation_type": rule.result_type,
+                "execution_mode": mode,
+                "success": rule.success(accumulator),
+                "result": result,
+                "meta": dict(rule.meta)
+            })
+        results = {
+            "validation_results": {
+                "expectations": expectations,
+                "statistics": {
+                    "total_records": state.total_records,
+                    "evaluated_expectations": len(expectations),
+                    "successful_expectations": sum(1 for exp in expectations if exp["success"])
+                },
+                "success": all(exp["success"] for exp in expectations)
+            }
+        }
+        if state.profile is not None:
+            # Serialize and report come after the results are built, so only
+            # the metrics export sees them
+            results["validation_results"]["performance"] = {"phases": state.profile.phases_dict(("read", "evaluate"))}
+        return results
+
+
+def compile_suite(suite, sample_size=DEFAULT_SAMPLE_SIZE):
+    """Compile a suite dict (or a path to one) into a ValidationPlan"""
+    if isinstance(suite, str):
+        suite = load_suite(suite)
+    rules = []
+    for expectation in suite["expectations"]:
+        expectation_type = expectation["expectation_type"]
+        if expectation_type not in RULE_TYPES:
+            raise ValueError(f"Unsupported expectation type: {expectation_type}")
+        rule_class = RULE_TYPES[expectation_type]
+        rules.append(rule_class(expectation_type, expectation.get("kwargs", {}), expectation.get("meta", {})))
+    return ValidationPlan(suite.get("expectation_suite_name", "default"), rules, sample_size,
+                          suite_execution(suite))
@@ -0,0 +1,138 @@
+"""An indexed store of validation runs, safe for concurrent writers.
+
+Runs are kept per suite under ``<root>/<suite>/``:
+
+- ``<run_id>.json``: one result per run. Run ids start with the UTC run
+  time and end with a random suffix, so concurrent runs never collide and
+  ids sort chronologically.
+- ``index.jsonl``: one line per run (id, run time, success, statistics),
+  appended in completion order.
+- ``LATEST``: the id of the run with the newest run time, replaced
+  atomically, so finding the latest result is one small read instead of a
+  listing of every historical run.
+
+Index appends and LATEST updates happen under an exclusive lock on
+``<suite>/.lock``. A run that finishes late but started earlier never
+displaces a newer LATEST.
+"""
+import json
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from results_io import write_results
+
+DEFAULT_RUN_STORE = os.path.join("great_expectations", "uncommitted", "run_store")
+RUN_TIME_FORMAT = "%Y%m%dT%H%M%S.%fZ"
+
+try:
+    import fcntl
+
+    def _lock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:
+    # Windows
+    import msvcrt
+
+    def _lock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def locked(lock_path):
+    """Hold an exclusive lock on ``lock_path`` (created if needed) across processes"""
+    with open(lock_path, "a+") as f:
+        _lock(f)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+def _safe_name(name):
+    """File-system safe directory name for a suite"""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+
+def new_run_id(run_time=None):
+    run_time = run_time or datetime.now(timezone.utc)
+    return f"{run_time.astimezone(timezone.utc).strftime(RUN_TIME_FORMAT)}-{uuid.uuid4().hex[:8]}"
+
+
+class RunStore:
+    """Validation results keyed by suite and run time"""
+
+    def __init__(self, root=DEFAULT_RUN_STORE):
+        self.root = root
+
+    def _suite_dir(self, suite_name):
+        return os.path.join(self.root, _safe_name(suite_name))
+
+    @contextmanager
+    def _locked(self, suite_name):
+        directory = self._suite_dir(suite_name)
+        os.makedirs(directory, exist_ok=True)
+        with locked(os.path.join(directory, ".lock")):
+            yield directory
+
+    def path(self, suite_name, run_id):
+        return os.path.join(self._suite_dir(suite_name), f"{run_id}.json")
+
+    def save(self, suite_name, result, run_time=None):
+        """Store one run's result and return its run id"""
+        run_id = new_run_id(run_time)
+        directory = self._suite_dir(suite_name)
+        os.makedirs(directory, exist_ok=True)
+        path = self.path(suite_name, run_id)
+        # Readers only ever see complete files
+        write_results(result, path + ".tmp", fmt="json")
+        os.replace(path + ".tmp", path)
+
+        validation = result.get("validation_results", result)
+        entry = {"run_id": run_id, "success": validation.get("success"),
+                 "statistics": validation.get("statistics")}
+        with self._locked(suite_name):
+            with open(os.path.join(directory, "index.jsonl"), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            latest = self.latest(suite_name)
+            if latest is None or run_id > latest:
+                with open(os.path.join(directory, "LATEST.tmp"), "w") as f:
+                    f.write(run_id)
+                os.replace(os.path.join(directory, "LATEST.tmp"), os.path.join(directory, "LATEST"))
+        return run_id
+
+    def latest(self, suite_name):
+        """Id of the newest run of a suite, or None"""
+        try:
+            with open(os.path.join(self._suite_dir(suite_name), "LATEST"), "r") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, suite_name, run_id):
+        with open(self.path(suite_name, run_id), "r") as f:
+            return json.load(f)
+
+    def load_latest(self, suite_name):
+        run_id = self.latest(suite_name)
+        return None if run_id is None else self.load(suite_name, run_id)
+
+    def runs(self, suite_name):
+        """Yield the index entries of a suite's runs in completion order"""
+        try:
+            with open(os.path.join(self._suite_dir(suite_name), "index.jsonl"), "r") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
@@ -1,9 +1,13 @@
 import os
-import pandas as pd
-import great_expectations as ge
-from great_expectations.datasource import PandasDatasource
+
+from string_rules import EMAIL_PATTERN
 
 def setup_ge_project():
+    # Heavy imports are deferred so importing this module stays cheap
+    import pandas as pd
+    import great_expectations as ge
+    from great_expectations.datasource import PandasDatasource
+    
     # Create a new Great Expectations project
     os.makedirs('great_expectations', exist_ok=True)
     
@@ -45,7 +49,7 @@ def setup_ge_project():
     batch.expect_column_values_to_not_be_null(column="email")
     batch.expect_column_values_to_match_regex(
         column="email", 
-        regex=r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+        regex=EMAIL_PATTERN
     )
     batch.expect_column_values_to_be_between(
         column="age", 
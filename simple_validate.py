@@ -1,15 +1,39 @@
-import pandas as pd
-import re
-import json
+import argparse
+from instrumentation import RunProfile, timed_phase, timed_rule, write_metrics
+from results_io import write_results
+from string_rules import EMAIL_RULE
+from validation_stream import DEFAULT_SAMPLE_SIZE, ExpectationAccumulator, read_chunks
 
 def validate_email(email):
     """Validate email format using regex"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return EMAIL_RULE.match_scalar(email)
 
-def validate_data():
-    # Read the data
-    df = pd.read_csv("data/customers.csv")
+def validate_data(path="data/customers.csv", chunksize=None, sample_size=DEFAULT_SAMPLE_SIZE, profile=False,
+                  metrics_path=None):
+    valid_countries = ["India", "USA", "UK"]
+    email_results = ExpectationAccumulator(sample_size)
+    age_results = ExpectationAccumulator(sample_size)
+    country_results = ExpectationAccumulator(sample_size, unique_sample=True)
+    # Per-check timings, as validate_with_pandas.py records them with --profile
+    run_profile = RunProfile(3) if profile or metrics_path else None
+    
+    # Read the data, one chunk at a time when streaming
+    chunks = read_chunks(path, chunksize)
+    if run_profile is not None:
+        chunks = run_profile.timed_chunks(chunks)
+    for df in chunks:
+        with timed_phase(run_profile, "evaluate", len(df)):
+            # Check 1: Email format validation
+            with timed_rule(run_profile, 0, len(df)):
+                email_results.update(df['email'], EMAIL_RULE.match_series(df['email']))
+            
+            # Check 2: Age range validation
+            with timed_rule(run_profile, 1, len(df)):
+                age_results.update(df['age'], ~((df['age'] < 18) | (df['age'] > 60)).to_numpy())
+            
+            # Check 3: Country validation
+            with timed_rule(run_profile, 2, len(df)):
+                country_results.update(df['country'], df['country'].isin(valid_countries).to_numpy())
     
     # Initialize results
     results = {
@@ -19,51 +43,21 @@ def validate_data():
         }
     }
     
-    # Check 1: Email format validation
-    invalid_emails = df[~df['email'].apply(validate_email)]['email'].tolist()
-    email_success = len(invalid_emails) == 0
-    results["validation_results"]["expectations"].append({
-        "expectation_type": "email_format_validation",
-        "success": email_success,
-        "result": {
-            "element_count": len(df),
-            "unexpected_count": len(invalid_emails),
-            "unexpected_percent": (len(invalid_emails) / len(df)) * 100 if len(df) > 0 else 0,
-            "partial_unexpected_list": invalid_emails[:10]  # Show up to 10 examples
-        },
-        "meta": {"column": "email", "description": "Check if email format is valid"}
-    })
-    
-    # Check 2: Age range validation
-    invalid_ages = df[(df['age'] < 18) | (df['age'] > 60)]['age'].tolist()
-    age_success = len(invalid_ages) == 0
-    results["validation_results"]["expectations"].append({
-        "expectation_type": "age_range_validation",
-        "success": age_success,
-        "result": {
-            "element_count": len(df),
-            "unexpected_count": len(invalid_ages),
-            "unexpected_percent": (len(invalid_ages) / len(df)) * 100 if len(df) > 0 else 0,
-            "partial_unexpected_list": invalid_ages[:10]  # Show up to 10 examples
-        },
-        "meta": {"column": "age", "description": "Check if age is between 18 and 60"}
-    })
-    
-    # Check 3: Country validation
-    valid_countries = ["India", "USA", "UK"]
-    invalid_countries = df[~df['country'].isin(valid_countries)]['country'].tolist()
-    country_success = len(invalid_countries) == 0
-    results["validation_results"]["expectations"].append({
-        "expectation_type": "country_validation",
-        "success": country_success,
-        "result": {
-            "element_count": len(df),
-            "unexpected_count": len(invalid_countries),
-            "unexpected_percent": (len(invalid_countries) / len(df)) * 100 if len(df) > 0 else 0,
-            "partial_unexpected_list": list(set(invalid_countries))[:10]  # Show up to 10 unique examples
-        },
-        "meta": {"column": "country", "description": "Check if country is in the allowed list"}
-    })
+    checks = [
+        ("email_format_validation", email_results, {"column": "email", "description": "Check if email format is valid"}),
+        ("age_range_validation", age_results, {"column": "age", "description": "Check if age is between 18 and 60"}),
+        ("country_validation", country_results, {"column": "country", "description": "Check if country is in the allowed list"}),
+    ]
+    for index, (expectation_type, accumulator, meta) in enumerate(checks):
+        result = accumulator.to_result()
+        if run_profile is not None:
+            result["performance"] = run_profile.rules[index].to_dict()
+        results["validation_results"]["expectations"].append({
+            "expectation_type": expectation_type,
+            "success": accumulator.unexpected_count == 0,
+            "result": result,
+            "meta": meta
+        })
     
     # Update statistics
     results["validation_results"]["statistics"]["evaluated_expectations"] = len(results["validation_results"]["expectations"])
@@ -72,23 +66,32 @@ def validate_data():
     )
     
     # Save results to a file
-    with open("validation_results.json", "w") as f:
-        json.dump(results, f, indent=2)
-    
-    # Print summary
-    print(f"Validation completed. Results saved to validation_results.json")
-    print(f"Total expectations: {results['validation_results']['statistics']['evaluated_expectations']}")
-    print(f"Successful expectations: {results['validation_results']['statistics']['successful_expectations']}")
+    with timed_phase(run_profile, "serialize"):
+        write_results(results, "validation_results.json")
     
-    # Print detailed results
-    print("\nDetailed Results:")
-    for exp in results["validation_results"]["expectations"]:
-        status = "PASSED" if exp["success"] else "FAILED"
-        print(f"- {exp['meta']['description']}: {status}")
-        if not exp["success"]:
-            print(f"  - {exp['result']['unexpected_count']} unexpected values found")
-            if exp["result"]["partial_unexpected_list"]:
-                print(f"  - Examples: {', '.join(map(str, exp['result']['partial_unexpected_list'][:3]))}...")
+    with timed_phase(run_profile, "report"):
+        # Print summary
+        print(f"Validation completed. Results saved to validation_results.json")
+        print(f"Total expectations: {results['validation_results']['statistics']['evaluated_expectations']}")
+        print(f"Successful expectations: {results['validation_results']['statistics']['successful_expectations']}")
+        
+        # Print detailed results
+        print("\nDetailed Results:")
+        for exp in results["validation_results"]["expectations"]:
+            status = "PASSED" if exp["success"] else "FAILED"
+            print(f"- {exp['meta']['description']}: {status}")
+            if not exp["success"]:
+                print(f"  - {exp['result']['unexpected_count']} unexpected values found")
+                if exp["result"]["partial_unexpected_list"]:
+                    print(f"  - Examples: {', '.join(map(str, exp['result']['partial_unexpected_list'][:3]))}...")
+    if metrics_path:
+        write_metrics(metrics_path, "customers_simple_checks", run_profile, results)
 
 if __name__ == "__main__":
-    validate_data()
+    parser = argparse.ArgumentParser(description="Validate customer data")
+    parser.add_argument("--input", default="data/customers.csv", help="CSV file to validate")
+    parser.add_argument("--chunksize", type=int, help="Stream the file in chunks of this many rows")
+    parser.add_argument("--profile", action="store_true", help="Record per-check timings in the results")
+    parser.add_argument("--metrics-file", help="Export timings as a Prometheus textfile (implies --profile)")
+    args = parser.parse_args()
+    validate_data(args.input, chunksize=args.chunksize, profile=args.profile, metrics_path=args.metrics_file)
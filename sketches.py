@@ -0,0 +1,235 @@
+"""Mergeable one-pass sketches used to profile columns.
+
+Every sketch is updated one chunk at a time, can be merged with a sketch
+built from another chunk or worker, and round-trips through JSON with
+``to_dict``/``from_dict``:
+
+- ``QuantileSketch``: a KLL sketch; quantiles are within about
+  ``1.7 / k`` in rank of the true ones, using O(k) memory.
+- ``LogHistogram``: counts in log-spaced buckets fixed in advance
+  (``subbuckets`` per power of two), so histograms of different chunks or
+  files line up bucket for bucket.
+- ``TopKSketch``: Misra-Gries heavy hitters. Counts are exact while a
+  column has no more distinct values than the capacity; beyond that they
+  are lower bounds off by at most ``error``.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUANTILE_K = 200
+DEFAULT_SUBBUCKETS = 4
+DEFAULT_TOP_K = 20
+# Heavy-hitter counters kept per reported top value; more counters mean
+# smaller count errors
+TOP_K_CAPACITY_FACTOR = 5
+
+
+class QuantileSketch:
+    """KLL quantile sketch over float values"""
+
+    def __init__(self, k=DEFAULT_QUANTILE_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        # Fixed seed so the same input and merge order give the same sketch
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind; the rest halve into the next level
+                keep = items[:1] if len(items) % 2 else items[:0]
+                paired = items[len(keep):]
+                promoted = paired[int(self._rng.integers(2))::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _ranks(self):
+        """The retained items in order, with the estimated number of values up to each"""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, fractions):
+        """Estimated values at the given fractions of the sorted data"""
+        if not self.count:
+            return [None for _ in fractions]
+        values, ranks = self._ranks()
+        positions = np.searchsorted(ranks, np.asarray(fractions) * ranks[-1], side="left")
+        return values[np.minimum(positions, len(values) - 1)].tolist()
+
+    def cdf(self, points):
+        """Estimated fraction of the values at or below each point"""
+        points = np.asarray(points, dtype=float)
+        if not self.count:
+            return np.zeros(len(points))
+        values, ranks = self._ranks()
+        positions = np.searchsorted(values, points, side="right")
+        below = np.concatenate([[0], ranks])[positions]
+        return below / ranks[-1]
+
+    def items(self):
+        """The distinct retained values, sorted"""
+        return np.unique(np.concatenate(self.levels))
+
+    def to_dict(self):
+        return {"k": self.k, "count": self.count, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"])
+        sketch.count = data["count"]
+        sketch.levels = [np.array(items, dtype=float) for items in data["levels"]] or [np.empty(0)]
+        return sketch
+
+
+class LogHistogram:
+    """Counts of values in buckets ``[2**(i/s), 2**((i+1)/s))``, mirrored for negatives"""
+
+    def __init__(self, subbuckets=DEFAULT_SUBBUCKETS):
+        self.subbuckets = subbuckets
+        self.zero = 0
+        self.positive = {}
+        self.negative = {}
+
+    def _add(self, buckets, magnitudes):
+        indexes, counts = np.unique(np.floor(np.log2(magnitudes) * self.subbuckets).astype(np.int64),
+                                    return_counts=True)
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            buckets[index] = buckets.get(index, 0) + count
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        self.zero += int(np.count_nonzero(values == 0))
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+
+    def merge(self, other):
+        if other.subbuckets != self.subbuckets:
+            raise ValueError("Cannot merge histograms with different bucket widths")
+        self.zero += other.zero
+        for buckets, later in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in later.items():
+                buckets[index] = buckets.get(index, 0) + count
+        return self
+
+    def _edges(self, index):
+        return 2 ** (index / self.subbuckets), 2 ** ((index + 1) / self.subbuckets)
+
+    def buckets(self):
+        """``(lower, upper, count)`` for every non-empty bucket in ascending order"""
+        rows = []
+        for index in sorted(self.negative, reverse=True):
+            lower, upper = self._edges(index)
+            rows.append((-upper, -lower, self.negative[index]))
+        if self.zero:
+            rows.append((0.0, 0.0, self.zero))
+        for index in sorted(self.positive):
+            lower, upper = self._edges(index)
+            rows.append((lower, upper, self.positive[index]))
+        return rows
+
+    def to_dict(self):
+        return {
+            "subbuckets": self.subbuckets,
+            "zero": self.zero,
+            "positive": {str(index): count for index, count in sorted(self.positive.items())},
+            "negative": {str(index): count for index, count in sorted(self.negative.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["subbuckets"])
+        histogram.zero = data["zero"]
+        histogram.positive = {int(index): count for index, count in data["positive"].items()}
+        histogram.negative = {int(index): count for index, count in data["negative"].items()}
+        return histogram
+
+
+def _native(value):
+    """Plain Python scalar for a value taken out of pandas"""
+    return value.item() if hasattr(value, "item") else value
+
+
+class TopKSketch:
+    """Misra-Gries frequent values with a fixed number of counters"""
+
+    def __init__(self, k=DEFAULT_TOP_K, capacity=None):
+        self.k = k
+        self.capacity = capacity or k * TOP_K_CAPACITY_FACTOR
+        self.counters = {}
+        # Upper bound on how much any count was underestimated
+        self.error = 0
+
+    def update(self, values):
+        """Count a chunk of non-missing values"""
+        self.update_counts(pd.Series(values).value_counts(sort=False))
+
+    def update_counts(self, counts):
+        """Count a chunk given as a Series of counts indexed by value"""
+        if self.counters:
+            counts = pd.Series(self.counters, dtype="int64").add(counts, fill_value=0)
+        if len(counts) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter
+            # and drop those that reach zero
+            cut = int(counts.nlargest(self.capacity + 1).iloc[-1])
+            counts = counts[counts > cut] - cut
+            self.error += cut
+        self.counters = {_native(value): int(count) for value, count in counts.items()}
+
+    def merge(self, other):
+        self.error += other.error
+        if other.counters:
+            self.update_counts(pd.Series(other.counters, dtype="int64"))
+        return self
+
+    @property
+    def exact(self):
+        return self.error == 0
+
+    def top(self):
+        """The ``k`` most frequent values as ``(value, count)``, most frequent first"""
+        return sorted(self.counters.items(), key=lambda item: (-item[1], str(item[0])))[:self.k]
+
+    def to_dict(self):
+        return {"k": self.k, "capacity": self.capacity, "error": self.error,
+                "counters": [[value, count] for value, count in self.counters.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"], data["capacity"])
+        sketch.error = data["error"]
+        sketch.counters = {value: count for value, count in data["counters"]}
+        return sketch
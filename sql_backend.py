@@ -0,0 +1,330 @@
+"""Validate a table in a SQLite or DuckDB database by pushing the rules down into SQL.
+
+Instead of exporting the table, the suite is translated into one
+aggregate query, so the database scans the table once and only counts
+come back::
+
+    SELECT COUNT(*),
+           SUM(CASE WHEN "age" IS NULL THEN 1 WHEN ... THEN 0 ELSE 1 END),  -- unexpected, per rule
+           SUM(CASE WHEN "age" IS NULL THEN 1 ELSE 0 END),                  -- missing, per column
+           ...
+    FROM "customers"
+
+and a ``SELECT ... WHERE <unexpected> LIMIT n`` query per failing rule
+fetches its ``partial_unexpected_list``. The counts go through the same
+accumulators and ``ValidationPlan.build_results`` as the pandas engine, so
+the results have the ``validation_results.json`` structure of
+``validate_with_pandas.py``.
+
+Supported expectations: ``match_regex``, ``be_between``, ``be_in_set``,
+``not_be_null``, column and compound uniqueness (always exact; the
+database groups the keys) and ``expect_column_pair_values_A_to_be_greater_than_B``
+(compared as the database compares the two columns). Every rule runs in
+full mode. A few values are typed by the database rather than by pandas:
+
+- SQLite only treats INTEGER and REAL values as numbers, so numeric text
+  in a TEXT column fails ``be_between``; DuckDB casts with ``TRY_CAST``
+- regexes run in Python's ``re`` (a registered function), except on
+  DuckDB when the pattern has an RE2 form (see string_rules.py)
+- empty strings are values, not missing, and samples come in the order
+  the database returns them
+
+``.duckdb`` and ``.ddb`` files are opened with DuckDB, which needs the
+``duckdb`` package; anything else with the standard library's sqlite3.
+Databases are opened read-only.
+"""
+import argparse
+import os
+import pathlib
+
+from results_io import DEFAULT_SAMPLE_SIZE
+
+DUCKDB_EXTENSIONS = (".duckdb", ".ddb")
+
+
+def quote(identifier):
+    """A quoted SQL identifier, such as a column name, taken whole"""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def quote_table(name):
+    """A quoted table name; dots separate schema and table names"""
+    return ".".join(quote(part) for part in name.split("."))
+
+
+def _matcher(rule):
+    """A one-argument SQL function giving a RegexRule's verdict for one value"""
+    # Calling the compiled regex directly: the values of a whole table are
+    # mostly distinct, so the rule's verdict cache would only churn
+    match = rule.regex.match
+
+    def matches(value):
+        return value is not None and match(str(value)) is not None
+    return matches
+
+
+class Database:
+    """An open database connection and the SQL spelling of its engine"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        # Registered regex function name by pattern
+        self._regex_functions = {}
+
+    def execute(self, sql, params=()):
+        return self.connection.execute(sql, list(params))
+
+    def close(self):
+        self.connection.close()
+
+    def as_number(self, sql):
+        """SQL for the value as a number, or NULL where it is not one"""
+        raise NotImplementedError
+
+    def regex(self, sql, rule):
+        """SQL and parameters for whether the value matches a RegexRule"""
+        return f"{self._regex_function(rule)}({sql})", []
+
+    def _regex_function(self, rule):
+        name = self._regex_functions.get(rule.pattern)
+        if name is None:
+            name = f"opendq_regex_{len(self._regex_functions)}"
+            self._register(name, _matcher(rule))
+            self._regex_functions[rule.pattern] = name
+        return name
+
+
+class SqliteDatabase(Database):
+    def __init__(self, path):
+        import sqlite3
+        if not os.path.exists(path):
+            raise ValueError(f"Database {path} does not exist")
+        super().__init__(sqlite3.connect(pathlib.Path(path).absolute().as_uri() + "?mode=ro", uri=True))
+
+    def _register(self, name, function):
+        self.connection.create_function(name, 1, function, deterministic=True)
+
+    def as_number(self, sql):
+        return f"(CASE WHEN typeof({sql}) IN ('integer', 'real') THEN {sql} END)"
+
+
+class DuckDBDatabase(Database):
+    def __init__(self, path):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("Validating DuckDB databases requires duckdb: pip install duckdb") from e
+        super().__init__(duckdb.connect(path, read_only=True))
+
+    def _register(self, name, function):
+        from duckdb.typing import BOOLEAN, VARCHAR
+        self.connection.create_function(name, function, [VARCHAR], BOOLEAN)
+
+    def as_number(self, sql):
+        return f"TRY_CAST({sql} AS DOUBLE)"
+
+    def regex(self, sql, rule):
+        text = f"CAST({sql} AS VARCHAR)"
+        if rule.vector_pattern is not None:
+            # RE2 runs inside DuckDB, without a Python call per value
+            return f"regexp_matches({text}, ?)", [f"^(?:{rule.vector_pattern})$"]
+        return super().regex(text, rule)
+
+
+def open_database(path, engine=None):
+    """Open ``path`` read-only with ``engine``, or the engine its extension suggests"""
+    engine = engine or ("duckdb" if os.path.splitext(path)[1].lower() in DUCKDB_EXTENSIONS else "sqlite")
+    if engine not in ("sqlite", "duckdb"):
+        raise ValueError(f"Unknown database engine {engine!r}; expected sqlite or duckdb")
+    return DuckDBDatabase(path) if engine == "duckdb" else SqliteDatabase(path)
+
+
+class SqlRule:
+    """One rule as SQL: a per-row unexpected flag, a missing condition and a sample query
+
+    ``unexpected`` is an aggregate for the counting SELECT, ``sample_from``
+    the FROM and WHERE clauses selecting the unexpected rows, and
+    ``row_format`` how a sampled row becomes a value: ``"scalar"``,
+    ``"tuple"`` or ``"record"``.
+    """
+
+    def __init__(self, columns, missing, unexpected, params, sample_from, sample_params, row_format="scalar"):
+        self.columns = columns
+        self.missing = missing
+        self.unexpected = unexpected
+        self.params = params
+        self.sample_from = sample_from
+        self.sample_params = sample_params
+        self.row_format = row_format
+
+    @classmethod
+    def row_rule(cls, columns, table, missing, valid, params, nulls_missing, row_format="scalar"):
+        """A rule judging each row on its own by the ``valid`` condition"""
+        # Nulls are settled first, so a NULL verdict from ``valid`` counts as unexpected
+        flag = f"CASE WHEN {missing} THEN {0 if nulls_missing else 1} WHEN {valid} THEN 0 ELSE 1 END"
+        return cls(columns, missing, f"SUM({flag})", params, f"FROM {table} WHERE ({flag}) = 1", params, row_format)
+
+
+def translate(rule, table, database):
+    """Translate a compiled rule into an SqlRule"""
+    from rule_suite import BetweenRule, InSetRule, MatchRegexRule, NotNullRule, PairGreaterRule, UniqueRule
+
+    columns = [quote(column) for column in rule.columns]
+    if isinstance(rule, (MatchRegexRule, BetweenRule, InSetRule, NotNullRule)):
+        column = columns[0]
+        missing = f"{column} IS NULL"
+        params = []
+        if isinstance(rule, MatchRegexRule):
+            valid, params = database.regex(column, rule.rule)
+        elif isinstance(rule, BetweenRule):
+            number = database.as_number(column)
+            conditions = [f"{number} IS NOT NULL"]
+            if rule.min_value is not None:
+                conditions.append(f"{number} {'>' if rule.strict_min else '>='} ?")
+                params.append(rule.min_value)
+            if rule.max_value is not None:
+                conditions.append(f"{number} {'<' if rule.strict_max else '<='} ?")
+                params.append(rule.max_value)
+            valid = " AND ".join(conditions)
+        elif isinstance(rule, InSetRule):
+            valid = f"{column} IN ({', '.join('?' for _ in rule.value_set)})" if rule.value_set else "1 = 0"
+            params = list(rule.value_set)
+        else:
+            valid = f"{column} IS NOT NULL"
+        return SqlRule.row_rule(rule.columns, table, missing, valid, params, rule.nulls_missing)
+
+    if isinstance(rule, PairGreaterRule):
+        a, b = columns
+        ignore_row_if = rule.kwargs.get("ignore_row_if", "both_values_are_missing")
+        if ignore_row_if == "both_values_are_missing":
+            missing = f"{a} IS NULL AND {b} IS NULL"
+        elif ignore_row_if == "either_value_is_missing":
+            missing = f"({a} IS NULL OR {b} IS NULL)"
+        else:
+            missing = "1 = 0"
+        valid = f"{a} {'>=' if rule.kwargs.get('or_equal') else '>'} {b}"
+        return SqlRule.row_rule(rule.columns, table, missing, valid, [], rule.nulls_missing, "tuple")
+
+    if isinstance(rule, UniqueRule):
+        # A row is missing when its whole key is; GROUP BY and PARTITION BY
+        # treat NULL key parts as equal, as pandas does
+        keys = ", ".join(columns)
+        missing = " AND ".join(f"{column} IS NULL" for column in columns)
+        present = f"FROM {table} WHERE NOT ({missing})"
+        unexpected = (f"(SELECT COALESCE(SUM(n), 0) FROM "
+                      f"(SELECT COUNT(*) AS n {present} GROUP BY {keys} HAVING COUNT(*) > 1) AS duplicated)")
+        sample_from = (f"FROM (SELECT {keys}, COUNT(*) OVER (PARTITION BY {keys}) AS opendq_count {present}) "
+                       f"AS counted WHERE opendq_count > 1")
+        return SqlRule(rule.columns, missing, unexpected, [], sample_from, [],
+                       "scalar" if len(columns) == 1 else "record")
+
+    raise ValueError(f"{rule.expectation_type} is not supported by the SQL backend")
+
+
+def _sample_value(row, columns, row_format):
+    if row_format == "scalar":
+        # Missing values come out of pandas as NaN
+        return float("nan") if row[0] is None else row[0]
+    if row_format == "tuple":
+        return tuple(row)
+    return dict(zip(columns, row))
+
+
+def _sampler(database, sql_rule, sample_size):
+    """The ``take_unexpected(limit, unique)`` callback of ExpectationAccumulator.update_counts"""
+    def take_unexpected(limit, unique):
+        selected = ", ".join(quote(column) for column in sql_rule.columns)
+        query = f"SELECT {'DISTINCT ' if unique else ''}{selected} {sql_rule.sample_from}"
+        params = list(sql_rule.sample_params)
+        # Distinct samples stop at the sample size too
+        limit = limit if limit is not None else sample_size
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [_sample_value(row, sql_rule.columns, sql_rule.row_format)
+                for row in database.execute(query, params).fetchall()]
+    return take_unexpected
+
+
+def run_sql(plan, database, table):
+    """Count every rule's unexpected and missing rows in one query and return a PlanState"""
+    from rule_suite import PlanState
+    from validation_stream import ExpectationAccumulator
+
+    partial = [mode for mode in plan.execution_modes if mode != "full"]
+    if partial:
+        raise ValueError(f"The SQL backend runs every rule in full; {partial[0]} mode is not supported")
+    table_sql = quote_table(table)
+    sql_rules = [translate(rule, table_sql, database) for rule in plan.rules]
+
+    select, params = ["COUNT(*)"], []
+    unexpected_positions, missing_positions = [], {}
+    for sql_rule in sql_rules:
+        unexpected_positions.append(len(select))
+        select.append(sql_rule.unexpected)
+        params.extend(sql_rule.params)
+        if sql_rule.missing not in missing_positions:
+            # Rules on the same columns share their missing count
+            missing_positions[sql_rule.missing] = len(select)
+            select.append(f"SUM(CASE WHEN {sql_rule.missing} THEN 1 ELSE 0 END)")
+    counts = database.execute(f"SELECT {', '.join(select)} FROM {table_sql}", params).fetchone()
+
+    state = PlanState([])
+    state.total_records = counts[0]
+    for rule, sql_rule, position in zip(plan.rules, sql_rules, unexpected_positions):
+        accumulator = rule.new_accumulator(plan.sample_size)
+        if not isinstance(accumulator, ExpectationAccumulator):
+            # The database counts the duplicates, so uniqueness only needs the counts
+            accumulator = ExpectationAccumulator(plan.sample_size, unique_sample=rule.unique_sample,
+                                                 track_missing=True)
+        accumulator.update_counts(counts[0], counts[position] or 0, counts[missing_positions[sql_rule.missing]] or 0,
+                                  _sampler(database, sql_rule, accumulator.sample_size))
+        state.accumulators.append(accumulator)
+    return state
+
+
+def validate_database(database, table, suite=None, engine=None, sample_size=DEFAULT_SAMPLE_SIZE,
+                      output_path="validation_results.json", history_path=None):
+    """Validate ``table`` of a SQLite or DuckDB file and write results like ``validate_with_pandas``
+
+    ``suite`` is an expectation suite dict or JSON path; by default the
+    built-in email, age and country checks run.
+    """
+    from results_history import ResultsHistory
+    from results_io import write_results
+    from rule_suite import compile_suite
+    from validate_with_pandas import CUSTOMER_CHECKS, print_summary
+
+    plan = compile_suite(suite or CUSTOMER_CHECKS, sample_size=sample_size)
+    db = open_database(database, engine)
+    try:
+        state = run_sql(plan, db, table)
+    finally:
+        db.close()
+    results = plan.build_results(state)
+    write_results(results, output_path)
+    if history_path:
+        with ResultsHistory(history_path) as history:
+            history.record(results, suite_name=plan.suite_name, source=f"{database}:{table}")
+    print_summary(results, output_path)
+    return results
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Validate a SQLite or DuckDB table in the database")
+    parser.add_argument("--database", required=True, help="SQLite or DuckDB (.duckdb, .ddb) database file")
+    parser.add_argument("--table", required=True, help="Table or view to validate, optionally schema.table")
+    parser.add_argument("--engine", choices=["sqlite", "duckdb"], help="Database engine (default: by extension)")
+    parser.add_argument("--suite", help="Expectation suite JSON to run instead of the built-in checks")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help="Maximum number of unexpected values kept per expectation")
+    parser.add_argument("--output", default="validation_results.json",
+                        help="Results file; a .ndjson extension writes compact NDJSON")
+    parser.add_argument("--history", help="Also append the results to this SQLite history file")
+    args = parser.parse_args(argv)
+    validate_database(args.database, args.table, suite=args.suite, engine=args.engine,
+                      sample_size=args.sample_size, output_path=args.output, history_path=args.history)
+
+
+if __name__ == "__main__":
+    main()
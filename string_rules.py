@@ -0,0 +1,227 @@
+"""Regex rules compiled once per pattern, with prefilters and a verdict cache.
+
+A RegexRule answers "does this value match" for whole columns:
+
+- patterns with an equivalent ``fullmatch`` form run vectorized in Arrow's
+  regex engine; when a chunk is mostly repeated values (a column of
+  corporate domains, say) only its distinct values are matched
+- other patterns fall back to Python's ``re``, after cheap prefilters
+  derived from the pattern (characters every match contains, and length
+  bounds) rule out values without running the regex, and with verdicts
+  memoized per distinct value in a bounded LRU cache
+
+``regex_rule`` returns one shared RegexRule per pattern, so every rule,
+suite and script using a pattern shares its compiled form and cache.
+numpy and pandas are imported on first column match, so importing
+EMAIL_PATTERN stays cheap.
+"""
+import functools
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+# Pattern parts Arrow's RE2 engine reads differently from ``re`` or lacks:
+# \w, \d, \s and \b are ASCII-only there, and lookarounds, backreferences,
+# atomic groups, possessive repeats and \Z are not supported
+_RE2_UNSUPPORTED = {sre_parse.ASSERT, sre_parse.ASSERT_NOT, sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS,
+                    getattr(sre_parse, "ATOMIC_GROUP", None), getattr(sre_parse, "POSSESSIVE_REPEAT", None)}
+_RE2_UNSAFE_ANCHORS = {sre_parse.AT_BOUNDARY, sre_parse.AT_NON_BOUNDARY, sre_parse.AT_END_STRING}
+_RE2_UNSAFE_CLASSES = {(sre_parse.CATEGORY, category) for category in (
+    sre_parse.CATEGORY_WORD, sre_parse.CATEGORY_NOT_WORD, sre_parse.CATEGORY_DIGIT,
+    sre_parse.CATEGORY_NOT_DIGIT, sre_parse.CATEGORY_SPACE, sre_parse.CATEGORY_NOT_SPACE)}
+# Source syntax RE2 reads differently (a{,3} is literal text there and
+# [[:alpha:]] a POSIX class) or rejects (\N{...}, \u and \U escapes)
+_RE2_UNSAFE_SYNTAX = re.compile(r'\{,|\[:|\\[NuU]')
+
+
+def _fullmatch_pattern(pattern):
+    """Rewrite an anchored ``re.match`` pattern for ``Series.str.fullmatch``
+
+    Returns None when the rewrite cannot be shown to be equivalent, in which
+    case callers fall back to the compiled regex.
+    """
+    if not pattern.startswith('^') or not pattern.endswith('$') or '|' in pattern:
+        return None
+    # An odd number of backslashes before the final "$" means it is a literal
+    trailing_backslashes = len(pattern[:-1]) - len(pattern[:-1].rstrip('\\'))
+    if trailing_backslashes % 2 or _RE2_UNSAFE_SYNTAX.search(pattern):
+        return None
+    try:
+        if not _re2_compatible(sre_parse.parse(pattern)):
+            return None
+    except re.error:
+        return None
+    # re.match lets "$" match just before a final newline; fullmatch does not,
+    # so allow that newline explicitly to keep both verdicts identical.
+    return pattern[1:-1] + r'\n?'
+
+
+def _re2_compatible(parsed):
+    """Whether RE2 gives every part of a parsed pattern the meaning ``re`` does"""
+    for op, av in parsed:
+        if op in _RE2_UNSUPPORTED or (op is sre_parse.AT and av in _RE2_UNSAFE_ANCHORS):
+            return False
+        if op is sre_parse.IN and any(item in _RE2_UNSAFE_CLASSES for item in av):
+            return False
+        # Groups, repeats and branches hold their contents as sub-patterns
+        children = av if isinstance(av, (tuple, list)) else ()
+        for child in children:
+            subpatterns = child if isinstance(child, list) else [child]
+            if any(isinstance(sub, sre_parse.SubPattern) and not _re2_compatible(sub) for sub in subpatterns):
+                return False
+    return True
+
+
+def _prefilters(pattern):
+    """Required characters and (min, max) length of any string ``re.match`` accepts
+
+    Only proven bounds are returned: ``max`` is None unless the pattern is
+    anchored at the end, and no characters are required under IGNORECASE.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return frozenset(), 0, None
+    flags = parsed.state.flags
+    required = frozenset() if flags & re.IGNORECASE else frozenset(_required_literals(parsed))
+    low, high = parsed.getwidth()
+    anchored = len(parsed) > 0 and parsed[-1] == (sre_parse.AT, sre_parse.AT_END)
+    max_length = None
+    if anchored and not flags & re.MULTILINE and high < sre_parse.MAXREPEAT:
+        # "$" also matches before a final newline
+        max_length = high + 1
+    return required, low, max_length
+
+
+def _required_literals(parsed):
+    """Literal characters on the mandatory path of a parsed pattern"""
+    literals = set()
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            literals.add(chr(av))
+        elif op is sre_parse.SUBPATTERN and not av[1] & re.IGNORECASE:
+            literals |= _required_literals(av[-1])
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            literals |= _required_literals(av[2])
+    return literals
+
+
+def as_strings(series):
+    """Convert a column to strings, preferring the Arrow-backed string dtype"""
+    try:
+        return series.astype('string[pyarrow]')
+    except ImportError:
+        return series.astype(str)
+
+
+DEFAULT_CACHE_SIZE = 65536
+# Values sampled from a chunk to decide whether to match only its distinct values
+DISTINCT_SAMPLE = 4096
+REPEATED_RATIO = 0.5
+
+
+class RegexRule:
+    """A regex check compiled once and applied to whole columns at a time"""
+
+    def __init__(self, pattern, cache_size=DEFAULT_CACHE_SIZE):
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+        self.vector_pattern = _fullmatch_pattern(pattern)
+        self.required, self.min_length, self.max_length = _prefilters(pattern)
+        # Verdicts per distinct string, for the Python regex path
+        self._match_text = functools.lru_cache(maxsize=cache_size)(self._match_uncached)
+
+    def passes_prefilter(self, text):
+        """False when ``text`` cannot match, decided without running the regex"""
+        if len(text) < self.min_length or (self.max_length is not None and len(text) > self.max_length):
+            return False
+        return all(char in text for char in self.required)
+
+    def _match_uncached(self, text):
+        return self.passes_prefilter(text) and self.regex.match(text) is not None
+
+    def cache_info(self):
+        return self._match_text.cache_info()
+
+    def match_scalar(self, value):
+        """Check a single value, with the same verdict as ``match_series``"""
+        return self._match_text(str(value))
+
+    def match_series(self, series):
+        """Return a boolean numpy mask of the values matching the pattern
+
+        Missing values never match.
+        """
+        return self.match_strings(as_strings(series))
+
+    def match_strings(self, strings):
+        """Like ``match_series`` for a column already converted by ``as_strings``"""
+        import numpy as np
+        import pandas as pd
+
+        if self.vector_pattern is None:
+            candidates = self._prefilter_strings(strings)
+            texts = strings[candidates]
+            matched = np.zeros(len(strings), dtype=bool)
+            if _mostly_repeated(texts):
+                # Look up each distinct value once, through the cache shared across chunks
+                codes, uniques = pd.factorize(texts)
+                matched[candidates] = np.array([self._match_text(text) for text in uniques], dtype=bool)[codes]
+            else:
+                # Mostly distinct values would only churn the cache
+                regex_match = self.regex.match
+                matched[candidates] = [regex_match(text) is not None for text in texts.tolist()]
+            return matched
+        if _mostly_repeated(strings):
+            # Match each distinct value once; code -1 (missing) picks the extra False
+            codes, uniques = pd.factorize(strings)
+            distinct = pd.Series(uniques, dtype=strings.dtype)
+            return np.append(self._fullmatch(distinct), False)[codes]
+        return self._fullmatch(strings)
+
+    def _fullmatch(self, strings):
+        matched = strings.str.fullmatch(self.vector_pattern)
+        return matched.fillna(False).to_numpy(dtype=bool)
+
+    def _prefilter_strings(self, strings):
+        """Vectorized ``passes_prefilter``; missing values never pass"""
+        lengths = strings.str.len()
+        passes = lengths >= self.min_length
+        if self.max_length is not None:
+            passes &= lengths <= self.max_length
+        for char in self.required:
+            passes &= strings.str.contains(char, regex=False)
+        return passes.fillna(False).to_numpy(dtype=bool)
+
+    def match_arrow(self, array):
+        """Like ``match_strings`` for an Arrow string array, matched in place with Arrow's regex engine
+
+        Only valid when ``vector_pattern`` is set; missing values give nulls.
+        """
+        import pyarrow.compute as pc
+        pattern = f"^(?:{self.vector_pattern})$"
+        sample = array.slice(0, DISTINCT_SAMPLE)
+        if len(array) >= 2 * len(sample) and pc.count_distinct(sample).as_py() <= REPEATED_RATIO * len(sample):
+            encoded = pc.dictionary_encode(array)
+            return pc.match_substring_regex(encoded.dictionary, pattern).take(encoded.indices)
+        return pc.match_substring_regex(array, pattern)
+
+
+def _mostly_repeated(strings):
+    """Whether a chunk's leading values repeat enough to match distinct values only"""
+    sample = strings.iloc[:DISTINCT_SAMPLE]
+    return len(strings) >= 2 * len(sample) and sample.nunique() <= REPEATED_RATIO * len(sample)
+
+
+@functools.lru_cache(maxsize=256)
+def regex_rule(pattern):
+    """The shared RegexRule for ``pattern``, compiled once per process"""
+    return RegexRule(pattern)
+
+
+EMAIL_RULE = regex_rule(EMAIL_PATTERN)
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batch_validate import BatchValidator, MemoryBudget, parse_size  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+SUITE = {"expectation_suite_name": "ages", "expectations": [
+    {"expectation_type": "expect_column_values_to_be_between",
+     "kwargs": {"column": "age", "min_value": 18, "max_value": 60}}]}
+
+
+def _write_partitions(tmp_path, sizes):
+    paths, frames = [], []
+    for index, size in enumerate(sizes):
+        # Every partition has its own unexpected ages, so the sample shows the merge order
+        df = pd.DataFrame({"age": [100 + index] * 3 + [30] * (size - 3)})
+        path = tmp_path / f"part{index}.csv"
+        df.to_csv(path, index=False)
+        paths.append(str(path))
+        frames.append(df)
+    return paths, pd.concat(frames)
+
+
+def _validator(tmp_path, **options):
+    return BatchValidator(SUITE, partition_dir=str(tmp_path / "partitions"), sample_size=5, **options)
+
+
+def test_unreadable_partition_is_recorded_and_fails_the_run(tmp_path):
+    paths, _ = _write_partitions(tmp_path, [10])
+    missing = str(tmp_path / "missing.csv")
+    validation = _validator(tmp_path, workers=1).run(paths + [missing])["validation_results"]
+    assert not validation["success"]
+    assert validation["statistics"]["unreadable_partitions"] == 1
+    assert validation["partitions"][1]["path"] == missing
+    assert validation["partitions"][1]["error"].startswith("FileNotFoundError")
+    assert validation["statistics"]["total_records"] == 10
+
+
+def test_combined_results_follow_input_order(tmp_path):
+    # The first partition is much larger, so the others finish before it
+    paths, whole = _write_partitions(tmp_path, [200_000, 10, 10, 10])
+    plan = compile_suite(SUITE, sample_size=5)
+    expected = plan.build_results(plan.run([whole]))["validation_results"]["expectations"][0]["result"]
+    for workers in (1, 3):
+        validation = _validator(tmp_path, workers=workers).run(paths)["validation_results"]
+        assert validation["expectations"][0]["result"] == expected
+        assert [partition["path"] for partition in validation["partitions"]] == paths
+
+
+def test_partition_names_must_be_unique(tmp_path):
+    paths, _ = _write_partitions(tmp_path, [10])
+    (tmp_path / "other").mkdir()
+    copy = tmp_path / "other" / "part0.csv"
+    copy.write_text(open(paths[0]).read())
+    with pytest.raises(ValueError, match="repeated: part0"):
+        _validator(tmp_path).run(paths + [str(copy)])
+
+
+def test_memory_budget_holds_back_partitions_over_the_limit():
+    async def scenario():
+        budget = MemoryBudget(100)
+        await budget.acquire(60)
+        waiting = asyncio.create_task(budget.acquire(60))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        await budget.release(60)
+        await asyncio.wait_for(waiting, 1)
+        # A partition larger than the whole budget runs once nothing else is held
+        await budget.release(60)
+        await asyncio.wait_for(budget.acquire(500), 1)
+        return budget.used
+
+    assert asyncio.run(scenario()) == 500
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("512M", 512 * 1024 ** 2), ("2G", 2 * 1024 ** 3), ("1.5GiB", int(1.5 * 1024 ** 3)), ("4096", 4096)])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+def test_parse_size_rejects_unknown_units():
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("12X")
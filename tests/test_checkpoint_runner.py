@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from checkpoint_runner import run_checkpoint  # noqa: E402
+from run_store import RunStore  # noqa: E402
+
+
+class _ValidationResult:
+    def __init__(self, data):
+        self.data = data
+
+    def to_json_dict(self):
+        return self.data
+
+
+class _CheckpointResult:
+    def __init__(self, validations):
+        self.validations = validations
+
+    def list_validation_results(self):
+        return [_ValidationResult(data) for data in self.validations]
+
+
+class _Context:
+    """Stands in for a data context: run_checkpoint only needs run_checkpoint()"""
+
+    def __init__(self, validations):
+        self.validations = validations
+        self.checkpoints = []
+
+    def run_checkpoint(self, checkpoint_name):
+        self.checkpoints.append(checkpoint_name)
+        return _CheckpointResult(self.validations)
+
+
+def _validation(suite_name, run_time, success):
+    return {"success": success, "statistics": {"evaluated_expectations": 2},
+            "meta": {"expectation_suite_name": suite_name, "run_id": {"run_time": run_time}}}
+
+
+def test_checkpoint_results_are_stored_by_suite_and_run_time(tmp_path):
+    store = RunStore(str(tmp_path / "run_store"))
+    newer = _validation("customers", "2024-03-02T08:00:00.000000Z", True)
+    context = _Context([newer, _validation("orders", "2024-03-02T08:00:00.000000+00:00", False)])
+    result, stored = run_checkpoint("nightly", context=context, store=store)
+
+    assert context.checkpoints == ["nightly"]
+    assert [validation.to_json_dict() for validation in result.list_validation_results()] == context.validations
+    assert [(suite, validation) for suite, _, validation in stored] == [
+        ("customers", context.validations[0]), ("orders", context.validations[1])]
+    # Run ids start with the validation's own run time, not the time it was stored
+    assert [run_id[:16] for _, run_id, _ in stored] == ["20240302T080000.", "20240302T080000."]
+    assert store.load_latest("customers") == newer
+    assert [entry["success"] for entry in store.runs("orders")] == [False]
+
+    # A checkpoint result that started earlier is stored but does not become the latest
+    older = _validation("customers", "2024-03-01T08:00:00.000000Z", False)
+    run_checkpoint("nightly", context=_Context([older]), store=store)
+    assert store.load_latest("customers") == newer
+    assert [entry["success"] for entry in store.runs("customers")] == [True, False]
@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profile_data import profile_frames  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+
+def _baseline(tmp_path, df):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(profile_frames([df]).to_dict()))
+    return str(path)
+
+
+def _category_suite(baseline, metric="max_shift"):
+    return {"expectation_suite_name": "drift", "expectations": [{
+        "expectation_type": "expect_column_category_frequencies_to_match_baseline",
+        "kwargs": {"column": "country", "baseline": baseline, "metric": metric}}]}
+
+
+def test_unseen_categories_fall_in_other_bin(tmp_path):
+    baseline = _baseline(tmp_path, pd.DataFrame({"country": ["India", "USA", "UK"] * 100}))
+    current = pd.DataFrame({"country": ["India", "USA", "UK"] * 70 + ["Germany"] * 90})
+    for metric in ("max_shift", "psi"):
+        plan = compile_suite(_category_suite(baseline, metric))
+        # Two chunks, so the new value arrives in both and the counts merge
+        state = plan.run([current.iloc[:150], current.iloc[150:]])
+        result = plan.build_results(state)["validation_results"]["expectations"][0]
+        drift = result["result"]["details"]["drift"]
+        assert not result["success"]
+        assert drift["observed_count"] == 300
+        assert "Germany" in drift["new_values"]
+        other = [shift for shift in drift["shifts"] if shift["value"] is None]
+        assert other == [{"value": None, "baseline_share": 0.0, "observed_share": 0.3}]
+
+
+def test_matching_categories_pass(tmp_path):
+    df = pd.DataFrame({"country": ["India", "USA", "UK"] * 100})
+    plan = compile_suite(_category_suite(_baseline(tmp_path, df)))
+    results = plan.build_results(plan.run([df]))
+    assert results["validation_results"]["success"]
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rule_suite import compile_suite  # noqa: E402
+
+EXECUTION = {"mode": "sample", "sample_fraction": 0.1, "seed": 7}
+SUITE = {"expectation_suite_name": "ages", "meta": {"opendq": {"execution": EXECUTION}}, "expectations": [{
+    "expectation_type": "expect_column_values_to_be_between",
+    "kwargs": {"column": "age", "min_value": 18, "max_value": 60}}]}
+
+
+def test_seeded_sample_repeats_across_runs_of_one_plan():
+    df = pd.DataFrame({"age": [i % 80 for i in range(10_000)]})
+    plan = compile_suite(SUITE)
+    first, second = (plan.build_results(plan.run([df]))["validation_results"]["expectations"][0]["result"]
+                     for _ in range(2))
+    assert first == second
+
+
+def test_parts_of_a_split_run_get_distinct_seeded_streams():
+    plan = compile_suite(SUITE)
+    draws = [plan.new_state(stream).rng.random(5).tolist() for stream in (None, 0, 1, 1)]
+    assert draws[2] == draws[3]
+    assert len({tuple(draw) for draw in draws}) == 3
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from incremental_validate import validate_incremental  # noqa: E402
+
+
+def _suite(expectation_type="expect_column_values_to_not_be_null"):
+    return {"expectation_suite_name": "customers",
+            "expectations": [{"expectation_type": expectation_type, "kwargs": {"column": "id"}}]}
+
+
+def test_rejects_non_csv_input(tmp_path):
+    path = tmp_path / "customers.parquet"
+    pd.DataFrame({"id": [1, 2]}).to_parquet(path)
+    with pytest.raises(ValueError, match="supports CSV input, not parquet"):
+        validate_incremental(str(path), _suite())
+
+
+def test_rejects_exact_uniqueness_before_scanning(tmp_path):
+    path = tmp_path / "customers.csv"
+    path.write_text("id\n1\n2\n")
+    with pytest.raises(ValueError, match="expect_column_values_to_be_unique on id cannot run incrementally"):
+        validate_incremental(str(path), _suite("expect_column_values_to_be_unique"))
+    assert not os.path.exists(f"{path}.validation_state.json")
+
+
+def test_unique_pair_samples_survive_the_state_file(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("shipped,ordered\n" + "".join(f"{i % 3},{5 + i % 2}\n" for i in range(10)))
+    suite = {"expectation_suite_name": "orders", "expectations": [{
+        "expectation_type": "expect_column_pair_values_A_to_be_greater_than_B",
+        "kwargs": {"column_A": "shipped", "column_B": "ordered"},
+        "meta": {"opendq": {"sample": "unique"}}}]}
+    results = []
+    for expected_revalidated in (3, 0):
+        plan, state, revalidated = validate_incremental(str(path), suite, chunk_rows=4)
+        assert revalidated == expected_revalidated
+        results.append(plan.build_results(state)["validation_results"]["expectations"][0]["result"])
+    assert results[0] == results[1]
+    assert results[1]["partial_unexpected_list"] == [(0, 5), (1, 6), (2, 5), (0, 6), (1, 5), (2, 6)]
@@ -0,0 +1,85 @@
+import math
+import os
+import re
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import PHASES, format_metrics, write_metrics  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+SUITE_NAME = 'orders "daily"\\eu'
+METRIC_NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+LABEL = rf'[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*"'
+SAMPLE = re.compile(rf"({METRIC_NAME})(\{{{LABEL}(?:,{LABEL})*\}})? (\S+)")
+
+
+def _profiled_run():
+    suite = {"expectation_suite_name": SUITE_NAME, "meta": {"opendq": {"execution": {"profile": True}}},
+             "expectations": [
+                 {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "id"}},
+                 {"expectation_type": "expect_column_values_to_be_between",
+                  "kwargs": {"column": "amount", "min_value": 0, "max_value": 100}},
+             ]}
+    plan = compile_suite(suite)
+    df = pd.DataFrame({"id": [1, 2, None, 4], "amount": [5.0, 250.0, 10.0, -1.0]})
+    state = plan.run([df.iloc[:2], df.iloc[2:]])
+    return state.profile, plan.build_results(state)
+
+
+def _parse(text, openmetrics):
+    """Check the exposition format line by line and return {family: [(labels, value)]}"""
+    assert text.endswith("\n")
+    lines = text[:-1].split("\n")
+    if openmetrics:
+        assert lines.pop() == "# EOF"
+    assert "# EOF" not in lines
+    families, helped, current = {}, set(), None
+    for line in lines:
+        if line.startswith("# HELP "):
+            name = line.split(" ")[2]
+            assert re.fullmatch(METRIC_NAME, name) and name not in helped
+            helped.add(name)
+        elif line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name in helped and name not in families and kind == "gauge"
+            families[name], current = [], name
+        else:
+            match = SAMPLE.fullmatch(line)
+            assert match, line
+            name, labels, value = match.groups()
+            # Samples follow the TYPE line of their own family
+            assert name == current, line
+            assert not math.isnan(float(value))
+            families[name].append((labels, float(value)))
+    return families
+
+
+@pytest.mark.parametrize("metrics_format", ["prometheus", "openmetrics"])
+def test_metrics_are_valid_exposition_text(metrics_format):
+    profile, results = _profiled_run()
+    families = _parse(format_metrics(SUITE_NAME, profile, results, metrics_format), metrics_format == "openmetrics")
+
+    assert len(families["opendq_rule_wall_seconds"]) == 2
+    assert len(families["opendq_phase_cpu_seconds"]) == len(PHASES)
+    assert families["opendq_run_success"] == [('{suite="orders \\"daily\\"\\\\eu"}', 0.0)]
+    assert families["opendq_run_records"][0][1] == 4
+    assert [value for _, value in families["opendq_rule_unexpected"]] == [1, 2]
+    assert [value for _, value in families["opendq_rule_rows"]] == [4, 4]
+
+
+def test_write_metrics_replaces_the_file(tmp_path):
+    profile, results = _profiled_run()
+    path = tmp_path / "opendq.prom"
+    path.write_text("stale")
+    write_metrics(str(path), "orders", profile, results)
+    assert path.read_text() == format_metrics("orders", profile, results)
+    assert os.listdir(tmp_path) == ["opendq.prom"]
+
+
+def test_unknown_format_is_rejected():
+    profile, _ = _profiled_run()
+    with pytest.raises(ValueError, match="Unknown metrics format"):
+        format_metrics("orders", profile, metrics_format="statsd")
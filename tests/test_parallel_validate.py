@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parallel_validate import split_ranges, validate_parallel, validate_range  # noqa: E402
+from readers import run_plan  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+SUITE = {"expectation_suite_name": "notes", "expectations": [
+    {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "note"}}]}
+
+
+def test_quoted_line_breaks_fall_back_to_one_process(tmp_path):
+    path = tmp_path / "notes.csv"
+    path.write_text("id,note\n" + "".join(f'{i},"first line\nsecond line"\n' for i in range(100)))
+    # Ranges cut inside quoted notes
+    assert len(split_ranges(str(path), 8)) > 1
+    plan, state = validate_parallel(str(path), SUITE, workers=2)
+    expected = compile_suite(SUITE)
+    assert (plan.build_results(state)["validation_results"]["expectations"][0]["result"]
+            == expected.build_results(run_plan(expected, str(path)))["validation_results"]["expectations"][0]["result"])
+    assert state.total_records == 100
+
+
+def test_each_range_draws_its_own_row_sample(tmp_path):
+    # Two ranges with the same rows: one shared seed would sample the same offsets in both
+    header, rows = "age\n", "".join(f"{i}\n" for i in range(1000))
+    path = tmp_path / "ages.csv"
+    path.write_text(header + rows + rows)
+    start, middle = len(header), len(header) + len(rows)
+    suite = {"expectation_suite_name": "ages",
+             "meta": {"opendq": {"execution": {"mode": "sample", "sample_fraction": 0.1, "seed": 7}}},
+             "expectations": [{"expectation_type": "expect_column_values_to_be_between",
+                               "kwargs": {"column": "age", "min_value": 1000}}]}
+    plan = compile_suite(suite)
+
+    def sampled(stream, start, end):
+        state = validate_range(str(path), start, end, suite, stream=stream)
+        return plan.build_results(state)["validation_results"]["expectations"][0]["result"]
+
+    first, second = sampled(0, start, middle), sampled(1, middle, middle + len(rows))
+    assert first["partial_unexpected_list"] != second["partial_unexpected_list"]
+    # A range's sample depends only on the seed and its number
+    assert sampled(1, middle, middle + len(rows)) == second
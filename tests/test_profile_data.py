@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profile_data import profile_data, profile_frames, suggest_suite, write_profile  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+
+def _suggest(df):
+    return suggest_suite(profile_frames([df]).to_dict())
+
+
+def _validate(suite, df):
+    plan = compile_suite(suite)
+    return plan.build_results(plan.run([df]))["validation_results"]
+
+
+def _in_set(suite):
+    return [exp["kwargs"] for exp in suite["expectations"]
+            if exp["expectation_type"] == "expect_column_values_to_be_in_set"]
+
+
+def test_column_with_more_values_than_top_k_gets_no_set():
+    df = pd.DataFrame({"code": [f"c{i % 25}" for i in range(1000)]})
+    suite = _suggest(df)
+    assert _in_set(suite) == []
+    assert _validate(suite, df)["success"]
+
+
+def test_small_set_lists_every_value():
+    df = pd.DataFrame({"country": ["India", "USA", "UK", "Japan"] * 50})
+    suite = _suggest(df)
+    assert _in_set(suite) == [{"column": "country", "value_set": ["India", "Japan", "UK", "USA"]}]
+    assert _validate(suite, df)["success"]
+
+
+def test_suite_written_from_a_file_profile_validates_the_file(tmp_path):
+    df = pd.DataFrame({
+        "order_id": range(1, 301),
+        "amount": [round(2.5 + i * 0.75, 2) for i in range(300)],
+        "status": ["new", "paid", "shipped"] * 100,
+        "note": [None if i % 3 else "gift" for i in range(300)],
+    })
+    path = tmp_path / "orders.csv"
+    df.to_csv(path, index=False)
+    suite_path = tmp_path / "suite.json"
+    write_profile(profile_data(str(path), chunksize=64), str(tmp_path / "profile.json"), str(suite_path))
+    with open(suite_path) as f:
+        suite = json.load(f)
+
+    kwargs = {(exp["expectation_type"], exp["kwargs"]["column"]): exp["kwargs"] for exp in suite["expectations"]}
+    assert kwargs[("expect_column_values_to_be_between", "order_id")] == {
+        "column": "order_id", "min_value": 1, "max_value": 300}
+    assert kwargs[("expect_column_values_to_be_between", "amount")]["max_value"] == 226.75
+    assert kwargs[("expect_column_values_to_be_in_set", "status")]["value_set"] == ["new", "paid", "shipped"]
+    assert ("expect_column_values_to_not_be_null", "note") not in kwargs
+    assert suite["meta"]["total_records"] == 300
+
+    assert _validate(suite, pd.read_csv(path))["success"]
+    changed = pd.read_csv(path)
+    changed.loc[0, "status"] = "lost"
+    changed.loc[1, "amount"] = 1000.0
+    results = _validate(suite, changed)
+    failed = [(exp["expectation_type"], rule.columns) for exp, rule in zip(results["expectations"], compile_suite(suite).rules)
+              if not exp["success"]]
+    assert sorted(failed) == [("expect_column_values_to_be_between", ["amount"]),
+                              ("expect_column_values_to_be_in_set", ["status"])]
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from quarantine import QuarantineWriter, run_with_quarantine  # noqa: E402
+from readers import read_frames  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+SUITE = {"expectation_suite_name": "customers", "expectations": [
+    {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "email"}}]}
+
+
+@pytest.mark.parametrize("quarantine_name, clean_name", [
+    ("quarantine.parquet", "clean.parquet"), ("quarantine.arrow", "clean.arrow"), ("quarantine.parquet", "clean.csv")])
+def test_column_empty_in_first_chunk(tmp_path, quarantine_name, clean_name):
+    # The first chunk reads email as an all-NaN float column, the second as strings
+    path = tmp_path / "customers.csv"
+    emails = [""] * 5 + [f"user{i}@example.com" for i in range(5)]
+    path.write_text("id,email\n" + "".join(f"{i},{email}\n" for i, email in enumerate(emails)))
+    plan = compile_suite(SUITE)
+    quarantine_path, clean_path = str(tmp_path / quarantine_name), str(tmp_path / clean_name)
+    # One-row batches, so rows are already written when the type widens
+    with QuarantineWriter(plan, quarantine_path, clean_path, full_rows=True, batch_rows=1) as writer:
+        run_with_quarantine(plan, str(path), writer, chunksize=5)
+
+    quarantined = pd.concat(read_frames(quarantine_path))
+    assert quarantined["_row"].tolist() == [0, 1, 2, 3, 4]
+    assert quarantined["email"].isna().all()
+    clean = pd.concat(read_frames(clean_path))
+    assert clean["id"].tolist() == [5, 6, 7, 8, 9]
+    assert clean["email"].tolist() == emails[5:]
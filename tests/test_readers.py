@@ -0,0 +1,28 @@
+import os
+import sys
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from readers import run_plan  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+SUITE = {"expectation_suite_name": "scores", "expectations": [
+    {"expectation_type": "expect_column_values_to_be_between",
+     "kwargs": {"column": "score", "min_value": 0, "max_value": 10}},
+    {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "score"}}]}
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.float16])
+def test_parquet_statistics_do_not_settle_nan(tmp_path, dtype):
+    path = tmp_path / "scores.parquet"
+    # A NaN, not a null: the statistics read min 1, max 3 and no nulls
+    pq.write_table(pa.table({"score": pa.array(np.array([1.0, np.nan, 3.0], dtype=dtype))}), path)
+    plan = compile_suite(SUITE)
+    results = plan.build_results(run_plan(plan, str(path)))["validation_results"]["expectations"]
+    between, not_null = (result["result"] for result in results)
+    assert between["missing_count"] == 1
+    assert not_null["unexpected_count"] == 1
@@ -0,0 +1,79 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from results_history import ResultsHistory, format_run_time, parse_since  # noqa: E402
+from rule_suite import compile_suite  # noqa: E402
+
+SUITE = {"expectation_suite_name": "customers", "expectations": [
+    {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "email"}, "meta": {"column": "email"}},
+    {"expectation_type": "expect_column_values_to_be_between",
+     "kwargs": {"column": "age", "min_value": 18, "max_value": 99}, "meta": {"column": "age"}},
+]}
+
+
+def _results(emails, ages):
+    plan = compile_suite(SUITE)
+    return plan.build_results(plan.run([pd.DataFrame({"email": emails, "age": ages})]))
+
+
+def _at(day, hour=12):
+    return datetime(2024, 3, day, hour, tzinfo=timezone.utc)
+
+
+def test_recorded_runs_read_back(tmp_path):
+    with ResultsHistory(str(tmp_path / "history.sqlite")) as history:
+        first = history.record(_results(["a@x", "b@x", "c@x", "d@x"], [20, 30, 40, 50]), "customers", _at(1), "day1.csv")
+        second = history.record(_results(["a@x", None, "c@x", "d@x"], [20, 30, 12, 150]), "customers", _at(2), "day2.csv")
+        history.record(_results(["a@x"], [20]), "suppliers", _at(2, 13))
+
+        assert history.runs(suite="customers") == [
+            (second, "customers", format_run_time(_at(2)), "day2.csv", 0, 4),
+            (first, "customers", format_run_time(_at(1)), "day1.csv", 1, 4),
+        ]
+        assert [run[1] for run in history.runs(limit=1)] == ["suppliers"]
+        assert history.trend(rule="expect_column_values_to_be_between", column="age", suite="customers") == [
+            (format_run_time(_at(1)), "customers", "expect_column_values_to_be_between", "age", 0.0, 1),
+            (format_run_time(_at(2)), "customers", "expect_column_values_to_be_between", "age", 50.0, 0),
+        ]
+        assert history.trend(column="email", since=format_run_time(_at(2))) == [
+            (format_run_time(_at(2)), "customers", "expect_column_values_to_not_be_null", "email", 25.0, 0),
+            (format_run_time(_at(2, 13)), "suppliers", "expect_column_values_to_not_be_null", "email", 0.0, 1),
+        ]
+        assert history.trend(column="age", bucket="day") == [
+            ("2024-03-01", "expect_column_values_to_be_between", "age", 1, 0.0, 0.0, 0),
+            ("2024-03-02", "expect_column_values_to_be_between", "age", 2, 25.0, 50.0, 1),
+        ]
+
+    # A new connection sees the same history
+    with ResultsHistory(str(tmp_path / "history.sqlite")) as history:
+        assert len(history.runs()) == 3
+
+
+def test_great_expectations_results_are_recorded(tmp_path):
+    validation = {
+        "success": False,
+        "statistics": {"evaluated_expectations": 1, "successful_expectations": 0},
+        "meta": {"expectation_suite_name": "customers_ge"},
+        "results": [{
+            "success": False,
+            "expectation_config": {"expectation_type": "expect_compound_columns_to_be_unique",
+                                   "kwargs": {"column_list": ["first", "last"]}},
+            "result": {"element_count": 10, "unexpected_count": 2, "unexpected_percent": 20.0},
+        }],
+    }
+    with ResultsHistory(str(tmp_path / "history.sqlite")) as history:
+        history.record(validation, run_time=_at(5))
+        assert history.trend(column="first, last") == [
+            (format_run_time(_at(5)), "customers_ge", "expect_compound_columns_to_be_unique", "first, last", 20.0, 0)]
+
+
+def test_parse_since():
+    now = datetime(2024, 3, 31, tzinfo=timezone.utc)
+    assert parse_since("30d", now) == "2024-03-01T00:00:00.000000Z"
+    assert parse_since("12h", now) == "2024-03-30T12:00:00.000000Z"
+    assert parse_since("2024-01-01") == "2024-01-01T00:00:00.000000Z"
+    assert parse_since(None) is None
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rule_suite import compile_suite  # noqa: E402
+from sql_backend import SqliteDatabase, open_database, quote, quote_table, run_sql  # noqa: E402
+
+# Names that need quoting: a dot inside a column name, quotes and spaces
+TABLE = 'order "lines"'
+DATA = pd.DataFrame({
+    "e.mail": ["a@x.com", "bad", None, "c@y.org", "bad", "d@z.io"],
+    'age "years"': [25, 17, None, 61.5, 40, 30],
+    "country": ["UK", "USA", "Mars", None, "USA", "UK"],
+    "shipped": [5, 1, 3, None, 2, 9],
+    "ordered": [4, 2, 3, 1, None, 9],
+    "code": ["a", "b", "a", "c", "b", "d"],
+})
+SUITE = {"expectation_suite_name": "orders", "expectations": [
+    {"expectation_type": "expect_column_values_to_match_regex",
+     "kwargs": {"column": "e.mail", "regex": r"^[a-z]+@[a-z]+\.[a-z]+$"}},
+    {"expectation_type": "expect_column_values_to_be_between",
+     "kwargs": {"column": 'age "years"', "min_value": 18, "max_value": 60}},
+    {"expectation_type": "expect_column_values_to_be_in_set",
+     "kwargs": {"column": "country", "value_set": ["UK", "USA"]}},
+    {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "e.mail"}},
+    {"expectation_type": "expect_column_pair_values_A_to_be_greater_than_B",
+     "kwargs": {"column_A": "shipped", "column_B": "ordered"}},
+    {"expectation_type": "expect_column_values_to_be_unique", "kwargs": {"column": "code"}},
+    {"expectation_type": "expect_compound_columns_to_be_unique", "kwargs": {"column_list": ["code", "country"]}},
+]}
+
+
+def _write_sqlite(path, df, table=TABLE):
+    with sqlite3.connect(path) as connection:
+        df.to_sql(table, connection, index=False)
+    return str(path)
+
+
+def _results(plan, state):
+    return [exp["result"] for exp in plan.build_results(state)["validation_results"]["expectations"]]
+
+
+def _assert_same_as_pandas(database, table=TABLE):
+    plan = compile_suite(SUITE)
+    expected = _results(plan, plan.run([DATA]))
+    try:
+        actual = _results(plan, run_sql(plan, database, table))
+    finally:
+        database.close()
+    for rule, want, got in zip(plan.rules, expected, actual):
+        if rule.expectation_type.endswith("_unique"):
+            # The database returns duplicate keys grouped, not in row order
+            want = {**want, "partial_unexpected_list": sorted(want["partial_unexpected_list"], key=str)}
+            got = {**got, "partial_unexpected_list": sorted(got["partial_unexpected_list"], key=str)}
+        assert got == want, rule.expectation_type
+
+
+def test_quote():
+    assert quote('age "years"') == '"age ""years"""'
+    assert quote("e.mail") == '"e.mail"'
+    assert quote_table("main.orders") == '"main"."orders"'
+
+
+def test_sqlite_matches_pandas_engine(tmp_path):
+    _assert_same_as_pandas(SqliteDatabase(_write_sqlite(tmp_path / "orders.db", DATA)))
+
+
+def test_sqlite_table_in_schema(tmp_path):
+    _assert_same_as_pandas(SqliteDatabase(_write_sqlite(tmp_path / "orders.db", DATA)), f"main.{TABLE}")
+
+
+def test_sqlite_numbers_are_integer_and_real_values_only(tmp_path):
+    # SQLite keeps what was inserted: numeric text stays text and is not a number
+    path = tmp_path / "ages.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE people (age)")
+        connection.executemany("INSERT INTO people VALUES (?)", [(30,), (30.5,), ("30",), (None,)])
+    suite = {"expectation_suite_name": "ages", "expectations": [{
+        "expectation_type": "expect_column_values_to_be_between",
+        "kwargs": {"column": "age", "min_value": 18, "max_value": 60}}]}
+    plan = compile_suite(suite)
+    database = SqliteDatabase(str(path))
+    try:
+        result = _results(plan, run_sql(plan, database, "people"))[0]
+    finally:
+        database.close()
+    assert (result["unexpected_count"], result["missing_count"]) == (1, 1)
+    assert result["partial_unexpected_list"] == ["30"]
+
+
+def test_duckdb_matches_pandas_engine(tmp_path):
+    duckdb = pytest.importorskip("duckdb")
+    path = str(tmp_path / "orders.duckdb")
+    connection = duckdb.connect(path)
+    connection.register("data", DATA)
+    connection.execute(f"CREATE TABLE {quote(TABLE)} AS SELECT * FROM data")
+    connection.close()
+    database = open_database(path)
+    # The email pattern has an RE2 form, so it runs as regexp_matches in DuckDB
+    assert "regexp_matches" in database.regex('"e.mail"', compile_suite(SUITE).rules[0].rule)[0]
+    _assert_same_as_pandas(database)
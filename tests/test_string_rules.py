@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from string_rules import RegexRule  # noqa: E402
+
+
+@pytest.mark.parametrize("pattern, values", [
+    (r"^\w+$", ["café", "naïve", "abc", "a-b"]),
+    (r"^\d+$", ["١٢٣", "123", "12a"]),
+    (r"^a\sb$", ["a b", "a b", "ab"]),
+    (r"^\bé$", ["é"]),
+    (r"^(\w)\1$", ["ßß", "aa", "ab"]),
+    (r"^a(?!b).$", ["ac", "ab"]),
+    # Source syntax RE2 reads differently or rejects
+    (r"^a{,3}$", ["a", "a{,3}", "aaa"]),
+    (r"^[[:alpha:]]$", ["a", ":", "["]),
+    (r"^\N{LATIN SMALL LETTER E WITH ACUTE}$", ["é", "e"]),
+    (r"^\u00e9$", ["é", "e"]),
+    (r"^\U000000e9$", ["é", "e"]),
+    # Patterns RE2 runs as re does
+    (r"^[a-z]+@[a-z]+\.com$", ["ab@cd.com", "ab@cd.org", "é@cd.com"]),
+    (r"^a{2,3}$", ["a", "aa", "aaaa"]),
+])
+@pytest.mark.filterwarnings("ignore:Possible nested set:FutureWarning")
+def test_column_verdicts_match_re(pattern, values):
+    rule = RegexRule(pattern)
+    expected = [rule.regex.match(value) is not None for value in values]
+    assert rule.match_series(pd.Series(values)).tolist() == expected
+    assert [rule.match_scalar(value) for value in values] == expected
+    if rule.vector_pattern is not None:
+        assert rule.match_arrow(pa.array(values)).to_pylist() == expected
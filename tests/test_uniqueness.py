@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rule_suite import compile_suite  # noqa: E402
+from uniqueness import ExactUniqueAccumulator, HyperLogLogAccumulator, hash_keys, normalize_keys  # noqa: E402
+
+# 2.0 is a duplicate, but only the second chunk is all integral
+CHUNKS = [pd.DataFrame({"k": [1.5, 2.0]}), pd.DataFrame({"k": [2.0, 3.0]})]
+
+
+def _unexpected(accumulator):
+    for chunk in CHUNKS:
+        accumulator.update_frame(chunk)
+    return accumulator.to_result()["unexpected_count"]
+
+
+def test_key_hash_does_not_depend_on_chunk():
+    first, second = (hash_keys(normalize_keys(chunk)) for chunk in CHUNKS)
+    assert first[1] == second[0]
+    # Numbers and strings stay distinct keys
+    assert hash_keys(pd.DataFrame({"k": ["2"]}))[0] != second[0]
+
+
+def test_spilled_duplicates_match_in_memory():
+    assert _unexpected(ExactUniqueAccumulator(["k"], 10)) == 2
+    assert _unexpected(ExactUniqueAccumulator(["k"], 10, max_memory_rows=1)) == 2
+
+
+def test_approximate_mode_sees_duplicate_across_chunks():
+    assert _unexpected(HyperLogLogAccumulator(["k"])) == 1
+
+
+def _approximate_result(keys, relative_error=0.01, mostly=1):
+    suite = {"expectation_suite_name": "keys", "expectations": [{
+        "expectation_type": "expect_column_values_to_be_unique", "kwargs": {"column": "k", "mostly": mostly},
+        "meta": {"opendq": {"uniqueness": "approximate", "relative_error": relative_error}}}]}
+    plan = compile_suite(suite)
+    return plan.build_results(plan.run([pd.DataFrame({"k": keys})]))["validation_results"]["expectations"][0]
+
+
+def test_approximate_mode_passes_unique_column_within_error_bound():
+    # A coarse sketch, so the estimate clearly falls short of the row count
+    result = _approximate_result(range(100_000), relative_error=0.05)
+    details = result["result"]["details"]
+    assert result["success"]
+    # The shortfall is still reported, next to the tolerance that excuses it
+    assert result["result"]["unexpected_count"] == 100_000 - details["distinct_count_estimate"]
+    assert abs(result["result"]["unexpected_count"]) <= details["duplicate_tolerance"]
+
+
+def test_approximate_mode_fails_duplicates_beyond_error_bound():
+    result = _approximate_result([i % 50_000 for i in range(100_000)])
+    assert not result["success"]
+    assert abs(result["result"]["unexpected_count"] - 50_000) < result["result"]["details"]["duplicate_tolerance"]
+    assert _approximate_result([i % 50_000 for i in range(100_000)], mostly=0.4)["success"]
+
+
+@pytest.mark.parametrize("relative_error", [0.001, 0.5])
+def test_unsupported_relative_error_is_rejected(relative_error):
+    with pytest.raises(ValueError, match="relative_error must be between"):
+        _approximate_result([1], relative_error=relative_error)
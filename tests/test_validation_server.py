@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from validation_server import SuiteCache, ValidationClient, ValidationServer  # noqa: E402
+
+
+def _unexpected(plan, df):
+    return plan.build_results(plan.run([df]))["validation_results"]["expectations"][0]["result"]["unexpected_count"]
+
+
+def test_plan_recompiled_when_reference_changes(tmp_path):
+    reference = tmp_path / "customers.csv"
+    reference.write_text("id\n1\n2\n")
+    suite = {"expectation_suite_name": "orders", "expectations": [{
+        "expectation_type": "expect_column_values_to_be_in_reference",
+        "kwargs": {"column": "cid", "reference_path": str(reference), "reference_column": "id"}}]}
+    orders = pd.DataFrame({"cid": [1, 2, 3]})
+    cache = SuiteCache()
+    first = cache.plan(suite)
+    assert cache.plan(suite) is first
+    assert _unexpected(first, orders) == 1
+
+    reference.write_text("id\n1\n2\n3\n")
+    second = cache.plan(suite)
+    assert second is not first
+    assert _unexpected(second, orders) == 0
+    assert len(cache) == 1
+
+
+def test_results_are_written_by_the_client_not_the_server(tmp_path):
+    data = tmp_path / "ids.csv"
+    data.write_text("id\n1\n\n")
+    suite = {"expectation_suite_name": "ids", "expectations": [
+        {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "id"}}]}
+    server = ValidationServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with ValidationClient(port=server.server_address[1]) as client:
+            target = tmp_path / "server_written.json"
+            request = {"path": str(data), "suite": suite, "output": str(target)}
+            with pytest.raises(RuntimeError, match="400"):
+                client._request("POST", "/validate", json.dumps(request).encode("utf-8"))
+            assert not target.exists()
+
+            output = tmp_path / "results.json"
+            results = client.validate_file(str(data), suite=suite, output_path=str(output))
+            assert json.loads(output.read_text())["validation_results"] == results["validation_results"]
+    finally:
+        server.shutdown()
+        server.server_close()
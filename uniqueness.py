@@ -0,0 +1,346 @@
+"""Bounded-memory accumulators for column and compound-key uniqueness.
+
+Two modes are offered, both mergeable across chunks and worker processes:
+
+- ``ExactUniqueAccumulator`` keeps the key values themselves. Once more
+  than ``max_memory_rows`` keys are held it spills them to disk,
+  partitioned by key hash, and duplicates are counted one partition at a
+  time when the result is built (a Grace hash join against itself).
+- ``HyperLogLogAccumulator`` keeps a fixed array of HyperLogLog registers
+  sized for a requested relative error and estimates the number of
+  distinct keys. Rows beyond that estimate are always reported as the
+  estimated duplicate count, but the check only fails on duplicates beyond
+  the estimate's error bound (``duplicate_tolerance``), so a unique column
+  is not failed by estimation noise.
+
+Like Great Expectations, the unexpected values of the exact mode are every
+row whose key occurs more than once, and rows with missing key values are
+skipped.
+"""
+import math
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_MEMORY_ROWS = 5_000_000
+SPILL_PARTITIONS = 64
+DEFAULT_RELATIVE_ERROR = 0.01
+# Standard errors of a HyperLogLog estimate that a distinct-count shortfall must exceed
+ERROR_BOUND_SIGMAS = 3
+# Register-index bits HyperLogLogAccumulator supports, and the relative errors they give
+MIN_REGISTER_BITS = 4
+MAX_REGISTER_BITS = 18
+MIN_RELATIVE_ERROR = 1.04 / math.sqrt(1 << MAX_REGISTER_BITS)
+MAX_RELATIVE_ERROR = 1.04 / math.sqrt(1 << MIN_REGISTER_BITS)
+_ROW = "__row__"
+
+
+def normalize_keys(keys):
+    """Give key columns one dtype per kind of value before comparing or hashing
+
+    Chunked readers infer dtypes per chunk, so the same integer can arrive
+    as int64 in one chunk and float64 (because of a NaN or a fraction) in
+    another. Integral float columns become int64 so samples show integers,
+    and non-numeric columns become strings. A float column that keeps its
+    dtype still compares and hashes each integral value like the integer
+    (see ``hash_keys``), so no key's hash depends on the rest of its chunk.
+    """
+    keys = keys.copy()
+    for column in keys.columns:
+        values = keys[column]
+        if pd.api.types.is_float_dtype(values):
+            array = values.to_numpy()
+            if np.all(np.isfinite(array)) and np.all(array == np.floor(array)):
+                keys[column] = array.astype(np.int64)
+        elif not pd.api.types.is_numeric_dtype(values):
+            keys[column] = values.astype(str)
+    return keys
+
+
+# Integers up to this magnitude are exact as float64, so they hash as floats
+_EXACT_FLOAT_INTEGER = 2 ** 53
+# Mixed into the hashes of larger integers, which have no float twin
+_BIG_INTEGER_SALT = np.uint64(0x9E3779B97F4A7C15)
+_COMBINE = np.uint64(0x100000001B3)
+
+
+def _value_hashes(values):
+    """64-bit hash of each value of one key column, depending on the value only
+
+    Every number hashes by its float64 value (integers beyond 2**53 by
+    their own bits), so 2 and 2.0 hash alike whatever the column's dtype;
+    anything else hashes by its string.
+    """
+    from pandas.util import hash_array
+
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        array = values.to_numpy()
+        # Adding 0.0 turns -0.0 into 0.0
+        hashes = hash_array(array.astype(np.float64) + 0.0)
+        if array.dtype.kind in "iu":
+            big = (array > _EXACT_FLOAT_INTEGER) | (array < -_EXACT_FLOAT_INTEGER)
+            if big.any():
+                hashes[big] = hash_array(array[big].astype(np.uint64) ^ _BIG_INTEGER_SALT)
+        return hashes
+    return hash_array(values.astype(str).to_numpy(dtype=object))
+
+
+def hash_keys(keys):
+    """64-bit hash of each key row, combining its columns' value hashes"""
+    from pandas.util import hash_array
+
+    columns = iter(keys.columns)
+    hashes = _value_hashes(keys[next(columns)])
+    for column in columns:
+        hashes = hash_array(hashes * _COMBINE + _value_hashes(keys[column]))
+    return hashes
+
+
+def present_keys(df, columns):
+    """Split a chunk into its non-missing key rows and the missing-row mask
+
+    A row is missing when all of its key values are missing, matching Great
+    Expectations' default ``ignore_row_if="all_values_are_missing"``.
+    """
+    missing = df[columns].isna().all(axis=1).to_numpy()
+    return normalize_keys(df.loc[~missing, columns]), missing
+
+
+class ExactUniqueAccumulator:
+    """Exact duplicate detection that spills keys to disk when memory runs short"""
+
+    def __init__(self, columns, sample_size, max_memory_rows=DEFAULT_MAX_MEMORY_ROWS):
+        self.columns = list(columns)
+        self.sample_size = sample_size
+        self.max_memory_rows = max_memory_rows
+        self.element_count = 0
+        self.missing_count = 0
+        self.track_missing = True
+        self._pieces = []
+        self._rows_in_memory = 0
+        # (directory, row offset) of every spill owned by this accumulator
+        self._spills = []
+        self._result = None
+
+    def update_frame(self, df):
+        keys, missing = present_keys(df, self.columns)
+        keys[_ROW] = self.element_count + np.flatnonzero(~missing)
+        self.element_count += len(df)
+        self.missing_count += int(missing.sum())
+        self._pieces.append(keys)
+        self._rows_in_memory += len(keys)
+        if self._rows_in_memory > self.max_memory_rows:
+            self._spill()
+
+    def _spill(self):
+        """Append the in-memory keys to hash-partitioned files in a new directory"""
+        if not self._pieces:
+            return
+        keys = pd.concat(self._pieces, ignore_index=True)
+        directory = tempfile.mkdtemp(prefix="opendq-unique-")
+        partitions = hash_keys(keys[self.columns]) % SPILL_PARTITIONS
+        for partition in np.unique(partitions):
+            with open(os.path.join(directory, f"part-{partition:03d}.pkl"), "ab") as f:
+                pickle.dump(keys[partitions == partition], f)
+        self._spills.append((directory, 0))
+        self._pieces = []
+        self._rows_in_memory = 0
+
+    def merge(self, other):
+        """Fold in a later chunk's keys, shifting its row numbers after ours"""
+        offset = self.element_count
+        for piece in other._pieces:
+            piece = piece.copy()
+            piece[_ROW] += offset
+            self._pieces.append(piece)
+            self._rows_in_memory += len(piece)
+        self._spills.extend((directory, base + offset) for directory, base in other._spills)
+        other._spills = []
+        self.element_count += other.element_count
+        self.missing_count += other.missing_count
+        if self._rows_in_memory > self.max_memory_rows:
+            self._spill()
+        return self
+
+    def _count_duplicates(self, keys, first_rows):
+        """Count rows with repeated keys and keep the earliest ones for the sample"""
+        duplicated = keys.duplicated(subset=self.columns, keep=False).to_numpy()
+        rows = keys[duplicated]
+        first_rows.append(rows if self.sample_size is None else rows.nsmallest(self.sample_size, _ROW))
+        return int(duplicated.sum())
+
+    def _finalize(self):
+        if self._result is not None:
+            return self._result
+        first_rows = []
+        if not self._spills:
+            if self._pieces:
+                unexpected = self._count_duplicates(pd.concat(self._pieces, ignore_index=True), first_rows)
+            else:
+                unexpected = 0
+        else:
+            self._spill()
+            unexpected = 0
+            for partition in range(SPILL_PARTITIONS):
+                pieces = []
+                for directory, offset in self._spills:
+                    path = os.path.join(directory, f"part-{partition:03d}.pkl")
+                    if not os.path.exists(path):
+                        continue
+                    with open(path, "rb") as f:
+                        while True:
+                            try:
+                                piece = pickle.load(f)
+                            except EOFError:
+                                break
+                            piece[_ROW] += offset
+                            pieces.append(piece)
+                if pieces:
+                    unexpected += self._count_duplicates(pd.concat(pieces, ignore_index=True), first_rows)
+            for directory, _ in self._spills:
+                shutil.rmtree(directory, ignore_errors=True)
+            self._spills = []
+        sample = pd.concat(first_rows).sort_values(_ROW) if first_rows else None
+        if sample is None or sample.empty or self.sample_size == 0:
+            values = []
+        else:
+            sample = sample.head(self.sample_size) if self.sample_size is not None else sample
+            if len(self.columns) == 1:
+                values = sample[self.columns[0]].tolist()
+            else:
+                values = sample[self.columns].to_dict("records")
+        self._pieces = []
+        self._result = (unexpected, values)
+        return self._result
+
+    @property
+    def unexpected_count(self):
+        return self._finalize()[0]
+
+    def unexpected_percent(self):
+        checked = self.element_count - self.missing_count
+        return (self.unexpected_count / checked) * 100 if checked > 0 else 0
+
+    def to_result(self):
+        unexpected, values = self._finalize()
+        return {
+            "element_count": self.element_count,
+            "unexpected_count": unexpected,
+            "unexpected_percent": self.unexpected_percent(),
+            "partial_unexpected_list": values,
+            "missing_count": self.missing_count,
+            "missing_percent": (self.missing_count / self.element_count) * 100 if self.element_count > 0 else 0
+        }
+
+    def to_dict(self):
+        raise ValueError("Exact uniqueness keeps every key and cannot be cached; "
+                         "use the approximate mode for incremental runs")
+
+
+def registers_for_error(relative_error):
+    """Register-index bits giving at most ``relative_error`` standard error"""
+    if not MIN_RELATIVE_ERROR <= relative_error <= MAX_RELATIVE_ERROR:
+        raise ValueError(f"relative_error must be between {MIN_RELATIVE_ERROR:.5f} and "
+                         f"{MAX_RELATIVE_ERROR:.2f}, got {relative_error}")
+    bits = math.ceil(math.log2((1.04 / relative_error) ** 2))
+    return min(max(bits, MIN_REGISTER_BITS), MAX_REGISTER_BITS)
+
+
+class HyperLogLogAccumulator:
+    """Approximate distinct counting with mergeable HyperLogLog registers"""
+
+    def __init__(self, columns, relative_error=DEFAULT_RELATIVE_ERROR):
+        self.columns = list(columns)
+        self.bits = registers_for_error(relative_error)
+        self.registers = np.zeros(1 << self.bits, dtype=np.uint8)
+        self.element_count = 0
+        self.missing_count = 0
+        self.track_missing = True
+
+    def update_frame(self, df):
+        keys, missing = present_keys(df, self.columns)
+        self.element_count += len(df)
+        self.missing_count += int(missing.sum())
+        if keys.empty:
+            return
+        hashes = hash_keys(keys)
+        index = (hashes >> np.uint64(64 - self.bits)).astype(np.int64)
+        rest = hashes << np.uint64(self.bits)
+        # Leading zeros of the remaining bits, via the float exponent
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, 64 - self.bits, np.clip(64 - exponent, 0, 64 - self.bits)) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        self.element_count += other.element_count
+        self.missing_count += other.missing_count
+        return self
+
+    def relative_standard_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def distinct_estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting is more accurate here
+            estimate = m * math.log(m / zeros)
+        return min(int(round(estimate)), self.element_count - self.missing_count)
+
+    def duplicate_tolerance(self):
+        """Shortfall of the estimate below the checked rows that estimation error explains"""
+        checked = self.element_count - self.missing_count
+        return ERROR_BOUND_SIGMAS * self.relative_standard_error() * checked
+
+    @property
+    def unexpected_count(self):
+        """Estimated duplicate rows: how far the distinct estimate falls short of the checked rows"""
+        return self.element_count - self.missing_count - self.distinct_estimate()
+
+    def within_error_bound(self, mostly=1):
+        """Whether the duplicates beyond ``duplicate_tolerance`` are within ``mostly``"""
+        checked = self.element_count - self.missing_count
+        return max(self.unexpected_count - self.duplicate_tolerance(), 0) <= (1 - mostly) * checked
+
+    def unexpected_percent(self):
+        checked = self.element_count - self.missing_count
+        return (self.unexpected_count / checked) * 100 if checked > 0 else 0
+
+    def to_result(self):
+        return {
+            "element_count": self.element_count,
+            "unexpected_count": self.unexpected_count,
+            "unexpected_percent": self.unexpected_percent(),
+            "partial_unexpected_list": [],
+            "missing_count": self.missing_count,
+            "missing_percent": (self.missing_count / self.element_count) * 100 if self.element_count > 0 else 0,
+            "details": {
+                "approximate": True,
+                "method": "hyperloglog",
+                "distinct_count_estimate": self.distinct_estimate(),
+                "relative_standard_error": self.relative_standard_error(),
+                # Estimated duplicates up to this many (3 standard errors) may be
+                # estimation error; success only counts the duplicates beyond it
+                "duplicate_tolerance": self.duplicate_tolerance()
+            }
+        }
+
+    def to_dict(self):
+        return {
+            "element_count": self.element_count,
+            "missing_count": self.missing_count,
+            "registers": self.registers.tolist()
+        }
+
+    def load_dict(self, data):
+        self.element_count = data["element_count"]
+        self.missing_count = data["missing_count"]
+        self.registers = np.array(data["registers"], dtype=np.uint8)
+        return self
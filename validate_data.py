@@ -1,70 +1,73 @@
+import argparse
 import os
-import json
-import subprocess
+import shutil
 
-def run_validation():
+from checkpoint_runner import DEFAULT_CHECKPOINT, run_checkpoint
+from results_history import ResultsHistory
+from run_store import DEFAULT_RUN_STORE, RunStore
+
+def run_validation(checkpoint_name=DEFAULT_CHECKPOINT, store_root=DEFAULT_RUN_STORE, history_path=None):
     try:
-        # Run the checkpoint using CLI
-        result = subprocess.run(
-            ["great_expectations", "checkpoint", "run", "customers_checkpoint"],
-            capture_output=True,
-            text=True
-        )
+        # Run the checkpoint in this process; its results come back directly
+        store = RunStore(store_root)
+        result, stored = run_checkpoint(checkpoint_name, store=store)
         
-        # Print the output
         print("\n" + "="*50)
         print("VALIDATION OUTPUT")
         print("="*50)
-        print(result.stdout)
-        
-        if result.stderr:
-            print("\nERRORS:")
-            print(result.stderr)
+        print(f"Checkpoint '{checkpoint_name}' ran {len(stored)} validation(s)")
         
-        # Find and display the validation results file
-        results_dir = os.path.join("great_expectations", "uncommitted", "validations")
-        if os.path.exists(results_dir):
-            latest_run = sorted(os.listdir(results_dir))[-1]  # Get the latest run
-            results_file = os.path.join(results_dir, latest_run, "validation.json")
+        for suite_name, run_id, validation in stored:
+            # Print summary
+            print("\n" + "="*50)
+            print(f"VALIDATION SUMMARY: {suite_name}")
+            print("="*50)
             
-            if os.path.exists(results_file):
-                with open(results_file, 'r') as f:
-                    result_data = json.load(f)
-                
-                # Print summary
-                print("\n" + "="*50)
-                print("VALIDATION SUMMARY")
-                print("="*50)
-                
-                success = result_data["success"]
-                status = "SUCCESS" if success else "FAILED"
-                print(f"\nValidation Status: {status}")
-                
-                # Print statistics
-                stats = result_data["statistics"]
-                print("\nStatistics:")
-                print(f"  - Evaluated Expectations: {stats['evaluated_expectations']}")
-                print(f"  - Successful Expectations: {stats['successful_expectations']}")
-                print(f"  - Unsuccessful Expectations: {stats['unsuccessful_expectations']}")
-                print(f"  - Success Percent: {stats['success_percent']:.2f}%")
-                
-                # Save a copy of the results
-                output_file = 'validation_results.json'
-                with open(output_file, 'w') as f:
-                    json.dump(result_data, f, indent=2)
-                print(f"\nDetailed results saved to '{output_file}'")
+            success = validation["success"]
+            status = "SUCCESS" if success else "FAILED"
+            print(f"\nValidation Status: {status}")
+            
+            # Print statistics
+            stats = validation["statistics"]
+            print("\nStatistics:")
+            print(f"  - Evaluated Expectations: {stats['evaluated_expectations']}")
+            print(f"  - Successful Expectations: {stats['successful_expectations']}")
+            print(f"  - Unsuccessful Expectations: {stats['unsuccessful_expectations']}")
+            print(f"  - Success Percent: {stats['success_percent']:.2f}%")
+            print(f"  - Run ID: {run_id}")
+        
+        if history_path:
+            # Keep every run for trend queries; validation_results.json only holds the last one
+            with ResultsHistory(history_path) as history:
+                for suite_name, _, validation in stored:
+                    history.record(validation, suite_name=suite_name, source=checkpoint_name)
+        
+        if stored:
+            # Save a copy of this run's results, not whichever run finished last
+            output_file = 'validation_results.json'
+            suite_name, run_id, _ = stored[-1]
+            shutil.copyfile(store.path(suite_name, run_id), output_file)
+            print(f"\nDetailed results saved to '{output_file}'")
         
         print("\nRun 'great_expectations docs build' to generate data documentation")
+        return result
         
     except Exception as e:
         print(f"Error during validation: {str(e)}")
         raise
 
-if __name__ == "__main__":
-    import os
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run the customers checkpoint with Great Expectations")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint to run")
+    parser.add_argument("--run-store", default=DEFAULT_RUN_STORE, help="Directory of the indexed run store")
+    parser.add_argument("--history", help="Also append the results to this SQLite history file")
+    args = parser.parse_args(argv)
     if not os.path.exists('great_expectations'):
         print("Great Expectations project not found. Running setup first...")
         import setup_ge_validation
         setup_ge_validation.setup_ge_project()
     
-    run_validation()
+    run_validation(args.checkpoint, args.run_store, args.history)
+
+if __name__ == "__main__":
+    main()
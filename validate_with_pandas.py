@@ -1,106 +1,137 @@
-import pandas as pd
-import re
-import json
+import argparse
+import os
+from results_history import ResultsHistory
+from results_io import DEFAULT_SAMPLE_SIZE, write_results
+from string_rules import EMAIL_PATTERN, EMAIL_RULE
 
 def validate_email(email):
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, str(email)))
+    return EMAIL_RULE.match_scalar(email)
 
-def validate_data():
-    # Read the data
-    df = pd.read_csv("data/customers.csv")
-    
-    # Initialize results
-    results = {
-        "validation_results": {
-            "expectations": [],
-            "statistics": {
-                "total_records": len(df),
-                "evaluated_expectations": 0,
-                "successful_expectations": 0
-            }
-        }
-    }
-    
-    # Check 1: Email format validation
-    email_validation = df['email'].apply(validate_email)
-    email_failures = df[~email_validation]['email'].tolist()
-    
-    results["validation_results"]["expectations"].append({
-        "expectation_type": "valid_email_format",
-        "success": len(email_failures) == 0,
-        "result": {
-            "element_count": len(df),
-            "unexpected_count": len(email_failures),
-            "unexpected_percent": (len(email_failures) / len(df)) * 100,
-            "partial_unexpected_list": email_failures[:10]  # Show first 10 failures
+# The built-in checks, expressed as a suite so they run through the same plan
+VALID_COUNTRIES = ["India", "USA", "UK"]
+CUSTOMER_CHECKS = {
+    "expectation_suite_name": "customers_pandas_checks",
+    "expectations": [
+        {
+            "expectation_type": "expect_column_values_to_match_regex",
+            "kwargs": {"column": "email", "regex": EMAIL_PATTERN},
+            "meta": {"description": "Check if email format is valid",
+                     "opendq": {"result_type": "valid_email_format", "nulls": "unexpected"}}
         },
-        "meta": {"column": "email", "description": "Check if email format is valid"}
-    })
-    
-    # Check 2: Age range validation (18-60)
-    age_validation = (df['age'] >= 18) & (df['age'] <= 60)
-    age_failures = df[~age_validation]['age'].tolist()
-    
-    results["validation_results"]["expectations"].append({
-        "expectation_type": "valid_age_range",
-        "success": len(age_failures) == 0,
-        "result": {
-            "element_count": len(df),
-            "unexpected_count": len(age_failures),
-            "unexpected_percent": (len(age_failures) / len(df)) * 100,
-            "partial_unexpected_list": age_failures[:10]  # Show first 10 failures
+        {
+            "expectation_type": "expect_column_values_to_be_between",
+            "kwargs": {"column": "age", "min_value": 18, "max_value": 60},
+            "meta": {"description": "Check if age is between 18 and 60",
+                     "opendq": {"result_type": "valid_age_range", "nulls": "unexpected"}}
         },
-        "meta": {"column": "age", "description": "Check if age is between 18 and 60"}
-    })
+        {
+            "expectation_type": "expect_column_values_to_be_in_set",
+            "kwargs": {"column": "country", "value_set": VALID_COUNTRIES},
+            "meta": {"description": f"Check if country is in {VALID_COUNTRIES}",
+                     "opendq": {"result_type": "valid_country", "nulls": "unexpected", "sample": "unique"}}
+        }
+    ]
+}
+
+def validate_data(path="data/customers.csv", chunksize=None, sample_size=DEFAULT_SAMPLE_SIZE, suite=None,
+                  workers=1, incremental=False, state_path=None, output_path="validation_results.json",
+                  history_path=None, mode=None, sample_fraction=None, stratify_by=None, seed=None, profile=False,
+                  metrics_path=None, metrics_format="prometheus", quarantine_path=None, clean_path=None,
+                  quarantine_rows=False):
+    """Validate a CSV, Parquet or Arrow file, optionally streaming it in ``chunksize`` rows
+
+    ``suite`` is an expectation suite dict or JSON path; by default the
+    built-in email, age and country checks run. Only the columns the suite
+    references are read, and each is visited once per chunk. In streaming
+    mode only one chunk is held in memory at a time and the unexpected-value
+    samples are capped at ``sample_size`` entries. With ``workers`` > 1 the
+    file is split into row ranges validated in a process pool.
     
-    # Check 3: Country validation
-    valid_countries = ["India", "USA", "UK"]
-    country_validation = df['country'].isin(valid_countries)
-    country_failures = df[~country_validation]['country'].unique().tolist()
+    With ``incremental``, per-chunk results are cached in ``state_path``
+    and only chunks of ``chunksize`` rows that changed since the last run
+    are validated again. Results are written to ``output_path``, as NDJSON
+    when it ends in ``.ndjson``, and appended to the SQLite history at
+    ``history_path`` when given.
     
-    results["validation_results"]["expectations"].append({
-        "expectation_type": "valid_country",
-        "success": len(country_failures) == 0,
-        "result": {
-            "element_count": len(df),
-            "unexpected_count": (~country_validation).sum(),
-            "unexpected_percent": ((~country_validation).sum() / len(df)) * 100,
-            "partial_unexpected_list": country_failures
-        },
-        "meta": {"column": "country", "description": f"Check if country is in {valid_countries}"}
-    })
+    ``mode`` sets the default execution mode of the suite's rules:
+    ``"fail_fast"`` stops each rule once it has failed, and ``"sample"``
+    checks a Bernoulli (or, with ``stratify_by``, stratified) sample of
+    ``sample_fraction`` of the rows and reports confidence intervals.
     
-    # Update statistics
-    results["validation_results"]["statistics"]["evaluated_expectations"] = len(results["validation_results"]["expectations"])
-    results["validation_results"]["statistics"]["successful_expectations"] = sum(
-        1 for exp in results["validation_results"]["expectations"] if exp["success"]
-    )
+    With ``profile`` each expectation's result gets a ``performance`` block
+    of per-rule timings, and ``metrics_path`` also exports them, with the
+    read, evaluate, serialize and report phases, as a Prometheus textfile
+    (or OpenMetrics with ``metrics_format="openmetrics"``).
+    
+    ``quarantine_path`` (Parquet or Arrow) receives the position and failed
+    rule IDs of every failing row, and the whole row with
+    ``quarantine_rows``; ``clean_path`` receives the rows that failed
+    nothing, in the same pass (see quarantine.py).
+    """
+    # pandas is only imported once there is something to validate, so the
+    # CLI help and CUSTOMER_CHECKS stay cheap to load
+    from incremental_validate import DEFAULT_CHUNK_ROWS, validate_incremental
+    from parallel_validate import validate_parallel
+    from readers import run_plan
+    from execution import DEFAULT_GATE_CHUNKSIZE, with_execution
+    from instrumentation import timed_phase, write_metrics
+    from rule_suite import compile_suite, load_suite
+
+    suite = suite or CUSTOMER_CHECKS
+    if isinstance(suite, str):
+        suite = load_suite(suite)
+    profile = profile or bool(metrics_path)
+    if mode or sample_fraction or stratify_by or seed is not None or profile:
+        # Execution options travel inside the suite, so worker processes and
+        # the incremental cache fingerprint see them too
+        suite = with_execution(suite, mode=mode, sample_fraction=sample_fraction, stratify_by=stratify_by,
+                               seed=seed, profile=profile or None)
+    if mode == "fail_fast" and not chunksize:
+        # Read in chunks so reading can stop once every rule has failed
+        chunksize = DEFAULT_GATE_CHUNKSIZE
     
-    # Calculate overall success
-    results["validation_results"]["success"] = all(
-        exp["success"] for exp in results["validation_results"]["expectations"]
-    )
+    if (quarantine_path or clean_path) and (incremental or workers > 1):
+        raise ValueError("Quarantine and clean-row output need a single-process, non-incremental run")
     
-    # Convert numpy types to native Python types for JSON serialization
-    def convert_numpy_types(obj):
-        import numpy as np
-        if isinstance(obj, (np.integer, np.floating, np.bool_)):
-            return obj.item()
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, dict):
-            return {k: convert_numpy_types(v) for k, v in obj.items()}
-        elif isinstance(obj, (list, tuple)):
-            return [convert_numpy_types(item) for item in obj]
-        return obj
+    if quarantine_path or clean_path:
+        from quarantine import QuarantineWriter, run_with_quarantine
+        plan = compile_suite(suite, sample_size=sample_size)
+        if not quarantine_path:
+            quarantine_path = os.path.splitext(clean_path)[0] + ".quarantine.parquet"
+        with QuarantineWriter(plan, quarantine_path, clean_path, quarantine_rows) as writer:
+            state = run_with_quarantine(plan, path, writer, chunksize)
+    elif incremental:
+        plan, state, revalidated = validate_incremental(path, suite, state_path, sample_size=sample_size,
+                                                        chunk_rows=chunksize or DEFAULT_CHUNK_ROWS,
+                                                        workers=workers)
+        print(f"Incremental run: validated {revalidated} changed chunk(s)")
+    elif workers > 1:
+        plan, state = validate_parallel(path, suite, workers, sample_size=sample_size, chunksize=chunksize)
+    else:
+        # Read the referenced columns and run every rule on each chunk
+        plan = compile_suite(suite, sample_size=sample_size)
+        state = run_plan(plan, path, chunksize)
+    results = plan.build_results(state)
+    if quarantine_path:
+        results["validation_results"]["quarantine"] = writer.summary()
     
     # Save results to a file
-    with open("validation_results.json", "w") as f:
-        json.dump(convert_numpy_types(results), f, indent=2)
+    with timed_phase(state.profile, "serialize"):
+        write_results(results, output_path)
+        if history_path:
+            with ResultsHistory(history_path) as history:
+                history.record(results, suite_name=plan.suite_name, source=path)
     
-    # Print summary
+    with timed_phase(state.profile, "report"):
+        print_summary(results, output_path)
+    if metrics_path:
+        write_metrics(metrics_path, plan.suite_name, state.profile, results, metrics_format)
+        print(f"Metrics written to: {metrics_path}")
+    return results
+
+def print_summary(results, output_path):
+    """Print the statistics and each expectation's outcome"""
     print("\nValidation Results:")
     print("=" * 50)
     print(f"Total Records: {results['validation_results']['statistics']['total_records']}")
@@ -113,11 +144,72 @@ def validate_data():
     for exp in results["validation_results"]["expectations"]:
         status = "PASS" if exp["success"] else "FAIL"
         print(f"[{status}] {exp['meta']['description']}")
-        if not exp["success"]:
+        details = exp["result"].get("details", {})
+        if exp.get("execution_mode") == "sample":
+            low, high = details["unexpected_percent_interval"]
+            print(f"   - Estimated unexpected: {exp['result']['unexpected_percent']:.2f}% "
+                  f"({details['confidence_level']:.0%} CI {low:.2f}-{high:.2f}%, "
+                  f"{details['sampled_rows']} of {details['population_rows']} rows checked)")
+        elif details.get("stopped_early"):
+            print(f"   - Stopped early after {exp['result']['element_count']} rows")
+        if "drift" in details:
+            drift = details["drift"]
+            statistic = "no values" if drift["statistic"] is None else f"{drift['statistic']:.4f}"
+            print(f"   - {drift['metric']}: {statistic} (threshold {drift['threshold']})")
+        elif not exp["success"]:
             print(f"   - Failed values: {exp['result']['partial_unexpected_list']}")
+        if "performance" in exp["result"]:
+            performance = exp["result"]["performance"]
+            print(f"   - Took {performance['wall_seconds']:.3f} s ({performance['cpu_seconds']:.3f} s CPU) "
+                  f"for {performance['rows']} rows")
     
-    print("\nResults saved to: validation_results.json")
-    return results
+    quarantine = results["validation_results"].get("quarantine")
+    if quarantine:
+        print(f"\nQuarantined {quarantine['quarantined_rows']} failing row(s) to: {quarantine['quarantine_path']}")
+        if "clean_path" in quarantine:
+            print(f"Wrote {quarantine['clean_rows']} clean row(s) to: {quarantine['clean_path']}")
+    print(f"\nResults saved to: {output_path}")
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Validate customer data with pandas")
+    parser.add_argument("--input", default="data/customers.csv", help="CSV, Parquet or Arrow file to validate")
+    parser.add_argument("--chunksize", type=int, help="Stream the file in chunks of this many rows")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help="Maximum number of unexpected values kept per expectation")
+    parser.add_argument("--suite", help="Expectation suite JSON to run instead of the built-in checks")
+    parser.add_argument("--workers", type=int, default=1, help="Validate row ranges in this many processes")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-validate chunks that changed since the last incremental run")
+    parser.add_argument("--state-file", help="Where incremental runs cache chunk results")
+    parser.add_argument("--output", default="validation_results.json",
+                        help="Results file; a .ndjson extension writes compact NDJSON")
+    parser.add_argument("--history", help="Also append the results to this SQLite history file")
+    parser.add_argument("--mode", choices=["full", "fail_fast", "sample"],
+                        help="Default execution mode: check every row, stop rules at their first failure, "
+                             "or check a random sample")
+    parser.add_argument("--sample-fraction", type=float, help="Fraction of rows checked in sample mode")
+    parser.add_argument("--stratify-by", help="Sample the same fraction of every value of this column")
+    parser.add_argument("--seed", type=int, help="Random seed for sample mode")
+    parser.add_argument("--profile", action="store_true", help="Record per-rule timings in the results")
+    parser.add_argument("--metrics-file", help="Export timings as a Prometheus textfile (implies --profile)")
+    parser.add_argument("--metrics-format", choices=["prometheus", "openmetrics"], default="prometheus",
+                        help="Format of --metrics-file")
+    parser.add_argument("--quarantine", help="Write every failing row's position and rule IDs to this "
+                                             "Parquet or Arrow file")
+    parser.add_argument("--quarantine-rows", action="store_true",
+                        help="Also write each failing row's columns to the quarantine file")
+    parser.add_argument("--clean-output", help="Write the rows that failed no rule to this Parquet, Arrow or "
+                                               "CSV file (failing rows go to --quarantine, by default "
+                                               "<name>.quarantine.parquet)")
+    args = parser.parse_args(argv)
+    if (args.quarantine or args.clean_output) and (args.workers > 1 or args.incremental):
+        parser.error("--quarantine and --clean-output cannot be combined with --workers or --incremental")
+    validate_data(args.input, chunksize=args.chunksize, sample_size=args.sample_size, suite=args.suite,
+                  workers=args.workers, incremental=args.incremental, state_path=args.state_file,
+                  output_path=args.output, history_path=args.history, mode=args.mode,
+                  sample_fraction=args.sample_fraction, stratify_by=args.stratify_by, seed=args.seed,
+                  profile=args.profile, metrics_path=args.metrics_file, metrics_format=args.metrics_format,
+                  quarantine_path=args.quarantine, clean_path=args.clean_output, quarantine_rows=args.quarantine_rows)
 
 if __name__ == "__main__":
-    validate_data()
+    main()
@@ -0,0 +1,290 @@
+"""A resident validation server and its synchronous client.
+
+Starting Python, importing pandas and compiling a suite costs far more than
+validating a typical file. The server pays that once: it stays up, keeps
+compiled suites in memory (recompiling a suite only when its file or the
+files its rules read change) and answers requests over HTTP/1.1 keep-alive
+connections, on TCP or a Unix socket.
+
+Endpoints:
+
+- ``POST /validate`` with a JSON body ``{"path": ..., "suite": ...,
+  "chunksize": ..., "sample_size": ...}`` validates a CSV, Parquet or
+  Arrow file on the server's filesystem. ``suite`` is a suite
+  file path or dict and defaults to the built-in customer checks.
+- ``POST /validate/arrow?suite=...&sample_size=...`` validates the record
+  batches of an Arrow IPC stream sent as the body.
+- ``GET /health`` reports uptime and the number of cached suites.
+
+Both validation endpoints answer with the validation_results structure.
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from readers import import_pyarrow, run_plan
+from results_io import write_results
+from rule_suite import compile_suite, load_suite
+from validate_with_pandas import CUSTOMER_CHECKS
+from validation_stream import DEFAULT_SAMPLE_SIZE
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class SuiteCache:
+    """Compiled plans keyed by suite file (and its mtime) or suite contents
+
+    A plan is recompiled when its external inputs (reference files, drift
+    baselines, an unpinned ``as_of`` date) differ from when it was compiled.
+    """
+
+    def __init__(self):
+        # key -> (plan, the plan's external inputs when compiled)
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def plan(self, suite=None, sample_size=DEFAULT_SAMPLE_SIZE):
+        suite = suite or CUSTOMER_CHECKS
+        if isinstance(suite, str):
+            key = ("path", os.path.abspath(suite), os.stat(suite).st_mtime_ns, sample_size)
+        else:
+            digest = hashlib.sha256(json.dumps(suite, sort_keys=True).encode("utf-8")).hexdigest()
+            key = ("inline", digest, sample_size)
+        with self._lock:
+            plan, inputs = self._plans.get(key, (None, None))
+        if plan is not None and plan.external_inputs() != inputs:
+            plan = None
+        if plan is None:
+            plan = compile_suite(load_suite(suite) if isinstance(suite, str) else suite, sample_size)
+            inputs = plan.external_inputs()
+            with self._lock:
+                if isinstance(suite, str):
+                    # Drop plans compiled from older versions of the same file
+                    for stale in [k for k in self._plans if k[:2] == key[:2]]:
+                        del self._plans[stale]
+                self._plans[key] = (plan, inputs)
+        return plan
+
+    def __len__(self):
+        return len(self._plans)
+
+
+def _sample_size(value):
+    return DEFAULT_SAMPLE_SIZE if value is None else int(value)
+
+
+class ValidationHandler(BaseHTTPRequestHandler):
+    """Request handler; the server carries the suite cache"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # Headers and body are separate writes; with Nagle's algorithm and
+        # delayed ACKs that costs ~40 ms per response on a reused connection
+        self.disable_nagle_algorithm = self.request.family != socket.AF_UNIX
+        super().setup()
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        self._send_json(200, {"status": "ok", "uptime_seconds": time.time() - self.server.started,
+                              "cached_suites": len(self.server.suites)})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        # Read the body before anything can fail, so the connection stays usable
+        body = self._read_body()
+        try:
+            if url.path == "/validate":
+                results = self._validate_file(json.loads(body or b"{}"))
+            elif url.path == "/validate/arrow":
+                results = self._validate_arrow(body, parse_qs(url.query))
+            else:
+                self._send_json(404, {"error": f"Unknown endpoint: {url.path}"})
+                return
+        except (ValueError, KeyError, OSError) as e:
+            self._send_json(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, results)
+
+    def _validate_file(self, request):
+        if request.get("output"):
+            # Clients write the results they receive; the server writes no files
+            raise ValueError("The server does not write results files; write the response instead")
+        plan = self.server.suites.plan(request.get("suite"), _sample_size(request.get("sample_size")))
+        state = run_plan(plan, request["path"], request.get("chunksize"))
+        return plan.build_results(state)
+
+    def _validate_arrow(self, body, query):
+        pa = import_pyarrow()
+        suite = query.get("suite", [None])[0]
+        plan = self.server.suites.plan(suite, _sample_size(query.get("sample_size", [None])[0]))
+        reader = pa.ipc.open_stream(pa.py_buffer(body))
+        state = plan.new_state()
+        for batch in reader:
+            plan.evaluate_arrow(batch.select(plan.columns), state)
+        return plan.build_results(state)
+
+
+class ValidationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, verbose=False):
+        super().__init__(address, ValidationHandler)
+        self.suites = SuiteCache()
+        self.started = time.time()
+        self.verbose = verbose
+
+
+class UnixValidationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, verbose=False):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, ValidationHandler)
+        self.suites = SuiteCache()
+        self.started = time.time()
+        self.verbose = verbose
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request, ("unix", 0)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ValidationClient:
+    """Synchronous client that reuses one connection for all its requests"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, timeout=None):
+        if socket_path:
+            self._connection = _UnixHTTPConnection(socket_path, timeout=timeout)
+        else:
+            self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, body=None, content_type="application/json"):
+        headers = {"Content-Type": content_type} if body is not None else {}
+        for attempt in range(2):
+            try:
+                self._connection.request(method, path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                payload = json.loads(response.read())
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; reconnect once
+                self._connection.close()
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"Validation server returned {response.status}: {payload.get('error')}")
+        return payload
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def validate_file(self, path, suite=None, chunksize=None, sample_size=None, output_path=None):
+        """Validate a file the server can read; relative paths resolve on the client side
+
+        With ``output_path`` the results are also written there by the
+        client, not the server.
+        """
+        request = {"path": os.path.abspath(path), "chunksize": chunksize, "sample_size": sample_size,
+                   "suite": os.path.abspath(suite) if isinstance(suite, str) else suite}
+        results = self._request("POST", "/validate", json.dumps(request).encode("utf-8"))
+        if output_path:
+            write_results(results, output_path)
+        return results
+
+    def validate_table(self, data, suite=None, sample_size=None):
+        """Validate a DataFrame, Arrow table or record batch sent as an Arrow stream
+
+        ``suite`` must be a suite file path the server can read, or None for
+        the built-in checks.
+        """
+        pa = import_pyarrow()
+        if not isinstance(data, (pa.Table, pa.RecordBatch)):
+            data = pa.Table.from_pandas(data, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, data.schema) as writer:
+            writer.write(data)
+        query = {key: value for key, value in
+                 (("suite", os.path.abspath(suite) if suite else None), ("sample_size", sample_size))
+                 if value is not None}
+        path = "/validate/arrow" + (f"?{urlencode(query)}" if query else "")
+        return self._request("POST", path, sink.getvalue().to_pybytes(),
+                             content_type="application/vnd.apache.arrow.stream")
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Serve validations from a long-running process")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    if args.socket:
+        server = UnixValidationServer(args.socket, verbose=args.verbose)
+        print(f"Validation server listening on {args.socket}")
+    else:
+        server = ValidationServer((args.host, args.port), verbose=args.verbose)
+        print(f"Validation server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Chunked CSV reading and the per-expectation accumulator every engine fills.
+
+``read_chunks`` streams a CSV as DataFrames so memory stays bounded by the
+chunk size. ExpectationAccumulator keeps one expectation's counts and its
+first-N unexpected values; accumulators merge in file order, and
+``to_dict``/``load_dict`` round-trip them through JSON so incremental
+validation can cache a chunk's state.
+"""
+import numpy as np
+import pandas as pd
+
+from results_io import DEFAULT_SAMPLE_SIZE
+
+
+def read_chunks(path, chunksize=None, **read_csv_kwargs):
+    """Yield the CSV as DataFrames of at most ``chunksize`` rows
+
+    Without a chunksize the whole file is yielded as a single DataFrame.
+    """
+    if chunksize:
+        with pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs) as reader:
+            yield from reader
+    else:
+        yield pd.read_csv(path, **read_csv_kwargs)
+
+
+def _sample_key(value):
+    """Key for de-duplicating samples; every kind of missing value is one key"""
+    if isinstance(value, (tuple, list)):
+        # Row samples of pair and compound-key rules (lists once read back from JSON)
+        return tuple(map(_sample_key, value))
+    # NaN is not equal to itself, so NaNs from different chunks never match
+    return None if pd.isna(value) else value
+
+
+class ExpectationAccumulator:
+    """Running counts and a bounded unexpected-value sample for one expectation
+
+    Accumulators are fed one chunk at a time and can be merged, so a result
+    built from many chunks matches one built from the whole file at once.
+    A ``sample_size`` of None keeps every sampled value.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, unique_sample=False, track_missing=False):
+        self.sample_size = sample_size
+        self.unique_sample = unique_sample
+        self.track_missing = track_missing
+        self.element_count = 0
+        self.missing_count = 0
+        self.unexpected_count = 0
+        self.partial_unexpected_list = []
+
+    def _room(self):
+        if self.sample_size is None:
+            return None
+        return max(self.sample_size - len(self.partial_unexpected_list), 0)
+
+    def _add_samples(self, values):
+        room = self._room()
+        if self.unique_sample:
+            seen = set(map(_sample_key, self.partial_unexpected_list))
+            for value in values:
+                if room == 0:
+                    break
+                key = _sample_key(value)
+                if key not in seen:
+                    seen.add(key)
+                    self.partial_unexpected_list.append(value)
+                    if room is not None:
+                        room -= 1
+        else:
+            self.partial_unexpected_list.extend(values if room is None else values[:room])
+
+    def update(self, values, valid, missing=None):
+        """Add a chunk of column values and the boolean mask of the valid ones
+
+        With ``track_missing``, values flagged in ``missing`` are counted as
+        missing rather than unexpected, as Great Expectations does.
+        """
+        invalid = ~np.asarray(valid, dtype=bool)
+        self.element_count += len(values)
+        if self.track_missing and missing is not None:
+            invalid &= ~missing
+            self.missing_count += int(missing.sum())
+        self.unexpected_count += int(invalid.sum())
+
+        room = self._room()
+        if room == 0:
+            return
+        if self.unique_sample:
+            candidates = pd.unique(values[invalid])
+        else:
+            # Only pull out as many failing values as the sample still needs
+            candidates = values.to_numpy()[np.flatnonzero(invalid)[:room]]
+        self._add_samples(candidates.tolist())
+
+    def update_counts(self, count, unexpected_count, missing_count, take_unexpected):
+        """Add a chunk checked elsewhere, such as in Arrow, from its counts
+
+        ``missing_count`` must already be excluded from ``unexpected_count``
+        when ``track_missing`` is set. ``take_unexpected(limit, unique)``
+        returns the chunk's unexpected values in row order as a list: the
+        first ``limit`` of them (all for None), or only distinct ones.
+        """
+        self.element_count += count
+        if self.track_missing:
+            self.missing_count += missing_count
+        self.unexpected_count += unexpected_count
+        room = self._room()
+        if room == 0 or unexpected_count == 0:
+            return
+        if self.unique_sample:
+            self._add_samples(take_unexpected(None, True))
+        else:
+            self._add_samples(take_unexpected(room, False))
+
+    def add_passing(self, count, missing_count=0):
+        """Count ``count`` values known to be valid without looking at them"""
+        self.element_count += count
+        if self.track_missing:
+            self.missing_count += missing_count
+
+    def merge(self, other):
+        """Fold in the counts and samples of a later chunk's accumulator"""
+        self.element_count += other.element_count
+        self.missing_count += other.missing_count
+        self.unexpected_count += other.unexpected_count
+        if self._room() != 0:
+            self._add_samples(other.partial_unexpected_list)
+        return self
+
+    def to_dict(self):
+        """The running counts and sample, for persisting between runs"""
+        return {
+            "element_count": self.element_count,
+            "missing_count": self.missing_count,
+            "unexpected_count": self.unexpected_count,
+            "partial_unexpected_list": list(self.partial_unexpected_list)
+        }
+
+    def load_dict(self, data):
+        self.element_count = data["element_count"]
+        self.missing_count = data["missing_count"]
+        self.unexpected_count = data["unexpected_count"]
+        # JSON stores row samples as lists; restore the tuples rules sample
+        self.partial_unexpected_list = [tuple(value) if isinstance(value, list) else value
+                                        for value in data["partial_unexpected_list"]]
+        return self
+
+    def unexpected_percent(self):
+        # Missing values are excluded from the denominator, as in Great Expectations
+        checked = self.element_count - self.missing_count
+        return (self.unexpected_count / checked) * 100 if checked > 0 else 0
+
+    def to_result(self):
+        result = {
+            "element_count": self.element_count,
+            "unexpected_count": self.unexpected_count,
+            "unexpected_percent": self.unexpected_percent(),
+            "partial_unexpected_list": list(self.partial_unexpected_list)
+        }
+        if self.track_missing:
+            result["missing_count"] = self.missing_count
+            result["missing_percent"] = (self.missing_count / self.element_count) * 100 if self.element_count > 0 else 0
+        return result